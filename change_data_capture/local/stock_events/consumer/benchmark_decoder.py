@@ -0,0 +1,77 @@
+"""
+Benchmark decoding of stock_trades change events in events/sec.
+
+Compares naive per-message ``json.loads`` (and ``decode_change``) with
+``EnvelopeDecoder.decode_batch`` on the current embedded-schema messages and
+on the schemaless variant, and reports bytes per event on the wire:
+
+    python benchmark_decoder.py --events 200000 --batch-size 1000
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Callable, List, Sequence
+
+from debezium_decoder import EnvelopeDecoder
+from debezium_events import decode_change, make_change_event, with_schema
+
+
+def make_messages(count: int, schemas: bool, seed: int = 0) -> List[bytes]:
+    """Serializes synthetic envelopes the way JsonConverter does (compact separators)."""
+    rng = random.Random(seed)
+    messages = []
+    for i in range(count):
+        envelope = make_change_event(
+            rng.choice("ccccud"),
+            rng.choice(["AAPL", "GOOG", "MSFT", "AMZN", "TSLA"]),
+            round(rng.uniform(50, 500), 2),
+            1.7e9 + i * 0.001,
+            stock_purchase_choice=rng.choice(["BUY", "SELL"]),
+        )
+        messages.append(json.dumps(with_schema(envelope) if schemas else envelope, separators=(",", ":")).encode())
+    return messages
+
+
+def time_batches(decode: Callable[[Sequence[bytes]], object], messages: List[bytes], batch_size: int) -> float:
+    """Events/sec for decode over the messages in batches of batch_size."""
+    decode(messages[:batch_size])  # warm-up
+    started = time.perf_counter()
+    for start in range(0, len(messages), batch_size):
+        decode(messages[start:start + batch_size])
+    return len(messages) / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Debezium stock_trades decoders")
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Messages per poll")
+    args = parser.parse_args()
+
+    embedded = make_messages(args.events, schemas=True)
+    schemaless = make_messages(args.events, schemas=False)
+    decoder = EnvelopeDecoder()
+
+    cases = [
+        ("json.loads per message", embedded, lambda batch: [json.loads(v) for v in batch]),
+        ("decode_change per message", embedded, lambda batch: [decode_change(v) for v in batch]),
+        ("EnvelopeDecoder.decode_batch", embedded, decoder.decode_batch),
+        ("json.loads per message", schemaless, lambda batch: [json.loads(v) for v in batch]),
+        ("decode_change per message", schemaless, lambda batch: [decode_change(v) for v in batch]),
+        ("EnvelopeDecoder.decode_batch", schemaless, decoder.decode_batch),
+    ]
+
+    baseline = None
+    print(f"{args.events:,} events, batches of {args.batch_size}")
+    print(f"{'payload':<12} {'decoder':<30} {'bytes/event':>12} {'events/s':>12} {'vs baseline':>12}")
+    for name, messages, decode in cases:
+        rate = time_batches(decode, messages, args.batch_size)
+        baseline = baseline or rate
+        payload = "schemas" if messages is embedded else "schemaless"
+        size = sum(map(len, messages)) / len(messages)
+        print(f"{payload:<12} {name:<30} {size:>12,.0f} {rate:>12,.0f} {rate / baseline:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
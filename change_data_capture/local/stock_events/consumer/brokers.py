@@ -0,0 +1,281 @@
+"""
+Message broker adapters for the stock_events consumers.
+
+Both brokers expose the same small async surface:
+
+- ``consume(topic)`` yields ``Message`` objects in offset order.
+- ``consume_batches(topic, offsets, max_records, timeout)`` yields lists of
+  up to ``max_records`` messages, starting at explicit per-partition offsets
+  with nothing committed by the broker, for consumers that checkpoint
+  offsets themselves.
+- ``produce(topic, key, value)`` publishes one message.
+
+``KafkaBroker`` talks to the Kafka service from docker-compose via aiokafka.
+Its ``consume_batches`` waits for the topic to exist (Debezium creates it on
+the connector's first event) and picks up partitions added later.
+``InMemoryBroker`` keeps each topic as an in-process log, so consumers can
+be exercised and benchmarked without Docker.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+
+@dataclass
+class Message:
+    """A single record read from a topic."""
+
+    topic: str
+    partition: int
+    offset: int
+    key: Optional[bytes]
+    value: Optional[bytes]
+
+
+def encode_json(value: Any) -> bytes:
+    """Serialize a message value the way Kafka Connect's JsonConverter does."""
+    return json.dumps(value, separators=(",", ":"), default=str).encode()
+
+
+# -- In-Memory Broker --
+class InMemoryBroker:
+    """
+    Single-partition, in-process stand-in for Kafka.
+
+    Each topic is an append-only list; consumers follow it from an offset and
+    wait on a condition when they reach the end. ``close()`` wakes every
+    consumer and makes it stop once it has drained the log.
+    """
+
+    def __init__(self) -> None:
+        self._topics: Dict[str, List[Message]] = {}
+        self._changed = asyncio.Condition()
+        self._closed = False
+
+    def log(self, topic: str) -> List[Message]:
+        """
+        Returns every message written to a topic so far.
+
+        Args:
+            topic (str): Topic name.
+
+        Returns:
+            List[Message]: Messages in offset order.
+        """
+        return self._topics.setdefault(topic, [])
+
+    def append(self, topic: str, key: Optional[bytes], value: Optional[bytes]) -> Message:
+        """
+        Appends a message without waking consumers; use for preloading fixtures.
+
+        Args:
+            topic (str): Topic name.
+            key (Optional[bytes]): Message key.
+            value (Optional[bytes]): Message value.
+
+        Returns:
+            Message: The stored message.
+        """
+        messages = self.log(topic)
+        message = Message(topic, 0, len(messages), key, value)
+        messages.append(message)
+        return message
+
+    async def produce(self, topic: str, key: Optional[bytes], value: Optional[bytes]) -> None:
+        self.append(topic, key, value)
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def consume(self, topic: str, offset: int = 0) -> AsyncIterator[Message]:
+        messages = self.log(topic)
+        while True:
+            while offset < len(messages):
+                yield messages[offset]
+                offset += 1
+            if self._closed:
+                return
+            async with self._changed:
+                await self._changed.wait_for(lambda: offset < len(messages) or self._closed)
+
+    async def consume_batches(
+        self, topic: str, offsets: Optional[Dict[int, int]] = None, max_records: int = 500, timeout: float = 0.5
+    ) -> AsyncIterator[List[Message]]:
+        """
+        Yields whatever is available from the next offset, up to max_records at a time.
+
+        Args:
+            topic (str): Topic name.
+            offsets (Optional[Dict[int, int]]): Next offset per partition (only partition 0 exists).
+            max_records (int): Most messages per batch.
+            timeout (float): Unused; an empty log waits for the next produce instead.
+        """
+        offset = (offsets or {}).get(0, 0)
+        messages = self.log(topic)
+        while True:
+            if offset < len(messages):
+                batch = messages[offset:offset + max_records]
+                offset += len(batch)
+                yield batch
+                continue
+            if self._closed:
+                return
+            async with self._changed:
+                await self._changed.wait_for(lambda: offset < len(messages) or self._closed)
+
+    async def close(self) -> None:
+        self._closed = True
+        async with self._changed:
+            self._changed.notify_all()
+
+
+# -- Kafka Broker --
+class KafkaBroker:
+    """
+    aiokafka-backed broker for the docker-compose Kafka service.
+
+    Args:
+        bootstrap_servers (str): e.g. ``localhost:9092`` from the host.
+        group_id (Optional[str]): Consumer group; offsets are committed by aiokafka.
+        auto_offset_reset (str): Where a new group starts reading.
+        topic_wait (float): Seconds ``consume_batches`` waits for its topic to exist.
+        metadata_refresh (float): Seconds between metadata refreshes that look
+            for the topic and for new partitions.
+    """
+
+    def __init__(
+        self,
+        bootstrap_servers: str = "localhost:9092",
+        group_id: Optional[str] = None,
+        auto_offset_reset: str = "earliest",
+        topic_wait: float = 300.0,
+        metadata_refresh: float = 10.0,
+    ) -> None:
+        self.bootstrap_servers = bootstrap_servers
+        self.group_id = group_id
+        self.auto_offset_reset = auto_offset_reset
+        self.topic_wait = topic_wait
+        self.metadata_refresh = metadata_refresh
+        self._producer = None
+
+    async def produce(self, topic: str, key: Optional[bytes], value: Optional[bytes]) -> None:
+        if self._producer is None:
+            from aiokafka import AIOKafkaProducer
+
+            self._producer = AIOKafkaProducer(bootstrap_servers=self.bootstrap_servers, linger_ms=5)
+            await self._producer.start()
+        await self._producer.send(topic, key=key, value=value)
+
+    async def consume(self, topic: str) -> AsyncIterator[Message]:
+        from aiokafka import AIOKafkaConsumer
+
+        consumer = AIOKafkaConsumer(
+            topic,
+            bootstrap_servers=self.bootstrap_servers,
+            group_id=self.group_id,
+            auto_offset_reset=self.auto_offset_reset,
+        )
+        await consumer.start()
+        try:
+            async for record in consumer:
+                yield Message(record.topic, record.partition, record.offset, record.key, record.value)
+        finally:
+            await consumer.stop()
+
+    async def consume_batches(
+        self, topic: str, offsets: Optional[Dict[int, int]] = None, max_records: int = 500, timeout: float = 0.5
+    ) -> AsyncIterator[List[Message]]:
+        """
+        Polls every partition of a topic with manual assignment and no auto-commit.
+
+        Partitions with a checkpoint are sought to it; the rest start at
+        ``auto_offset_reset``. Without a consumer group there is no rebalancing,
+        so run one such consumer per topic. Partitions that appear later are
+        added to the assignment on the next metadata refresh.
+
+        Args:
+            topic (str): Topic name.
+            offsets (Optional[Dict[int, int]]): Next offset per partition.
+            max_records (int): Most messages per poll.
+            timeout (float): Seconds a poll waits for records.
+
+        Raises:
+            TimeoutError: The topic still has no partitions after ``topic_wait`` seconds.
+        """
+        from aiokafka import AIOKafkaConsumer
+
+        # The client refreshes the metadata behind partitions_for_topic every metadata_max_age_ms
+        consumer = AIOKafkaConsumer(
+            bootstrap_servers=self.bootstrap_servers,
+            enable_auto_commit=False,
+            auto_offset_reset=self.auto_offset_reset,
+            metadata_max_age_ms=int(self.metadata_refresh * 1000),
+        )
+        await consumer.start()
+        try:
+            partitions = await self._wait_for_partitions(consumer, topic)
+            await self._assign(consumer, topic, partitions, offsets)
+            next_refresh = time.monotonic() + self.metadata_refresh
+
+            while True:
+                records = await consumer.getmany(timeout_ms=int(timeout * 1000), max_records=max_records)
+                batch = [
+                    Message(record.topic, record.partition, record.offset, record.key, record.value)
+                    for partition_records in records.values()
+                    for record in partition_records
+                ]
+                if batch:
+                    yield batch
+
+                if time.monotonic() >= next_refresh:
+                    next_refresh = time.monotonic() + self.metadata_refresh
+                    added = (consumer.partitions_for_topic(topic) or set()) - partitions
+                    if added:
+                        logging.info(f"Topic {topic} gained partitions {sorted(added)}; adding them to the assignment")
+                        partitions |= added
+                        await self._assign(consumer, topic, partitions, offsets)
+        finally:
+            await consumer.stop()
+
+    async def _wait_for_partitions(self, consumer, topic: str) -> set:
+        deadline = time.monotonic() + self.topic_wait
+        attempt = 0
+        while True:
+            partitions = consumer.partitions_for_topic(topic)
+            if partitions:
+                return set(partitions)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Topic {topic} has no partitions after {self.topic_wait:.0f}s; "
+                                   f"is the Debezium connector registered?")
+            attempt += 1
+            logging.warning(f"Topic {topic} not found (attempt {attempt}); "
+                            f"retrying for another {remaining:.0f}s")
+            await asyncio.sleep(min(self.metadata_refresh, remaining))
+
+    @staticmethod
+    async def _assign(consumer, topic: str, partitions: set, offsets: Optional[Dict[int, int]]) -> None:
+        """
+        Assigns partitions, keeping the positions of ones already assigned.
+
+        assign() replaces the whole assignment, so current positions are read
+        first and sought back. New partitions start at their checkpoint, or at
+        auto_offset_reset without one.
+        """
+        from aiokafka import TopicPartition
+
+        positions = {tp.partition: await consumer.position(tp) for tp in consumer.assignment()}
+        assigned = [TopicPartition(topic, p) for p in sorted(partitions)]
+        consumer.assign(assigned)
+        for partition in assigned:
+            start = positions.get(partition.partition, (offsets or {}).get(partition.partition))
+            if start is not None:
+                consumer.seek(partition, start)
+
+    async def close(self) -> None:
+        if self._producer is not None:
+            await self._producer.stop()
+            self._producer = None
@@ -0,0 +1,397 @@
+"""
+Checkpointed, batched consumer for the ``cdc.public.stock_trades`` topic.
+
+``CheckpointedConsumer`` runs two tasks joined by a bounded queue:
+
+- The fetch task polls the broker in batches (``consume_batches``), starting
+  from the offsets in a checkpoint store.
+- The apply task hands each batch to a sink. Once the sink succeeds, it
+  commits the next offsets.
+
+When the sink falls behind, the queue fills and the fetch task blocks on
+``put``. Memory therefore stays under ``queue_batches * max_records``
+messages, whatever the topic's backlog. Offsets are never committed ahead
+of the sink. After a crash, the consumer resumes at the last committed
+batch and replays at most the batches that were in flight.
+
+Replayed messages are delivered again, so exactly-once results need a sink
+that recognises them. ``TradeMirrorSink`` mirrors the table into SQLite. It
+records the last applied offset per partition in the same transaction as
+the rows and skips anything at or below it, so a replay changes nothing.
+
+Offline, with a crash injected part-way and a restart from the checkpoint:
+
+    python checkpointed_consumer.py --demo-events 200000 --fail-at-batch 150
+
+Against Kafka from docker-compose:
+
+    python checkpointed_consumer.py --bootstrap-servers localhost:9092 --mirror trades_mirror.db
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+from brokers import InMemoryBroker, KafkaBroker, Message, encode_json
+from checkpoints import FileCheckpointStore, SQLiteCheckpointStore
+from debezium_decoder import EnvelopeDecoder
+from debezium_events import make_change_event
+
+# -- Logger Setup --
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+SOURCE_TOPIC = "cdc.public.stock_trades"
+DEFAULT_GROUP = "stock-trades-mirror"
+
+
+def next_offsets(batch: List[Message]) -> Dict[int, int]:
+    """Next offset to read per partition after a batch."""
+    offsets: Dict[int, int] = {}
+    for message in batch:
+        offsets[message.partition] = max(offsets.get(message.partition, 0), message.offset + 1)
+    return offsets
+
+
+# -- Consumer --
+class CheckpointedConsumer:
+    """
+    Fetch/apply pipeline that commits offsets only after the sink succeeds.
+
+    Args:
+        broker: InMemoryBroker or KafkaBroker.
+        sink: Object with ``async apply(batch: List[Message])``.
+        store: SQLiteCheckpointStore or FileCheckpointStore.
+        topic (str): Topic to consume.
+        group (str): Name the checkpoints are stored under.
+        max_records (int): Most messages per fetched batch.
+        queue_batches (int): Batches buffered between fetch and apply.
+        poll_timeout (float): Seconds a poll waits for records.
+        max_retries (int): Sink retries per batch before the consumer stops.
+        retry_backoff (float): First retry delay in seconds, doubled per retry.
+    """
+
+    def __init__(
+        self,
+        broker,
+        sink,
+        store,
+        topic: str = SOURCE_TOPIC,
+        group: str = DEFAULT_GROUP,
+        max_records: int = 500,
+        queue_batches: int = 8,
+        poll_timeout: float = 0.5,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+    ) -> None:
+        self.broker = broker
+        self.sink = sink
+        self.store = store
+        self.topic = topic
+        self.group = group
+        self.max_records = max_records
+        self.queue_batches = queue_batches
+        self.poll_timeout = poll_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.counts: Dict[str, int] = {"messages": 0, "batches": 0, "retries": 0, "max_queued": 0}
+
+    async def _fetch(self, queue: asyncio.Queue, offsets: Dict[int, int]) -> None:
+        # The sentinel tells the applier to stop; a cancelled fetch (the applier
+        # already stopped) must not block on a full queue to send it
+        try:
+            async for batch in self.broker.consume_batches(self.topic, offsets, self.max_records, self.poll_timeout):
+                await queue.put(batch)
+                self.counts["max_queued"] = max(self.counts["max_queued"], queue.qsize())
+        except Exception:
+            await queue.put(None)
+            raise
+        await queue.put(None)
+
+    async def _apply(self, batch: List[Message]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.sink.apply(batch)
+                break
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                self.counts["retries"] += 1
+                delay = self.retry_backoff * 2 ** attempt
+                logging.warning(f"Sink failed on offsets {batch[0].offset}-{batch[-1].offset}: {e}; "
+                                f"retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        await asyncio.to_thread(self.store.commit, self.group, self.topic, next_offsets(batch))
+
+    async def run(self, log_every: float = 10.0) -> None:
+        """Consumes until the broker stops; a sink failure past its retries is raised."""
+        offsets = await asyncio.to_thread(self.store.load, self.group, self.topic)
+        logging.info(f"Starting {self.group} on {self.topic} from offsets {offsets or 'reset policy'}")
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_batches)
+        fetcher = asyncio.create_task(self._fetch(queue, offsets))
+        started = last_log = time.perf_counter()
+        last_messages = 0
+        try:
+            while True:
+                batch = await queue.get()
+                if batch is None:
+                    break
+                await self._apply(batch)
+                self.counts["messages"] += len(batch)
+                self.counts["batches"] += 1
+
+                now = time.perf_counter()
+                if now - last_log >= log_every:
+                    rate = (self.counts["messages"] - last_messages) / (now - last_log)
+                    logging.info(f"{self.counts['messages']} messages ({rate:,.0f}/s), "
+                                 f"{self.counts['batches']} batches, queue {queue.qsize()}/{self.queue_batches}")
+                    last_log, last_messages = now, self.counts["messages"]
+            await fetcher
+        finally:
+            fetcher.cancel()
+            await asyncio.gather(fetcher, return_exceptions=True)
+
+        elapsed = time.perf_counter() - started
+        logging.info(f"Stopped after {self.counts['messages']} messages in {elapsed:.2f}s "
+                     f"({self.counts['retries']} retries)")
+
+
+# -- Idempotent Sink --
+class TradeMirrorSink:
+    """
+    Mirrors stock_trades into an SQLite table, exactly once per message.
+
+    Each batch is decoded into columns and collapsed to the last change per
+    trade. The upserts, the deletes and the new high-water offset per
+    partition are then written in one transaction. Messages at or below the
+    stored high-water mark were already applied and are skipped.
+
+    Args:
+        path (str): SQLite database file.
+        decimal_mode (str): The connector's ``decimal.handling.mode``.
+    """
+
+    def __init__(self, path: str, decimal_mode: str = "precise") -> None:
+        self.path = path
+        self.decoder = EnvelopeDecoder(decimal_mode)
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS stock_trades (
+                trade_id TEXT PRIMARY KEY,
+                stock_name TEXT NOT NULL,
+                stock_price REAL NOT NULL,
+                stock_purchase_choice TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                ts_ms INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS applied_offsets (
+                topic TEXT NOT NULL,
+                partition INTEGER NOT NULL,
+                last_offset INTEGER NOT NULL,
+                PRIMARY KEY (topic, partition)
+            );
+            """
+        )
+        self.connection.commit()
+        self.skipped = 0
+
+    async def apply(self, batch: List[Message]) -> None:
+        await asyncio.to_thread(self._apply, batch)
+
+    def _apply(self, batch: List[Message]) -> None:
+        with self._lock, self.connection:
+            applied = dict(self.connection.execute(
+                "SELECT partition, last_offset FROM applied_offsets WHERE topic = ?", (batch[0].topic,)
+            ).fetchall())
+            fresh = [m for m in batch if m.offset > applied.get(m.partition, -1)]
+            self.skipped += len(batch) - len(fresh)
+            if not fresh:
+                return
+
+            rows = self.decoder.decode_batch([m.value for m in fresh])
+            latest = {}
+            for row in rows.tolist():
+                latest[row[1]] = row  # (op, trade_id, stock_name, price, choice, event_time, ts_ms)
+            self.connection.executemany(
+                """
+                INSERT INTO stock_trades (trade_id, stock_name, stock_price, stock_purchase_choice, created_at, ts_ms)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (trade_id) DO UPDATE SET
+                    stock_name = excluded.stock_name,
+                    stock_price = excluded.stock_price,
+                    stock_purchase_choice = excluded.stock_purchase_choice,
+                    created_at = excluded.created_at,
+                    ts_ms = excluded.ts_ms
+                """,
+                [row[1:] for row in latest.values() if row[0] != "d"],
+            )
+            self.connection.executemany(
+                "DELETE FROM stock_trades WHERE trade_id = ?",
+                [(row[1],) for row in latest.values() if row[0] == "d"],
+            )
+            self.connection.executemany(
+                """
+                INSERT INTO applied_offsets (topic, partition, last_offset) VALUES (?, ?, ?)
+                ON CONFLICT (topic, partition) DO UPDATE SET last_offset = excluded.last_offset
+                """,
+                [(batch[0].topic, partition, offset - 1) for partition, offset in next_offsets(fresh).items()],
+            )
+
+    def trades(self) -> Dict[str, tuple]:
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT trade_id, stock_name, stock_price, stock_purchase_choice FROM stock_trades"
+            ).fetchall()
+        return {row[0]: row[1:] for row in rows}
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+# -- Demo: throughput and crash recovery against the in-memory broker --
+class FailingSink:
+    """Wraps a sink and raises once it reaches a given batch, like a process crash."""
+
+    def __init__(self, sink, fail_at_batch: int) -> None:
+        self.sink = sink
+        self.fail_at_batch = fail_at_batch
+        self.batches = 0
+
+    async def apply(self, batch: List[Message]) -> None:
+        self.batches += 1
+        if self.batches == self.fail_at_batch:
+            # Apply first, then fail before the commit: the worst case for replays
+            await self.sink.apply(batch)
+            raise RuntimeError(f"injected failure at batch {self.batches}")
+        await self.sink.apply(batch)
+
+
+def trade_events(count: int, seed: int = 0) -> List[bytes]:
+    """Inserts, updates and deletes over a pool of live trade ids."""
+    rng = random.Random(seed)
+    live: List[str] = []
+    values = []
+    for i in range(count):
+        op = "c" if len(live) < 10 else rng.choices(["c", "u", "d"], weights=[0.6, 0.2, 0.2])[0]
+        if op == "c":
+            envelope = make_change_event("c", rng.choice(["AAPL", "GOOG", "MSFT"]), round(rng.uniform(50, 500), 2),
+                                         1.7e9 + i)
+            live.append(envelope["after"]["trade_id"])
+        else:
+            index = rng.randrange(len(live))
+            trade_id = live[index]
+            if op == "d":
+                live[index] = live[-1]
+                live.pop()
+            envelope = make_change_event(op, "AAPL", round(rng.uniform(50, 500), 2), 1.7e9 + i, trade_id=trade_id)
+        values.append(encode_json(envelope))
+    return values
+
+
+def expected_state(values: List[bytes]) -> Dict[str, tuple]:
+    """The mirror's correct final contents, by replaying every event in order."""
+    state: Dict[str, tuple] = {}
+    for row in EnvelopeDecoder().decode_batch(values).tolist():
+        if row[0] == "d":
+            state.pop(row[1], None)
+        else:
+            state[row[1]] = (row[2], row[3], row[4])
+    return state
+
+
+async def run_demo(events: int, fail_at_batch: Optional[int], max_records: int, queue_batches: int) -> bool:
+    values = trade_events(events)
+    directory = tempfile.mkdtemp(prefix="checkpointed_consumer_")
+    store = SQLiteCheckpointStore(os.path.join(directory, "checkpoints.db"))
+    sink = TradeMirrorSink(os.path.join(directory, "mirror.db"))
+
+    async def consume(wrapped_sink) -> None:
+        broker = InMemoryBroker()
+        for value in values:
+            broker.append(SOURCE_TOPIC, None, value)
+        await broker.close()
+        consumer = CheckpointedConsumer(broker, wrapped_sink, store, max_records=max_records,
+                                        queue_batches=queue_batches, max_retries=0)
+        await consumer.run()
+        logging.info(f"Largest queue depth: {consumer.counts['max_queued']}/{queue_batches} batches")
+
+    started = time.perf_counter()
+    if fail_at_batch:
+        try:
+            await consume(FailingSink(sink, fail_at_batch))
+        except RuntimeError as e:
+            logging.info(f"Consumer stopped: {e}; restarting from {store.load(DEFAULT_GROUP, SOURCE_TOPIC)}")
+    await consume(sink)
+    elapsed = time.perf_counter() - started
+
+    matches = sink.trades() == expected_state(values)
+    logging.info(f"{events / elapsed:,.0f} events/s; {sink.skipped} replayed messages skipped; "
+                 f"mirror {'matches' if matches else 'DOES NOT match'} the source "
+                 f"({len(sink.trades())} live trades)")
+    sink.close()
+    store.close()
+    return matches
+
+
+# -- CLI Entry Point --
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Checkpointed stock_trades CDC consumer")
+    parser.add_argument("--bootstrap-servers", default="localhost:9092", help="Kafka bootstrap servers")
+    parser.add_argument("--topic", default=SOURCE_TOPIC, help="Debezium change topic")
+    parser.add_argument("--group", default=DEFAULT_GROUP, help="Name checkpoints are stored under")
+    parser.add_argument("--mirror", default="trades_mirror.db", help="SQLite file for the mirrored table")
+    parser.add_argument("--checkpoints", default="checkpoints.db",
+                        help="Checkpoint store: an SQLite file, or a .json file for the file store")
+    parser.add_argument("--max-records", type=int, default=500, help="Most messages per batch")
+    parser.add_argument("--queue-batches", type=int, default=8, help="Batches buffered between fetch and apply")
+    parser.add_argument("--decimal-mode", choices=["precise", "double", "string"], default="precise",
+                        help="The connector's decimal.handling.mode")
+    parser.add_argument("--demo-events", type=int, default=None,
+                        help="Run on this many synthetic events through the in-memory broker instead of Kafka")
+    parser.add_argument("--fail-at-batch", type=int, default=None,
+                        help="Demo only: crash at this batch, then restart from the checkpoint")
+    args = parser.parse_args()
+
+    if args.demo_events:
+        matches = asyncio.run(run_demo(args.demo_events, args.fail_at_batch, args.max_records, args.queue_batches))
+        raise SystemExit(0 if matches else 1)
+
+    if args.checkpoints.endswith(".json"):
+        store = FileCheckpointStore(args.checkpoints)
+    else:
+        store = SQLiteCheckpointStore(args.checkpoints)
+    sink = TradeMirrorSink(args.mirror, args.decimal_mode)
+    consumer = CheckpointedConsumer(
+        KafkaBroker(args.bootstrap_servers),
+        sink,
+        store,
+        topic=args.topic,
+        group=args.group,
+        max_records=args.max_records,
+        queue_batches=args.queue_batches,
+    )
+    try:
+        asyncio.run(consumer.run())
+    except KeyboardInterrupt:
+        logging.info("Consumer stopped by user.")
+    finally:
+        sink.close()
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
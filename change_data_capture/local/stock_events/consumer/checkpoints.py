@@ -0,0 +1,138 @@
+"""
+Offset checkpoint stores for checkpointed_consumer.py.
+
+A checkpoint is the next offset to read for each partition of a topic, kept
+per consumer group. ``commit`` only ever moves an offset forward, so
+committing the same or an older batch again (a replay after a crash) leaves
+the checkpoint as it was.
+
+- ``SQLiteCheckpointStore`` keeps checkpoints in a table, committed in one
+  transaction per batch.
+- ``FileCheckpointStore`` keeps them in a JSON file, replaced atomically.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from typing import Dict
+
+
+class SQLiteCheckpointStore:
+    """
+    Checkpoints in an SQLite table (WAL mode, so readers never block commits).
+
+    Args:
+        path (str): Database file; ``:memory:`` works for tests.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS consumer_checkpoints (
+                consumer_group TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                partition INTEGER NOT NULL,
+                next_offset INTEGER NOT NULL,
+                PRIMARY KEY (consumer_group, topic, partition)
+            )
+            """
+        )
+        self.connection.commit()
+
+    def load(self, group: str, topic: str) -> Dict[int, int]:
+        """
+        Returns the next offset per partition, empty when nothing was committed.
+
+        Args:
+            group (str): Consumer group.
+            topic (str): Topic name.
+
+        Returns:
+            Dict[int, int]: partition -> next offset to read.
+        """
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT partition, next_offset FROM consumer_checkpoints WHERE consumer_group = ? AND topic = ?",
+                (group, topic),
+            ).fetchall()
+        return dict(rows)
+
+    def commit(self, group: str, topic: str, offsets: Dict[int, int]) -> None:
+        """
+        Advances checkpoints to the given next offsets; never moves one backwards.
+
+        Args:
+            group (str): Consumer group.
+            topic (str): Topic name.
+            offsets (Dict[int, int]): partition -> next offset to read.
+        """
+        with self._lock, self.connection:
+            self.connection.executemany(
+                """
+                INSERT INTO consumer_checkpoints (consumer_group, topic, partition, next_offset)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (consumer_group, topic, partition)
+                DO UPDATE SET next_offset = max(next_offset, excluded.next_offset)
+                """,
+                [(group, topic, partition, offset) for partition, offset in offsets.items()],
+            )
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class FileCheckpointStore:
+    """
+    Checkpoints in a JSON file, rewritten through a temp file and ``os.replace``.
+
+    A crash mid-write leaves the previous file intact. Suited to one consumer
+    per file.
+
+    Args:
+        path (str): JSON file, created on first commit.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Dict[str, int]]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def load(self, group: str, topic: str) -> Dict[int, int]:
+        with self._lock:
+            stored = self._read().get(f"{group}/{topic}", {})
+        return {int(partition): offset for partition, offset in stored.items()}
+
+    def commit(self, group: str, topic: str, offsets: Dict[int, int]) -> None:
+        with self._lock:
+            checkpoints = self._read()
+            stored = checkpoints.setdefault(f"{group}/{topic}", {})
+            for partition, offset in offsets.items():
+                stored[str(partition)] = max(stored.get(str(partition), 0), offset)
+
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(checkpoints, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+    def close(self) -> None:
+        pass
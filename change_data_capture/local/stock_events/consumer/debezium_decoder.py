@@ -0,0 +1,197 @@
+"""
+Batch decoder for Debezium ``stock_trades`` change events.
+
+``debezium_events.decode_change`` parses one message into one dataclass. For
+a poll of thousands of messages, ``EnvelopeDecoder.decode_batch`` returns one
+NumPy record array with a row per change instead:
+
+- Messages with embedded schemas (``stock_trades.json``) share a byte-identical
+  ``{"schema": ..., "payload":`` prefix. The decoder parses that schema once,
+  builds its field decoders from it (decimal scale, timestamp logical type)
+  and caches it by prefix. Every later message is checked with
+  ``startswith`` and only its payload is parsed.
+- Schemaless messages (``stock_trades_schemaless.json``) use a default plan
+  matching the table, selected by ``decimal_mode``.
+- All payloads of a batch are parsed with one ``json.loads`` call. Timestamps
+  are converted as one NumPy ``datetime64`` array rather than per message.
+"""
+
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from debezium_events import OPERATIONS, PRICE_SCALE
+
+BATCH_DTYPE = np.dtype([
+    ("op", "U1"),
+    ("trade_id", "U36"),
+    ("stock_name", "U8"),
+    ("stock_price", "f8"),
+    ("stock_purchase_choice", "U4"),
+    ("event_time", "f8"),
+    ("ts_ms", "i8"),
+])
+
+PAYLOAD_KEY = b'"payload":'
+ZONED_TIMESTAMP = "io.debezium.time.ZonedTimestamp"
+MICRO_TIMESTAMP = "io.debezium.time.MicroTimestamp"
+DECIMAL = "org.apache.kafka.connect.data.Decimal"
+
+
+@dataclass(frozen=True)
+class FieldPlan:
+    """How to decode the price and timestamp columns of one schema."""
+
+    decimal_mode: str = "precise"
+    price_scale: int = PRICE_SCALE
+    timestamp: str = ZONED_TIMESTAMP
+
+    @classmethod
+    def from_schema(cls, schema: Dict[str, Any], decimal_mode: str = "precise") -> "FieldPlan":
+        """
+        Reads the price and created_at encodings from an embedded Connect schema.
+
+        Args:
+            schema (Dict[str, Any]): The envelope's ``"schema"`` object.
+            decimal_mode (str): Fallback when the price is not a Connect Decimal.
+
+        Returns:
+            FieldPlan: Decoders for this schema.
+        """
+        row = next((f for f in schema.get("fields", []) if f.get("field") == "after"), {})
+        fields = {f.get("field"): f for f in row.get("fields", [])}
+        price = fields.get("stock_price", {})
+        created = fields.get("created_at", {})
+
+        if price.get("name") == DECIMAL:
+            mode, scale = "precise", int(price.get("parameters", {}).get("scale", PRICE_SCALE))
+        else:
+            # double / string handling modes declare a plain float64 or string
+            mode, scale = ("double" if price.get("type") == "double" else decimal_mode), PRICE_SCALE
+        return cls(mode, scale, created.get("name", ZONED_TIMESTAMP))
+
+
+def decode_prices(values: List[Any], plan: FieldPlan) -> np.ndarray:
+    if plan.decimal_mode != "precise":
+        return np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+    a2b = binascii.a2b_base64
+    unscaled = [
+        np.nan if v is None else int.from_bytes(a2b(v), "big", signed=True)
+        for v in values
+    ]
+    return np.array(unscaled, dtype=np.float64) / 10 ** plan.price_scale
+
+
+def decode_timestamps(values: List[Any], plan: FieldPlan) -> np.ndarray:
+    """Epoch seconds for a column of Debezium timestamps (NaN for nulls)."""
+    if plan.timestamp == ZONED_TIMESTAMP:
+        # Debezium renders ZonedTimestamp in UTC with a trailing 'Z'
+        stamps = np.array([v[:-1] if v else "NaT" for v in values], dtype="datetime64[us]")
+        seconds = stamps.astype(np.int64) / 1e6
+        seconds[np.isnat(stamps)] = np.nan
+        return seconds
+    raw = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    return raw / (1e6 if plan.timestamp == MICRO_TIMESTAMP else 1e3)
+
+
+class EnvelopeDecoder:
+    """
+    Decodes batches of stock_trades message values into record arrays.
+
+    Args:
+        decimal_mode (str): The connector's ``decimal.handling.mode``, used for
+            schemaless messages (embedded schemas say it themselves).
+    """
+
+    def __init__(self, decimal_mode: str = "precise") -> None:
+        self.schemaless_plan = FieldPlan(decimal_mode)
+        self._plans: Dict[bytes, FieldPlan] = {}
+        self._last_prefix: Optional[bytes] = None
+
+    def _split(self, value: bytes):
+        """(payload bytes, plan) for one message, parsing its schema only when it is new."""
+        prefix = self._last_prefix
+        if prefix is not None and value.startswith(prefix):
+            return value[len(prefix):-1], self._plans[prefix]
+        if not value.startswith(b'{"schema"'):
+            return value, self.schemaless_plan
+
+        start = value.find(PAYLOAD_KEY)
+        if start < 0:
+            return value, self.schemaless_plan
+        prefix = value[:start + len(PAYLOAD_KEY)]
+        plan = self._plans.get(prefix)
+        if plan is None:
+            schema = json.loads(prefix[:-len(PAYLOAD_KEY)].rstrip(b", \n") + b"}")["schema"]
+            plan = self._plans[prefix] = FieldPlan.from_schema(schema, self.schemaless_plan.decimal_mode)
+        self._last_prefix = prefix
+        return value[len(prefix):-1], plan
+
+    def decode_batch(self, values: Iterable[Optional[bytes]]) -> np.recarray:
+        """
+        Decodes message values into one record array (dtype BATCH_DTYPE).
+
+        Tombstones, non-row events and rows without an image are skipped, so
+        the result can be shorter than the input.
+
+        Args:
+            values (Iterable[Optional[bytes]]): Raw Kafka message values in offset order.
+
+        Returns:
+            np.recarray: One record per change, fields as in BATCH_DTYPE.
+        """
+        payloads: List[bytes] = []
+        plans: List[FieldPlan] = []
+        for value in values:
+            if not value:
+                continue
+            payload, plan = self._split(value)
+            payloads.append(payload)
+            plans.append(plan)
+        if not payloads:
+            return np.recarray(0, dtype=BATCH_DTYPE)
+
+        envelopes = json.loads(b"[" + b",".join(payloads) + b"]")
+
+        # Batches normally share one plan; otherwise decode each run of equal
+        # plans separately so rows stay in offset order
+        parts, start = [], 0
+        for end in range(1, len(plans) + 1):
+            if end == len(plans) or plans[end] != plans[start]:
+                parts.append(self._columns(envelopes[start:end], plans[start]))
+                start = end
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts).view(np.recarray)
+
+    def _columns(self, envelopes: Sequence[Dict[str, Any]], plan: FieldPlan) -> np.recarray:
+        ops, rows, ts_ms = [], [], []
+        for envelope in envelopes:
+            envelope = envelope.get("payload", envelope)
+            op = envelope.get("op")
+            if op not in OPERATIONS:
+                continue
+            row = envelope.get("before") if op == "d" else envelope.get("after")
+            if row is None:
+                continue
+            ops.append(op)
+            rows.append(row)
+            ts_ms.append(envelope.get("ts_ms") or 0)
+
+        batch = np.recarray(len(rows), dtype=BATCH_DTYPE)
+        if not rows:
+            return batch
+        batch["op"] = ops
+        batch["trade_id"] = [row["trade_id"] for row in rows]
+        batch["stock_name"] = [row.get("stock_name") or "" for row in rows]
+        batch["stock_price"] = decode_prices([row.get("stock_price") for row in rows], plan)
+        batch["stock_purchase_choice"] = [row.get("stock_purchase_choice") or "" for row in rows]
+        batch["ts_ms"] = ts_ms
+        event_time = decode_timestamps([row.get("created_at") for row in rows], plan)
+        missing = np.isnan(event_time)
+        event_time[missing] = batch["ts_ms"][missing] / 1e3
+        batch["event_time"] = event_time
+        return batch
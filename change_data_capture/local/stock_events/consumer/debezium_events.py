@@ -0,0 +1,267 @@
+"""
+Decode Debezium change events for the ``stock_trades`` table.
+
+``broker/connect_config/stock_trades.json`` sets JsonConverter on the
+connector itself, and connector-level converters do not pick up the worker's
+``schemas.enable=false``. So each message embeds the Connect schema and
+carries the envelope under ``"payload"``.
+``stock_trades_schemaless.json`` turns schemas off, and the value becomes the
+bare change envelope::
+
+    {"before": {...} | null, "after": {...} | null, "source": {...}, "op": "c", "ts_ms": ...}
+
+Both forms are accepted. Debezium's default ``decimal.handling.mode=precise`` encodes the
+``NUMERIC(12,2)`` price as base64 big-endian two's-complement bytes, and the
+``TIMESTAMPTZ`` columns as ISO-8601 strings.
+"""
+
+import base64
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, Optional, Union
+
+PRICE_SCALE = 2
+
+# Debezium op codes: create, update, delete, snapshot read
+OPERATIONS = {"c": "INSERT", "u": "UPDATE", "d": "DELETE", "r": "READ"}
+
+
+@dataclass
+class TradeChange:
+    """One row-level change to ``stock_trades``."""
+
+    op: str
+    trade_id: str
+    stock_name: str
+    stock_price: float
+    stock_purchase_choice: str
+    event_time: float
+    ts_ms: int
+
+
+def decode_decimal(
+    value: Union[str, int, float, None], scale: int = PRICE_SCALE, mode: str = "precise"
+) -> Optional[float]:
+    """
+    Decodes a Debezium decimal.
+
+    Args:
+        value: base64 string (precise mode), number (double mode) or numeric
+            string (string mode).
+        scale (int): Column scale, used for the precise encoding.
+        mode (str): The connector's ``decimal.handling.mode``; a base64 string
+            can also parse as a number, so the mode decides how strings are read.
+
+    Returns:
+        Optional[float]: The value, or None when it is null.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if mode == "precise":
+        unscaled = int.from_bytes(base64.b64decode(value), "big", signed=True)
+        return unscaled / 10 ** scale
+    return float(value)
+
+
+def decode_timestamp(value: Union[str, int, None]) -> Optional[float]:
+    """
+    Decodes a Debezium timestamp to epoch seconds.
+
+    Args:
+        value: ISO-8601 string (ZonedTimestamp) or epoch micro/milliseconds.
+
+    Returns:
+        Optional[float]: Seconds since the epoch, or None when it is null.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    # MicroTimestamp for TIMESTAMP(6) columns, Timestamp (ms) otherwise
+    return value / 1e6 if value > 1e14 else value / 1e3
+
+
+def decode_change(value: Optional[bytes], decimal_mode: str = "precise") -> Optional[TradeChange]:
+    """
+    Parses one Kafka message value into a TradeChange.
+
+    Args:
+        value (Optional[bytes]): Raw message value; tombstones are None.
+        decimal_mode (str): The connector's ``decimal.handling.mode``.
+
+    Returns:
+        Optional[TradeChange]: The change, or None for tombstones and
+        non-row events.
+    """
+    if value is None:
+        return None
+    envelope = json.loads(value)
+    envelope = envelope.get("payload", envelope)
+    op = envelope.get("op")
+    if op not in OPERATIONS:
+        return None
+
+    # Deletes only carry the before image
+    row = envelope["before"] if op == "d" else envelope["after"]
+    if row is None:
+        return None
+
+    ts_ms = envelope.get("ts_ms") or 0
+    event_time = decode_timestamp(row.get("created_at"))
+    return TradeChange(
+        op=op,
+        trade_id=row["trade_id"],
+        stock_name=row.get("stock_name"),
+        stock_price=decode_decimal(row.get("stock_price"), mode=decimal_mode),
+        stock_purchase_choice=row.get("stock_purchase_choice"),
+        event_time=event_time if event_time is not None else ts_ms / 1e3,
+        ts_ms=ts_ms,
+    )
+
+
+# -- Event Construction (fixtures and demos) --
+def encode_decimal(value: float, scale: int = PRICE_SCALE) -> str:
+    """Encodes a price the way Debezium's precise decimal mode does."""
+    unscaled = int(Decimal(str(value)).scaleb(scale).to_integral_value())
+    length = max(1, (unscaled.bit_length() + 8) // 8)
+    return base64.b64encode(unscaled.to_bytes(length, "big", signed=True)).decode()
+
+
+def make_change_event(
+    op: str,
+    stock_name: str,
+    stock_price: float,
+    event_time: float,
+    trade_id: Optional[str] = None,
+    stock_purchase_choice: str = "BUY",
+) -> Dict[str, Any]:
+    """
+    Builds a Debezium-style change envelope for one trade.
+
+    Args:
+        op (str): Debezium op code (c, u, d or r).
+        stock_name (str): Symbol.
+        stock_price (float): Trade price.
+        event_time (float): created_at as epoch seconds.
+        trade_id (Optional[str]): Primary key; a new UUID when omitted.
+        stock_purchase_choice (str): BUY or SELL.
+
+    Returns:
+        Dict[str, Any]: Envelope as JsonConverter would emit it (schemas disabled).
+    """
+    timestamp = datetime.fromtimestamp(event_time, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+    row = {
+        "trade_id": trade_id or str(uuid.uuid4()),
+        "stock_name": stock_name,
+        "stock_price": encode_decimal(stock_price),
+        "stock_purchase_choice": stock_purchase_choice,
+        "trader_id": str(uuid.uuid4()),
+        "created_at": timestamp,
+        "updated_at": timestamp,
+    }
+    ts_ms = int(event_time * 1000)
+    return {
+        "before": row if op == "d" else None,
+        "after": None if op == "d" else row,
+        "source": {
+            "version": "3.1.3.Final",
+            "connector": "postgresql",
+            "name": "cdc",
+            "ts_ms": ts_ms,
+            "snapshot": "false",
+            "db": "trading",
+            "sequence": "[null,\"24023928\"]",
+            "schema": "public",
+            "table": "stock_trades",
+            "txId": 741,
+            "lsn": 24023928,
+            "xmin": None,
+        },
+        "op": op,
+        "ts_ms": ts_ms,
+    }
+
+
+def _field(field: str, type_: str, optional: bool = False, **extra: Any) -> Dict[str, Any]:
+    return {"type": type_, "optional": optional, **extra, "field": field}
+
+
+def _row_schema(name: str) -> Dict[str, Any]:
+    uuid_type = {"name": "io.debezium.data.Uuid", "version": 1}
+    zoned = {"name": "io.debezium.time.ZonedTimestamp", "version": 1, "default": "1970-01-01T00:00:00Z"}
+    return {
+        "type": "struct",
+        "fields": [
+            _field("trade_id", "string", **uuid_type),
+            _field("stock_name", "string"),
+            _field(
+                "stock_price", "bytes", name="org.apache.kafka.connect.data.Decimal", version=1,
+                parameters={"scale": str(PRICE_SCALE), "connect.decimal.precision": "12"},
+            ),
+            _field("stock_purchase_choice", "string"),
+            _field("trader_id", "string", **uuid_type),
+            _field("created_at", "string", **zoned),
+            _field("updated_at", "string", **zoned),
+        ],
+        "optional": True,
+        "name": "cdc.public.stock_trades.Value",
+        "field": name,
+    }
+
+
+# Connect schema JsonConverter embeds in every stock_trades message when schemas are on
+ENVELOPE_SCHEMA: Dict[str, Any] = {
+    "type": "struct",
+    "fields": [
+        _row_schema("before"),
+        _row_schema("after"),
+        {
+            "type": "struct",
+            "fields": [
+                _field("version", "string"),
+                _field("connector", "string"),
+                _field("name", "string"),
+                _field("ts_ms", "int64"),
+                _field(
+                    "snapshot", "string", True, name="io.debezium.data.Enum", version=1,
+                    parameters={"allowed": "true,first,first_in_data_collection,last_in_data_collection,last,false,incremental"},
+                    default="false",
+                ),
+                _field("db", "string"),
+                _field("sequence", "string", True),
+                _field("ts_us", "int64", True),
+                _field("ts_ns", "int64", True),
+                _field("schema", "string"),
+                _field("table", "string"),
+                _field("txId", "int64", True),
+                _field("lsn", "int64", True),
+                _field("xmin", "int64", True),
+            ],
+            "optional": False,
+            "name": "io.debezium.connector.postgresql.Source",
+            "field": "source",
+        },
+        _field("transaction", "struct", True, fields=[
+            _field("id", "string"),
+            _field("total_order", "int64"),
+            _field("data_collection_order", "int64"),
+        ], name="event.block", version=1),
+        _field("op", "string"),
+        _field("ts_ms", "int64", True),
+        _field("ts_us", "int64", True),
+        _field("ts_ns", "int64", True),
+    ],
+    "optional": False,
+    "name": "cdc.public.stock_trades.Envelope",
+    "version": 2,
+}
+
+
+def with_schema(envelope: Dict[str, Any]) -> Dict[str, Any]:
+    """Wraps an envelope the way JsonConverter does with schemas enabled."""
+    return {"schema": ENVELOPE_SCHEMA, "payload": envelope}
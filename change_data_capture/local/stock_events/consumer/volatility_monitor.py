@@ -0,0 +1,570 @@
+"""
+Streaming intraday volatility monitor for the ``cdc.public.stock_trades`` topic.
+
+Every trade insert captured by Debezium is folded into a per-symbol OHLC bar.
+When a bar closes, the symbol's GARCH(1,1) conditional variance is advanced
+by one recursion step and its dispersion and regime flags are refreshed from
+a fixed-size window of recent conditional vols. The result is published to
+an output topic keyed by symbol.
+
+A bar closes when the symbol's next trade falls in a later bar, or once the
+stream's event time is a full bar past its end, so quiet symbols still
+publish. Open bars are flushed when the stream ends.
+
+Per-event work is a dict lookup plus a few comparisons; per-bar work is one
+variance update plus running-sum and sorted-window updates whose cost is
+bounded by the window length, so the monitor keeps up with
+generate_stock_events.py at thousands of ops per second.
+
+Run against Kafka from docker-compose:
+
+    python volatility_monitor.py --bootstrap-servers localhost:9092 --bar-seconds 5
+
+Or without any services, against the in-memory broker and synthetic events:
+
+    python volatility_monitor.py --demo-events 200000
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import logging
+import math
+import os
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from brokers import InMemoryBroker, KafkaBroker, encode_json
+from debezium_events import TradeChange, decode_change, make_change_event
+
+# -- Logger Setup --
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+SOURCE_TOPIC = "cdc.public.stock_trades"
+OUTPUT_TOPIC = "analytics.stock_volatility"
+
+# Insert and snapshot events are new prints; updates and deletes rewrite history
+PRICE_OPS = ("c", "r")
+# Daily fits from disp_vol_check use daily bars; a regular US session is 6.5 hours
+TRADING_DAY_SECONDS = 6.5 * 3600
+
+
+# -- Bar Aggregation --
+@dataclass
+class Bar:
+    """OHLC bar for one symbol over [start, start + bar_seconds)."""
+
+    start: float
+    open: float
+    high: float
+    low: float
+    close: float
+    trades: int = 1
+
+
+class BarAggregator:
+    """
+    Folds trades for one symbol into fixed-width time bars.
+
+    Args:
+        bar_seconds (float): Bar width in seconds of event time.
+    """
+
+    def __init__(self, bar_seconds: float) -> None:
+        self.bar_seconds = bar_seconds
+        self.current: Optional[Bar] = None
+        self.closed_until = -math.inf
+        self.late_trades = 0
+
+    def add(self, price: float, event_time: float) -> Optional[Bar]:
+        """
+        Adds one trade.
+
+        Args:
+            price (float): Trade price.
+            event_time (float): Trade time as epoch seconds.
+
+        Returns:
+            Optional[Bar]: The previous bar if this trade closed it.
+        """
+        start = event_time - event_time % self.bar_seconds
+        bar = self.current
+        if bar is not None and start == bar.start:
+            bar.high = max(bar.high, price)
+            bar.low = min(bar.low, price)
+            bar.close = price
+            bar.trades += 1
+            return None
+        if (bar is not None and start < bar.start) or start < self.closed_until:
+            # The bar this trade belongs to has already been published
+            self.late_trades += 1
+            return None
+
+        self.current = Bar(start, price, price, price, price)
+        if bar is not None:
+            self.closed_until = bar.start + self.bar_seconds
+        return bar
+
+    def close(self, before: float = math.inf) -> Optional[Bar]:
+        """
+        Closes the open bar without waiting for a trade in a later bar.
+
+        Args:
+            before (float): Only close a bar that ends at or before this event time.
+
+        Returns:
+            Optional[Bar]: The closed bar, if one was open and old enough.
+        """
+        bar = self.current
+        if bar is None or bar.start + self.bar_seconds > before:
+            return None
+        self.current = None
+        self.closed_until = bar.start + self.bar_seconds
+        return bar
+
+
+# -- Incremental Volatility State --
+class SymbolVolatility:
+    """
+    GARCH(1,1) conditional variance, dispersion and regime for one symbol.
+
+    Returns are bar-to-bar log returns in percent, as arch_model sees them.
+    Unless omega is given, it is set by variance targeting from a running
+    (Welford) estimate of the bar-return variance, so no offline fit is needed.
+
+    Args:
+        alpha (float): News impact.
+        beta (float): Persistence of past variance.
+        omega (Optional[float]): Constant term; variance targeting when None.
+        mu (float): Mean bar return in percent.
+        window (int): Bars in the dispersion/regime window.
+        quantile (float): Share of the window below the high-vol threshold.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.05,
+        beta: float = 0.9,
+        omega: Optional[float] = None,
+        mu: float = 0.0,
+        window: int = 100,
+        quantile: float = 0.75,
+    ) -> None:
+        self.alpha = alpha
+        self.beta = beta
+        self.omega = omega
+        self.mu = mu
+        self.quantile = quantile
+
+        self.last_close: Optional[float] = None
+        self.variance: Optional[float] = None
+        self.bars = 0
+
+        # Welford running moments of bar returns, for variance targeting
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+        # Window of conditional vols: insertion order, sorted copy, running sums
+        self._window: deque = deque(maxlen=window)
+        self._sorted: list = []
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+        # Mean bar return in high vs low regimes, like stocks.analyze_volatility_regimes
+        self._regime_sums = {True: 0.0, False: 0.0}
+        self._regime_counts = {True: 0, False: 0}
+
+    def _target_omega(self) -> float:
+        if self.omega is not None:
+            return self.omega
+        # Until there are two returns, target the current variance
+        sample_variance = self._m2 / (self._count - 1) if self._count > 1 else self.variance
+        return max(1 - self.alpha - self.beta, 0.0) * sample_variance
+
+    def _push_vol(self, vol: float) -> None:
+        if len(self._window) == self._window.maxlen:
+            old = self._window[0]
+            self._sum -= old
+            self._sum_sq -= old * old
+            del self._sorted[bisect.bisect_left(self._sorted, old)]
+        self._window.append(vol)
+        self._sum += vol
+        self._sum_sq += vol * vol
+        bisect.insort(self._sorted, vol)
+
+        # Re-sum once per window so rounding in the running sums cannot build up
+        self.bars += 1
+        if self.bars % self._window.maxlen == 0:
+            self._sum = math.fsum(self._window)
+            self._sum_sq = math.fsum(v * v for v in self._window)
+
+    def dispersion(self) -> float:
+        """Coefficient of variation (ddof=1) of the conditional vols in the window."""
+        n = len(self._window)
+        if n < 2:
+            return float("nan")
+        mean = self._sum / n
+        variance = max(self._sum_sq - n * mean * mean, 0.0) / (n - 1)
+        return math.sqrt(variance) / mean if mean > 0 else float("nan")
+
+    def threshold(self) -> float:
+        """High-vol threshold: the window's quantile of conditional vols."""
+        n = len(self._sorted)
+        if n == 0:
+            return float("nan")
+        # Linear interpolation, as pandas Series.quantile does
+        position = self.quantile * (n - 1)
+        lower = int(position)
+        upper = min(lower + 1, n - 1)
+        return self._sorted[lower] + (self._sorted[upper] - self._sorted[lower]) * (position - lower)
+
+    def update(self, close: float) -> Optional[Dict[str, Any]]:
+        """
+        Advances the state by one closed bar.
+
+        Args:
+            close (float): Bar close price.
+
+        Returns:
+            Optional[Dict[str, Any]]: Volatility snapshot, or None for the
+            symbol's first bar (no return yet).
+        """
+        if self.last_close is None or close <= 0 or self.last_close <= 0:
+            self.last_close = close
+            return None
+
+        log_return = 100 * math.log(close / self.last_close)
+        self.last_close = close
+
+        self._count += 1
+        delta = log_return - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (log_return - self._mean)
+
+        resid = log_return - self.mu
+        if self.variance is None:
+            self.variance = max(resid * resid, 1e-8)
+
+        # Regime of this bar is judged on the vol forecast made before it
+        bar_vol = math.sqrt(self.variance) / 100
+        threshold = self.threshold()
+        high_vol = len(self._window) > 1 and bar_vol > threshold
+        self._regime_sums[high_vol] += log_return / 100
+        self._regime_counts[high_vol] += 1
+        self._push_vol(bar_vol)
+
+        self.variance = self._target_omega() + self.alpha * resid * resid + self.beta * self.variance
+
+        return {
+            "log_return": log_return / 100,
+            "conditional_vol": bar_vol,
+            "next_conditional_vol": math.sqrt(self.variance) / 100,
+            "dispersion": self.dispersion(),
+            "high_vol_threshold": threshold,
+            "high_vol": high_vol,
+            "high_vol_return": self._regime_mean(True),
+            "low_vol_return": self._regime_mean(False),
+        }
+
+    def _regime_mean(self, high_vol: bool) -> Optional[float]:
+        count = self._regime_counts[high_vol]
+        return self._regime_sums[high_vol] / count if count else None
+
+
+def load_garch_params(state_dir: str, symbol: str, bar_seconds: float) -> Optional[Dict[str, float]]:
+    """
+    Reads fitted GARCH parameters saved by trading/disp_vol_check's ModelStateStore.
+
+    Those fits are on daily returns. alpha and beta are unit-free and carry
+    over to intraday bars. omega is a daily variance level, so it is not
+    loaded: SymbolVolatility sets it by variance targeting on the bar returns.
+    The daily mean return mu is scaled down to one bar.
+
+    Args:
+        state_dir (str): The ``--state-dir`` used by stocks.py.
+        symbol (str): Ticker.
+        bar_seconds (float): Bar width in seconds.
+
+    Returns:
+        Optional[Dict[str, float]]: alpha, beta and the per-bar mu (percent), or
+        None if the symbol has no saved state.
+    """
+    path = os.path.join(state_dir, f"{symbol}.garch.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        params = json.load(f)["params"]
+    return {
+        "alpha": params["alpha[1]"],
+        "beta": params["beta[1]"],
+        "mu": params.get("mu", 0.0) * bar_seconds / TRADING_DAY_SECONDS,
+    }
+
+
+# -- Monitor --
+class VolatilityMonitor:
+    """
+    Consumes stock_trades change events and publishes per-bar volatility.
+
+    Args:
+        broker: InMemoryBroker or KafkaBroker.
+        bar_seconds (float): Bar width in seconds.
+        window (int): Bars in the dispersion/regime window.
+        quantile (float): High-vol threshold quantile.
+        alpha (float): Default GARCH alpha for symbols without saved params.
+        beta (float): Default GARCH beta for symbols without saved params.
+        state_dir (Optional[str]): ModelStateStore directory to take fitted params from.
+        source_topic (str): Debezium topic to read.
+        output_topic (str): Topic to publish snapshots to.
+        decimal_mode (str): The connector's ``decimal.handling.mode``.
+    """
+
+    def __init__(
+        self,
+        broker,
+        bar_seconds: float = 5.0,
+        window: int = 100,
+        quantile: float = 0.75,
+        alpha: float = 0.05,
+        beta: float = 0.9,
+        state_dir: Optional[str] = None,
+        source_topic: str = SOURCE_TOPIC,
+        output_topic: str = OUTPUT_TOPIC,
+        decimal_mode: str = "precise",
+    ) -> None:
+        self.broker = broker
+        self.bar_seconds = bar_seconds
+        self.window = window
+        self.quantile = quantile
+        self.alpha = alpha
+        self.beta = beta
+        self.state_dir = state_dir
+        self.source_topic = source_topic
+        self.output_topic = output_topic
+        self.decimal_mode = decimal_mode
+
+        self.bars: Dict[str, BarAggregator] = {}
+        self.states: Dict[str, SymbolVolatility] = {}
+        # Latest event time seen, and the watermark up to which idle bars were closed
+        self.event_time = -math.inf
+        self.closed_until = -math.inf
+        self.counts: Dict[str, int] = {"events": 0, "bars": 0, "published": 0, "skipped": 0}
+
+    def _state(self, symbol: str) -> SymbolVolatility:
+        state = self.states.get(symbol)
+        if state is None:
+            params = load_garch_params(self.state_dir, symbol, self.bar_seconds) if self.state_dir else None
+            params = params or {"alpha": self.alpha, "beta": self.beta}
+            state = SymbolVolatility(window=self.window, quantile=self.quantile, **params)
+            self.states[symbol] = state
+        return state
+
+    def handle(self, change: Optional[TradeChange]) -> Optional[Dict[str, Any]]:
+        """
+        Applies one decoded change event.
+
+        Args:
+            change (Optional[TradeChange]): Decoded event; None is skipped.
+
+        Returns:
+            Optional[Dict[str, Any]]: Snapshot to publish when a bar closed.
+        """
+        self.counts["events"] += 1
+        if change is None or change.op not in PRICE_OPS or change.stock_price is None:
+            self.counts["skipped"] += 1
+            return None
+
+        self.event_time = max(self.event_time, change.event_time)
+        symbol = change.stock_name
+        aggregator = self.bars.get(symbol)
+        if aggregator is None:
+            aggregator = self.bars[symbol] = BarAggregator(self.bar_seconds)
+
+        bar = aggregator.add(change.stock_price, change.event_time)
+        if bar is None:
+            return None
+        return self._close_bar(symbol, bar)
+
+    def close_idle(self) -> List[Dict[str, Any]]:
+        """
+        Closes bars that ended a full bar before the latest event time.
+
+        A symbol's bar otherwise only closes on its next trade, so a quiet
+        symbol would never publish its last bar. The scan over symbols runs
+        once per bar of event time, not per event.
+
+        Returns:
+            List[Dict[str, Any]]: Snapshots to publish.
+        """
+        if not self.bars:
+            return []
+        watermark = self.event_time - self.bar_seconds
+        watermark -= watermark % self.bar_seconds
+        if watermark <= self.closed_until:
+            return []
+        self.closed_until = watermark
+        return self._close_open_bars(watermark)
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Closes every open bar, e.g. when the stream ends."""
+        return self._close_open_bars(math.inf)
+
+    def _close_open_bars(self, before: float) -> List[Dict[str, Any]]:
+        snapshots = []
+        for symbol, aggregator in self.bars.items():
+            bar = aggregator.close(before)
+            if bar is not None:
+                snapshot = self._close_bar(symbol, bar)
+                if snapshot is not None:
+                    snapshots.append(snapshot)
+        return snapshots
+
+    def _close_bar(self, symbol: str, bar: Bar) -> Optional[Dict[str, Any]]:
+        self.counts["bars"] += 1
+        snapshot = self._state(symbol).update(bar.close)
+        if snapshot is None:
+            return None
+        snapshot.update({
+            "symbol": symbol,
+            "bar_start": bar.start,
+            "bar_seconds": self.bar_seconds,
+            "open": bar.open,
+            "high": bar.high,
+            "low": bar.low,
+            "close": bar.close,
+            "trades": bar.trades,
+        })
+        return snapshot
+
+    async def publish(self, snapshot: Dict[str, Any]) -> None:
+        await self.broker.produce(self.output_topic, snapshot["symbol"].encode(), encode_json(snapshot))
+        self.counts["published"] += 1
+
+    async def run(self, log_every: float = 10.0) -> None:
+        """Consumes until the broker stops, logging throughput every log_every seconds."""
+        started = last_log = time.perf_counter()
+        last_events = 0
+        async for message in self.broker.consume(self.source_topic):
+            snapshot = self.handle(decode_change(message.value, self.decimal_mode))
+            if snapshot is not None:
+                await self.publish(snapshot)
+            for snapshot in self.close_idle():
+                await self.publish(snapshot)
+
+            now = time.perf_counter()
+            if now - last_log >= log_every:
+                rate = (self.counts["events"] - last_events) / (now - last_log)
+                logging.info(f"{self.counts['events']} events ({rate:,.0f}/s), {self.counts['bars']} bars, "
+                             f"{self.counts['published']} published")
+                last_log, last_events = now, self.counts["events"]
+
+        for snapshot in self.flush():
+            await self.publish(snapshot)
+        elapsed = time.perf_counter() - started
+        logging.info(f"Stopped after {self.counts['events']} events in {elapsed:.2f}s")
+
+
+# -- Demo Against the In-Memory Broker --
+def synthetic_events(
+    count: int, symbols: Iterable[str] = ("AAPL", "GOOG", "MSFT", "AMZN", "TSLA"), rate: float = 1000.0
+) -> Iterable[bytes]:
+    """
+    Generates Debezium insert/update/delete envelopes with random-walk prices.
+
+    Args:
+        count (int): Number of events.
+        symbols (Iterable[str]): Symbols to trade.
+        rate (float): Events per second of event time.
+
+    Yields:
+        bytes: Encoded message values.
+    """
+    symbols = list(symbols)
+    prices = {symbol: random.uniform(50, 500) for symbol in symbols}
+    event_time = time.time()
+    for _ in range(count):
+        symbol = random.choice(symbols)
+        prices[symbol] *= math.exp(random.gauss(0, 0.001))
+        event_time += random.expovariate(rate)
+        op = random.choices(["c", "u", "d"], weights=[0.6, 0.2, 0.2])[0]
+        yield encode_json(make_change_event(op, symbol, round(prices[symbol], 2), event_time))
+
+
+async def run_demo(events: int, bar_seconds: float, window: int) -> VolatilityMonitor:
+    broker = InMemoryBroker()
+    for value in synthetic_events(events):
+        broker.append(SOURCE_TOPIC, None, value)
+    await broker.close()
+
+    monitor = VolatilityMonitor(broker, bar_seconds=bar_seconds, window=window)
+    started = time.perf_counter()
+    await monitor.run()
+    elapsed = time.perf_counter() - started
+
+    logging.info(f"{events / elapsed:,.0f} events/s ({elapsed / events * 1e6:.1f} µs per event)")
+    for value in [m.value for m in broker.log(OUTPUT_TOPIC)[-5:]]:
+        logging.info(f"Last snapshots: {value.decode()}")
+    return monitor
+
+
+# -- CLI Entry Point --
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Streaming intraday volatility monitor for stock_trades CDC events")
+    parser.add_argument("--bootstrap-servers", default="localhost:9092", help="Kafka bootstrap servers")
+    parser.add_argument("--group-id", default="stock-volatility-monitor", help="Kafka consumer group")
+    parser.add_argument("--topic", default=SOURCE_TOPIC, help="Debezium change topic")
+    parser.add_argument("--output-topic", default=OUTPUT_TOPIC, help="Topic for volatility snapshots")
+    parser.add_argument("--bar-seconds", type=float, default=5.0, help="Bar width in seconds")
+    parser.add_argument("--window", type=int, default=100, help="Bars in the dispersion/regime window")
+    parser.add_argument("--quantile", type=float, default=0.75, help="High-vol threshold quantile")
+    parser.add_argument("--alpha", type=float, default=0.05, help="GARCH alpha for symbols without saved params")
+    parser.add_argument("--beta", type=float, default=0.9, help="GARCH beta for symbols without saved params")
+    parser.add_argument("--state-dir", default=None,
+                        help="trading/disp_vol_check model state directory to take fitted GARCH params from")
+    parser.add_argument("--decimal-mode", choices=["precise", "double", "string"], default="precise",
+                        help="The connector's decimal.handling.mode")
+    parser.add_argument("--demo-events", type=int, default=None,
+                        help="Run on this many synthetic events through the in-memory broker instead of Kafka")
+    args = parser.parse_args()
+
+    if args.demo_events:
+        asyncio.run(run_demo(args.demo_events, args.bar_seconds, args.window))
+        return
+
+    broker = KafkaBroker(args.bootstrap_servers, group_id=args.group_id)
+    monitor = VolatilityMonitor(
+        broker,
+        bar_seconds=args.bar_seconds,
+        window=args.window,
+        quantile=args.quantile,
+        alpha=args.alpha,
+        beta=args.beta,
+        state_dir=args.state_dir,
+        source_topic=args.topic,
+        output_topic=args.output_topic,
+        decimal_mode=args.decimal_mode,
+    )
+
+    async def run() -> None:
+        try:
+            await monitor.run()
+        finally:
+            await broker.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        logging.info("Monitor stopped by user.")
+
+
+if __name__ == "__main__":
+    main()
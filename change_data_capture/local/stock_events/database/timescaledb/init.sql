@@ -17,8 +17,9 @@ CREATE TABLE IF NOT EXISTS stock_trades (
 SELECT create_hypertable('stock_trades', 'created_at', if_not_exists => TRUE);
 
 -- Indexes on components of composite key
+-- (created_at DESC is already indexed by create_hypertable)
 CREATE INDEX IF NOT EXISTS idx_stock_trades_trade_id
     ON stock_trades (trade_id);
-    
-CREATE INDEX IF NOT EXISTS idx_stock_trades_created_at
-    ON stock_trades (created_at DESC);
+
+-- Chunk interval, compression, retention and the stock_trades_1m aggregate
+-- are applied by producer/manage_schema.py
@@ -0,0 +1,80 @@
+"""
+Benchmark ORM vs. Core write paths for generated stock trade events.
+
+Runs the event generator unthrottled for a fixed duration per combination of
+write path and micro-batch size and prints the achieved events/sec plus
+per-event commit latency:
+
+    python benchmark_write_paths.py --duration 30 --workers 16 --batch-sizes 1 10 100
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import Dict, List
+
+from generate_stock_events import generate_events
+from stock_events_db_access_interface import add_engine_arguments, configure_engine, settings_from_args
+from trade_writers import WRITERS
+
+
+async def run_benchmark(
+    paths: List[str], batch_sizes: List[int], duration: float, workers: int, mix: str, rate: float
+) -> List[Dict[str, float]]:
+    """
+    Runs the generator once per (write path, batch size) and collects throughput.
+
+    Args:
+        paths (List[str]): Write paths from trade_writers.WRITERS.
+        batch_sizes (List[int]): Events per transaction to try.
+        duration (float): Seconds per run.
+        workers (int): Concurrent worker sessions.
+        mix (str): Operation weights passed to the generator.
+        rate (float): Target rate; set far above what the database sustains to measure the ceiling.
+
+    Returns:
+        List[Dict[str, float]]: One row of results per run.
+    """
+    rows = []
+    for path in paths:
+        for batch_size in batch_sizes:
+            logging.info(f"Running {path} with batch size {batch_size} for {duration:.0f}s")
+            stats = await generate_events(
+                rate, workers, mix, report_every=duration, duration=duration,
+                write_path=path, batch_size=batch_size,
+            )
+            errors = sum(stats.errors.values())
+            latencies = [histogram for histogram in stats.latency.values() if histogram.total]
+            rows.append({
+                "path": path,
+                "batch_size": batch_size,
+                "events_per_sec": (stats.completed - errors) / duration,
+                "errors": errors,
+                "p50_ms": max(h.percentile(50) for h in latencies) * 1e3 if latencies else float("nan"),
+                "p99_ms": max(h.percentile(99) for h in latencies) * 1e3 if latencies else float("nan"),
+            })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark ORM vs. Core write paths")
+    parser.add_argument("--paths", nargs="+", choices=sorted(WRITERS), default=sorted(WRITERS, reverse=True))
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 10, 100])
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per run")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--mix", default="insert=0.6,update=0.2,delete=0.2")
+    parser.add_argument("--rate", type=float, default=1_000_000.0, help="Target rate (default: unthrottled)")
+    add_engine_arguments(parser)
+    args = parser.parse_args()
+    configure_engine(settings_from_args(args))
+
+    rows = asyncio.run(run_benchmark(args.paths, args.batch_sizes, args.duration, args.workers, args.mix, args.rate))
+
+    print(f"\n{'path':<6} {'batch':>6} {'events/s':>12} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for row in rows:
+        print(f"{row['path']:<6} {row['batch_size']:>6} {row['events_per_sec']:>12,.1f} "
+              f"{row['p50_ms']:>9.2f} {row['p99_ms']:>9.2f} {row['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
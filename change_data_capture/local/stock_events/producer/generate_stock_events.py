@@ -1,14 +1,35 @@
 """
 Continuously generate random stock trade events (insert, update, delete) into Postgres.
+
+``--workers`` tasks each hold their own session on the pooled engine and take
+turns from a shared token bucket, so the aggregate rate stays at ``--rate``
+regardless of query latency. The operation mix is set with ``--mix`` and
+achieved vs. target ops/sec plus per-operation latency histograms are
+reported every ``--report-every`` seconds and on exit. ``--write-path`` picks
+the ORM or Core writer and ``--batch-size`` groups events into one
+transaction (see trade_writers.py).
+
+    python generate_stock_events.py --rate 2000 --workers 16 --mix insert=0.6,update=0.2,delete=0.2
 """
 
 import asyncio
 import argparse
+import bisect
 import logging
+import math
 import random
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
-from stock_events_db_access_interface import StockTrade, get_session
+import time
+from typing import Any, Dict, List, Optional
+
+from stock_events_db_access_interface import (
+    AsyncSessionLocal,
+    add_engine_arguments,
+    configure_engine,
+    pool_metrics,
+    settings_from_args,
+    task_session,
+)
+from trade_writers import WRITERS, KeyReservoir, write_batch
 
 # -- Logger Setup --
 logging.basicConfig(
@@ -18,82 +39,245 @@ logging.basicConfig(
 )
 
 
-# -- Insert Operation --
-async def insert_trade(session: AsyncSession) -> None:
-    trade = StockTrade(
-        stock_name=random.choice(["AAPL", "GOOG", "MSFT", "AMZN", "TSLA"]),
-        stock_price=round(random.uniform(50, 500), 2),
-        stock_purchase_choice=random.choice(["BUY", "SELL"]),
-    )
-    session.add(trade)
-    await session.commit()
-    logging.info(f"Inserted: {trade.trade_id}")
+# -- Rate Control --
+class TokenBucket:
+    """
+    Shared pacing for all workers at an aggregate rate.
 
+    Each ``acquire()`` reserves the next slot on an absolute schedule
+    (start + n / rate), so time spent in queries never shifts later slots.
+    A worker that falls behind may run up to ``burst`` slots back-to-back to
+    catch up; beyond that the schedule is reset instead of bursting.
 
-# -- Update Operation --
-async def update_random_trade(session: AsyncSession) -> None:
-    query = text(
-        """
-        WITH random_trade AS (
-            SELECT trade_id, created_at FROM stock_trades ORDER BY RANDOM() LIMIT 1
-        )
-        UPDATE stock_trades
-        SET stock_price = ROUND(random() * 500 + 50, 2),
-            stock_purchase_choice = CASE stock_purchase_choice WHEN 'BUY' THEN 'SELL' ELSE 'BUY' END,
-            updated_at = NOW()
-        FROM random_trade
-        WHERE stock_trades.trade_id = random_trade.trade_id
-          AND stock_trades.created_at = random_trade.created_at
-        RETURNING stock_trades.trade_id
+    Args:
+        rate (float): Operations per second across all workers.
+        burst (int): Most slots that may be taken immediately when behind.
     """
-    )
-    result = await session.execute(query)
-    updated = result.fetchone()
-    await session.commit()
-    if updated:
-        logging.info(f"Updated: {updated[0]}")
-    else:
-        logging.info("Update skipped: no record found")
-
-
-# -- Delete Operation --
-async def delete_random_trade(session: AsyncSession) -> None:
-    query = text(
-        """
-        WITH to_delete AS (
-            SELECT trade_id, created_at FROM stock_trades ORDER BY RANDOM() LIMIT 1
-        )
-        DELETE FROM stock_trades
-        USING to_delete
-        WHERE stock_trades.trade_id = to_delete.trade_id
-          AND stock_trades.created_at = to_delete.created_at
-        RETURNING stock_trades.trade_id
+
+    def __init__(self, rate: float, burst: int = 10) -> None:
+        self.interval = 1.0 / rate
+        self.burst = burst
+        self._next: Optional[float] = None
+
+    async def acquire(self) -> None:
+        now = time.perf_counter()
+        if self._next is None or now - self._next > self.burst * self.interval:
+            self._next = now
+        slot = self._next
+        self._next += self.interval
+        delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+# -- Latency Tracking --
+class LatencyHistogram:
+    """
+    Log-spaced latency histogram (100 µs to 10 s, ~10 buckets per decade).
+
+    Recording is a bisect into fixed bucket bounds, so it stays cheap at
+    thousands of ops per second.
+    """
+
+    BOUNDS: List[float] = [10 ** (exp / 10) for exp in range(-40, 11)]
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+        self.total += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile, in seconds."""
+        if not self.total:
+            return math.nan
+        rank = math.ceil(q / 100 * self.total)
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.BOUNDS[i], self.max) if i < len(self.BOUNDS) else self.max
+        return self.max
+
+    def summary(self) -> str:
+        if not self.total:
+            return "no samples"
+        return (f"n={self.total} mean={self.sum / self.total * 1e3:.2f}ms "
+                f"p50<={self.percentile(50) * 1e3:.2f}ms p90<={self.percentile(90) * 1e3:.2f}ms "
+                f"p99<={self.percentile(99) * 1e3:.2f}ms max={self.max * 1e3:.2f}ms")
+
+    def buckets(self) -> str:
+        """Non-empty buckets as ``<=bound: count`` pairs."""
+        parts = []
+        for i, count in enumerate(self.counts):
+            if count:
+                label = f"<={self.BOUNDS[i] * 1e3:.3g}ms" if i < len(self.BOUNDS) else f">{self.BOUNDS[-1]:.0f}s"
+                parts.append(f"{label}: {count}")
+        return ", ".join(parts)
+
+
+class GeneratorStats:
+    """
+    Counts and latencies per operation type.
+
+    Only operations that were applied get a latency sample. Updates and
+    deletes with no row to target are counted in ``skipped`` and left out of
+    ``completed`` and the achieved rate.
     """
-    )
-    result = await session.execute(query)
-    deleted = result.fetchone()
-    await session.commit()
-    if deleted:
-        logging.info(f"Deleted: {deleted[0]}")
-    else:
-        logging.info("Delete skipped: no record found")
+
+    def __init__(self, operations: List[str]) -> None:
+        self.latency: Dict[str, LatencyHistogram] = {op: LatencyHistogram() for op in operations}
+        self.errors: Dict[str, int] = {op: 0 for op in operations}
+        self.skipped: Dict[str, int] = {op: 0 for op in operations}
+        self.started = time.perf_counter()
+
+    @property
+    def completed(self) -> int:
+        return sum(histogram.total for histogram in self.latency.values()) + sum(self.errors.values())
+
+    def report(self, target_rate: float, window_ops: int, window_seconds: float, detailed: bool = False) -> None:
+        elapsed = time.perf_counter() - self.started
+        logging.info(
+            f"Achieved {window_ops / window_seconds:,.1f} ops/s (last {window_seconds:.0f}s), "
+            f"{self.completed / elapsed:,.1f} ops/s overall, target {target_rate:,.1f} ops/s, "
+            f"{sum(self.skipped.values())} ops skipped with no row to target"
+        )
+        for op, histogram in self.latency.items():
+            logging.info(f"  {op:<6} {histogram.summary()} errors={self.errors[op]} skipped={self.skipped[op]}")
+            if detailed and histogram.total:
+                logging.info(f"         {histogram.buckets()}")
+        pool = pool_metrics()
+        logging.info(
+            f"  pool   checked_out={pool['checked_out']} size={pool['pool_size']} overflow={pool['overflow']} "
+            f"idle={pool['idle']} wait mean={pool['wait_mean_ms']:.2f}ms max={pool['wait_max_ms']:.2f}ms "
+            f"timeouts={pool['timeouts']}"
+        )
 
 
 # -- Event Loop --
-async def generate_events(rate: float) -> None:
-    async for session in get_session():
+OPERATIONS = ("INSERT", "UPDATE", "DELETE")
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """
+    Parses ``insert=0.6,update=0.2,delete=0.2`` into operation weights.
+
+    Args:
+        mix (str): Comma-separated op=weight pairs; omitted ops get weight 0.
+
+    Returns:
+        Dict[str, float]: Weight per operation in OPERATIONS.
+    """
+    weights = {op: 0.0 for op in OPERATIONS}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        op = name.strip().upper()
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown operation in mix: {name!r}")
+        weights[op] = float(weight)
+    if sum(weights.values()) <= 0:
+        raise ValueError("Mix weights must add up to more than 0")
+    return weights
+
+
+async def run_worker(
+    bucket: TokenBucket,
+    weights: Dict[str, float],
+    stats: GeneratorStats,
+    reservoir: KeyReservoir,
+    writer: Any,
+    batch_size: int = 1,
+) -> None:
+    operations, cum_weights = list(weights), []
+    total = 0.0
+    for op in operations:
+        total += weights[op]
+        cum_weights.append(total)
+
+    async with task_session() as session:
         while True:
-            op = random.choice(["INSERT", "UPDATE", "DELETE"])
+            # A batch is written once its last event is due; latency is measured from then
+            for _ in range(batch_size):
+                await bucket.acquire()
+            batch = random.choices(operations, cum_weights=cum_weights, k=batch_size)
+            counts = {op: batch.count(op) for op in operations}
+            started = time.perf_counter()
             try:
-                if op == "INSERT":
-                    await insert_trade(session)
-                elif op == "UPDATE":
-                    await update_random_trade(session)
-                else:
-                    await delete_random_trade(session)
+                applied = await write_batch(writer, session, reservoir, counts)
             except Exception as e:
-                logging.error(f"{op} failed: {e}")
-            await asyncio.sleep(1 / rate)
+                for op in batch:
+                    stats.errors[op] += 1
+                logging.error(f"Batch {counts} failed: {e}")
+                await session.rollback()
+                continue
+            elapsed = time.perf_counter() - started
+            for op, count in counts.items():
+                for _ in range(applied[op]):
+                    stats.latency[op].record(elapsed)
+                stats.skipped[op] += count - applied[op]
+
+
+async def generate_events(
+    rate: float,
+    workers: int = 1,
+    mix: str = "insert=1,update=1,delete=1",
+    report_every: float = 10.0,
+    duration: Optional[float] = None,
+    reservoir_size: int = 100_000,
+    write_path: str = "orm",
+    batch_size: int = 1,
+) -> GeneratorStats:
+    """
+    Runs worker tasks at an aggregate target rate until cancelled or duration expires.
+
+    Args:
+        rate (float): Target ops per second across all workers.
+        workers (int): Concurrent sessions issuing operations.
+        mix (str): Operation weights, e.g. ``insert=0.6,update=0.2,delete=0.2``.
+        report_every (float): Seconds between achieved-rate reports.
+        duration (Optional[float]): Stop after this many seconds.
+        reservoir_size (int): Primary keys kept in memory for update/delete targets.
+        write_path (str): ``orm`` or ``core`` (see trade_writers).
+        batch_size (int): Generated events written per transaction.
+
+    Returns:
+        GeneratorStats: Counts and latencies for the whole run.
+    """
+    weights = parse_mix(mix)
+    stats = GeneratorStats(list(OPERATIONS))
+    bucket = TokenBucket(rate)
+    writer = WRITERS[write_path]()
+
+    reservoir = KeyReservoir(reservoir_size)
+    async with AsyncSessionLocal() as session:
+        logging.info(f"Seeded key reservoir with {await reservoir.refill(session)} recent trades")
+
+    tasks = [asyncio.create_task(run_worker(bucket, weights, stats, reservoir, writer, batch_size)) for _ in range(workers)]
+
+    deadline = None if duration is None else time.perf_counter() + duration
+    last_ops, last_time = 0, time.perf_counter()
+    try:
+        while deadline is None or time.perf_counter() < deadline:
+            wait = report_every if deadline is None else min(report_every, deadline - time.perf_counter())
+            done, _ = await asyncio.wait(tasks, timeout=max(wait, 0), return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                task.result()
+            now = time.perf_counter()
+            stats.report(rate, stats.completed - last_ops, now - last_time)
+            last_ops, last_time = stats.completed, now
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        logging.info("Final report:")
+        stats.report(rate, stats.completed, time.perf_counter() - stats.started, detailed=True)
+    return stats
 
 
 # -- CLI Entry Point --
@@ -102,10 +286,31 @@ def main() -> None:
         description="Generate CDC stock events in real-time."
     )
     parser.add_argument("--rate", type=float, required=True, help="Ops per second")
+    parser.add_argument("--workers", type=int, default=1, help="Concurrent sessions issuing operations")
+    parser.add_argument(
+        "--mix", default="insert=1,update=1,delete=1",
+        help="Relative operation weights, e.g. insert=0.6,update=0.2,delete=0.2",
+    )
+    parser.add_argument("--report-every", type=float, default=10.0, help="Seconds between rate reports")
+    parser.add_argument("--duration", type=float, default=None, help="Stop after this many seconds")
+    parser.add_argument(
+        "--reservoir-size", type=int, default=100_000,
+        help="Primary keys kept in memory to pick update/delete targets from",
+    )
+    parser.add_argument(
+        "--write-path", choices=sorted(WRITERS), default="orm",
+        help="ORM unit of work or Core executemany statements (see trade_writers.py)",
+    )
+    parser.add_argument("--batch-size", type=int, default=1, help="Generated events written per transaction")
+    add_engine_arguments(parser)
     args = parser.parse_args()
+    configure_engine(settings_from_args(args))
 
     try:
-        asyncio.run(generate_events(args.rate))
+        asyncio.run(generate_events(
+            args.rate, args.workers, args.mix, args.report_every, args.duration, args.reservoir_size,
+            args.write_path, args.batch_size,
+        ))
     except KeyboardInterrupt:
         logging.info("Generator stopped by user.")
 
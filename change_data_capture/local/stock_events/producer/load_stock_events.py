@@ -1,19 +1,58 @@
 """
 Script to bulk insert randomly generated stock trades into a PostgreSQL database.
+
+The default mode adds one ORM object per trade and commits once at the end,
+which is fine for seeding a few hundred rows. ``--bulk`` generates trades as
+NumPy column batches and streams them through asyncpg on the engine's raw
+driver connection, committing every ``--commit-every`` chunks and reporting
+rows/sec as it goes:
+
+    python load_stock_events.py --record-count 10000000 --bulk --chunk-size 50000
 """
 
 import argparse
 import asyncio
 import random
+import time
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional
 
+import numpy as np
 from faker import Faker
 from sqlalchemy.ext.asyncio import AsyncSession
-from stock_events_db_access_interface import StockTrade, get_session
+from stock_events_db_access_interface import (
+    StockTrade,
+    add_engine_arguments,
+    configure_engine,
+    get_engine,
+    get_session,
+    settings_from_args,
+)
 
 fake = Faker()
 
+STOCK_NAMES = ["AAPL", "GOOG", "MSFT", "AMZN", "TSLA"]
+PURCHASE_CHOICES = ["BUY", "SELL"]
+COLUMNS = (
+    "trade_id",
+    "stock_name",
+    "stock_price",
+    "stock_purchase_choice",
+    "trader_id",
+    "created_at",
+    "updated_at",
+)
+
+# Multi-row insert alternative to COPY: one statement per chunk, columns as arrays
+UNNEST_INSERT = f"""
+    INSERT INTO stock_trades ({", ".join(COLUMNS)})
+    SELECT * FROM unnest(
+        $1::uuid[], $2::text[], $3::numeric[], $4::text[], $5::uuid[], $6::timestamptz[], $7::timestamptz[]
+    )
+"""
+
 
 async def insert_trade(session: AsyncSession) -> StockTrade:
     """
@@ -31,8 +70,8 @@ async def insert_trade(session: AsyncSession) -> StockTrade:
         stock_price=round(random.uniform(50, 500), 2),
         stock_purchase_choice=random.choice(["BUY", "SELL"]),
         trader_id=uuid.uuid4(),
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
+        created_at=datetime.now(timezone.utc),
+        updated_at=datetime.now(timezone.utc),
     )
     session.add(trade)
     return trade
@@ -53,6 +92,121 @@ async def load_data(record_count: int) -> None:
         print(f"Inserted {record_count} trades.")
 
 
+# -- Columnar Batch Generation --
+def _random_uuids(rng: np.random.Generator, size: int) -> List[uuid.UUID]:
+    """Version-4 UUIDs from one block of random bytes."""
+    raw = rng.integers(0, 256, (size, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    data = raw.tobytes()
+    return [uuid.UUID(bytes=data[i:i + 16]) for i in range(0, len(data), 16)]
+
+
+def generate_columns(
+    rng: np.random.Generator, size: int, start: datetime, first_row: int, step: timedelta
+) -> Dict[str, list]:
+    """
+    Generates one batch of random trades as columns.
+
+    Rows are spread evenly over time from ``start``, ``step`` apart (with
+    jitter), so consecutive batches land in consecutive hypertable chunks.
+
+    Args:
+        rng (np.random.Generator): Random source.
+        size (int): Rows in the batch.
+        start (datetime): created_at of the first row of the whole load (UTC).
+        first_row (int): Index of this batch's first row in the whole load.
+        step (timedelta): Average time between consecutive rows.
+
+    Returns:
+        Dict[str, list]: One list per column of ``stock_trades``, in COLUMNS order.
+    """
+    cents = rng.integers(5000, 50001, size)
+    offsets_us = (np.arange(first_row, first_row + size) + rng.random(size)) * (step / timedelta(microseconds=1))
+    created = np.datetime64(start.replace(tzinfo=None), "us") + offsets_us.astype("timedelta64[us]")
+    created_at = [ts.replace(tzinfo=timezone.utc) for ts in created.astype(object)]
+
+    return {
+        "trade_id": _random_uuids(rng, size),
+        "stock_name": np.array(STOCK_NAMES, dtype=object)[rng.integers(0, len(STOCK_NAMES), size)].tolist(),
+        "stock_price": [Decimal(int(c)).scaleb(-2) for c in cents],
+        "stock_purchase_choice": np.array(PURCHASE_CHOICES, dtype=object)[rng.integers(0, 2, size)].tolist(),
+        "trader_id": _random_uuids(rng, size),
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+
+# -- Bulk Writers --
+async def write_chunk(connection, columns: Dict[str, list], method: str) -> None:
+    """
+    Writes one batch with the asyncpg driver connection.
+
+    Args:
+        connection: asyncpg connection (the engine's raw driver connection).
+        columns (Dict[str, list]): Batch from generate_columns.
+        method (str): ``copy`` for binary COPY, ``unnest`` for one multi-row INSERT.
+    """
+    if method == "copy":
+        records = list(zip(*(columns[name] for name in COLUMNS)))
+        await connection.copy_records_to_table("stock_trades", records=records, columns=COLUMNS)
+    else:
+        await connection.execute(UNNEST_INSERT, *(columns[name] for name in COLUMNS))
+
+
+async def bulk_load(
+    record_count: int,
+    chunk_size: int = 50_000,
+    commit_every: int = 1,
+    method: str = "copy",
+    span_hours: float = 24.0,
+    seed: Optional[int] = None,
+    report_every: float = 5.0,
+) -> None:
+    """
+    Streams record_count random trades into stock_trades in chunks.
+
+    Args:
+        record_count (int): Number of trades to insert.
+        chunk_size (int): Rows per COPY / INSERT statement.
+        commit_every (int): Chunks per transaction.
+        method (str): ``copy`` or ``unnest``.
+        span_hours (float): created_at values cover this many hours up to now.
+        seed (Optional[int]): Seed for reproducible trades; None draws fresh entropy, so
+            repeated loads never reuse trade_ids.
+        report_every (float): Seconds between progress lines.
+    """
+    rng = np.random.default_rng(seed)
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(hours=span_hours)
+    step = (end - start) / max(record_count, 1)
+
+    written = 0
+    started = last_report = time.perf_counter()
+    async with get_engine().connect() as conn:
+        raw = await conn.get_raw_connection()
+        driver = raw.driver_connection
+
+        while written < record_count:
+            async with driver.transaction():
+                for _ in range(commit_every):
+                    size = min(chunk_size, record_count - written)
+                    if size <= 0:
+                        break
+                    columns = generate_columns(rng, size, start, written, step)
+                    await write_chunk(driver, columns, method)
+                    written += size
+
+            now = time.perf_counter()
+            if now - last_report >= report_every or written == record_count:
+                elapsed = now - started
+                print(f"Committed {written:,}/{record_count:,} trades "
+                      f"({written / elapsed:,.0f} rows/s, {elapsed:.1f}s elapsed)")
+                last_report = now
+
+    print(f"Inserted {written:,} trades in {time.perf_counter() - started:.1f}s.")
+
+
 def main() -> None:
     """
     CLI entry point for bulk inserting stock trades.
@@ -61,8 +215,30 @@ def main() -> None:
     parser.add_argument(
         "--record-count", type=int, required=True, help="Number of trades to insert"
     )
+    parser.add_argument(
+        "--bulk", action="store_true", help="Stream columnar batches via asyncpg instead of ORM objects"
+    )
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="Rows per COPY/INSERT (bulk mode)")
+    parser.add_argument("--commit-every", type=int, default=1, help="Chunks per transaction (bulk mode)")
+    parser.add_argument(
+        "--method", choices=["copy", "unnest"], default="copy",
+        help="Binary COPY or one multi-row INSERT ... unnest per chunk (bulk mode)",
+    )
+    parser.add_argument(
+        "--span-hours", type=float, default=24.0, help="Spread created_at over this many hours up to now (bulk mode)"
+    )
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Random seed for a reproducible bulk load (default: fresh trade_ids every run)")
+    add_engine_arguments(parser)
     args = parser.parse_args()
-    asyncio.run(load_data(args.record_count))
+    configure_engine(settings_from_args(args))
+
+    if args.bulk:
+        asyncio.run(bulk_load(
+            args.record_count, args.chunk_size, args.commit_every, args.method, args.span_hours, args.seed
+        ))
+    else:
+        asyncio.run(load_data(args.record_count))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,239 @@
+"""
+Apply TimescaleDB storage settings to the stock_trades hypertable.
+
+init.sql creates the table with default chunking. This script tunes it:
+
+- sets the chunk time interval for new chunks
+- drops ``idx_stock_trades_created_at``, which duplicates the hypertable's own
+  ``created_at DESC`` index and only adds write cost to every insert
+- enables native compression segmented by ``stock_name`` (ordered by
+  ``created_at DESC``) with a policy that compresses chunks past an age
+- adds a retention policy for raw trades
+- creates ``stock_trades_1m``, a continuous aggregate of per-minute OHLC and
+  trade counts per symbol, with its own refresh and retention policies
+
+Every step is idempotent, and policies are replaced so new intervals take
+effect on re-runs:
+
+    python manage_schema.py --chunk-interval "1 day" --compress-after "7 days" --retention "30 days"
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from stock_events_db_access_interface import add_engine_arguments, configure_engine, get_engine, settings_from_args
+
+# -- Logger Setup --
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+HYPERTABLE = "stock_trades"
+AGGREGATE = "stock_trades_1m"
+REDUNDANT_INDEXES = ("idx_stock_trades_created_at",)
+
+# Real-time aggregate: reads union the materialized buckets with raw trades
+# newer than the last refresh, so the newest minute is never missing
+CREATE_AGGREGATE = f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS {AGGREGATE}
+    WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+    SELECT
+        time_bucket(INTERVAL '1 minute', created_at) AS bucket,
+        stock_name,
+        first(stock_price, created_at) AS open,
+        max(stock_price) AS high,
+        min(stock_price) AS low,
+        last(stock_price, created_at) AS close,
+        count(*) AS trades,
+        count(*) FILTER (WHERE stock_purchase_choice = 'BUY') AS buys,
+        count(*) FILTER (WHERE stock_purchase_choice = 'SELL') AS sells
+    FROM {HYPERTABLE}
+    GROUP BY bucket, stock_name
+    WITH NO DATA
+"""
+
+Statement = Tuple[str, Dict[str, str]]
+
+
+def schema_statements(
+    chunk_interval: str,
+    compress_after: Optional[str],
+    retention: Optional[str],
+    aggregate_retention: Optional[str],
+    refresh_lag: str,
+    refresh_window: str,
+    compression_enabled: bool,
+) -> List[Statement]:
+    """
+    Builds the ordered statements that bring the hypertable to the requested settings.
+
+    Args:
+        chunk_interval (str): Time span of each new chunk, e.g. ``1 day``.
+        compress_after (Optional[str]): Compress chunks older than this; None leaves compression off.
+        retention (Optional[str]): Drop raw chunks older than this; None keeps everything.
+        aggregate_retention (Optional[str]): Drop aggregate buckets older than this; None keeps everything.
+        refresh_lag (str): Newest span the refresh policy leaves to real-time aggregation.
+        refresh_window (str): How far back each scheduled refresh recomputes buckets.
+        compression_enabled (bool): Whether compression is already on (its settings can't be
+            changed while compressed chunks exist, so it is only enabled once).
+
+    Returns:
+        List[Statement]: ``(sql, params)`` pairs to run in AUTOCOMMIT mode.
+    """
+    statements: List[Statement] = [
+        (
+            "SELECT set_chunk_time_interval(:table, CAST(:interval AS INTERVAL))",
+            {"table": HYPERTABLE, "interval": chunk_interval},
+        ),
+    ]
+    statements += [(f"DROP INDEX IF EXISTS {index}", {}) for index in REDUNDANT_INDEXES]
+
+    if compress_after:
+        if not compression_enabled:
+            statements.append((
+                f"ALTER TABLE {HYPERTABLE} SET ("
+                "timescaledb.compress, "
+                "timescaledb.compress_segmentby = 'stock_name', "
+                "timescaledb.compress_orderby = 'created_at DESC')",
+                {},
+            ))
+        statements += [
+            ("SELECT remove_compression_policy(:table, if_exists => TRUE)", {"table": HYPERTABLE}),
+            (
+                "SELECT add_compression_policy(:table, CAST(:after AS INTERVAL))",
+                {"table": HYPERTABLE, "after": compress_after},
+            ),
+        ]
+
+    statements.append(("SELECT remove_retention_policy(:table, if_exists => TRUE)", {"table": HYPERTABLE}))
+    if retention:
+        statements.append((
+            "SELECT add_retention_policy(:table, CAST(:after AS INTERVAL))",
+            {"table": HYPERTABLE, "after": retention},
+        ))
+
+    statements += [
+        (CREATE_AGGREGATE, {}),
+        ("SELECT remove_continuous_aggregate_policy(:view, if_exists => TRUE)", {"view": AGGREGATE}),
+        (
+            "SELECT add_continuous_aggregate_policy(:view, "
+            "start_offset => CAST(:window AS INTERVAL), "
+            "end_offset => CAST(:lag AS INTERVAL), "
+            "schedule_interval => INTERVAL '1 minute')",
+            {"view": AGGREGATE, "window": refresh_window, "lag": refresh_lag},
+        ),
+        ("SELECT remove_retention_policy(:view, if_exists => TRUE)", {"view": AGGREGATE}),
+    ]
+    if aggregate_retention:
+        statements.append((
+            "SELECT add_retention_policy(:view, CAST(:after AS INTERVAL))",
+            {"view": AGGREGATE, "after": aggregate_retention},
+        ))
+    return statements
+
+
+async def is_compression_enabled(connection: AsyncConnection) -> bool:
+    result = await connection.execute(
+        text(
+            "SELECT compression_enabled FROM timescaledb_information.hypertables "
+            "WHERE hypertable_name = :table"
+        ),
+        {"table": HYPERTABLE},
+    )
+    return bool(result.scalar())
+
+
+async def apply_schema(
+    chunk_interval: str = "1 day",
+    compress_after: Optional[str] = "7 days",
+    retention: Optional[str] = "30 days",
+    aggregate_retention: Optional[str] = "365 days",
+    refresh_lag: str = "1 minute",
+    refresh_window: str = "1 hour",
+    backfill: bool = False,
+    dry_run: bool = False,
+) -> None:
+    """
+    Applies chunking, compression, retention and the per-minute aggregate.
+
+    Runs in AUTOCOMMIT mode, because continuous aggregates cannot be created or
+    refreshed inside a transaction block.
+
+    Args:
+        chunk_interval (str): Time span of each new chunk.
+        compress_after (Optional[str]): Compress chunks older than this; None skips compression.
+        retention (Optional[str]): Raw trade retention; None removes the policy.
+        aggregate_retention (Optional[str]): Aggregate retention; None removes the policy.
+        refresh_lag (str): Newest span left to real-time aggregation.
+        refresh_window (str): Span each scheduled refresh recomputes. Keep it shorter than
+            ``retention`` so refreshes never erase buckets whose raw trades were dropped.
+        backfill (bool): Materialize the aggregate over all existing trades once.
+        dry_run (bool): Print the statements without connecting.
+    """
+    def plan(compression_enabled: bool) -> List[Statement]:
+        statements = schema_statements(
+            chunk_interval, compress_after, retention, aggregate_retention,
+            refresh_lag, refresh_window, compression_enabled,
+        )
+        if backfill:
+            statements.append((
+                "CALL refresh_continuous_aggregate(:view, NULL, now() - CAST(:lag AS INTERVAL))",
+                {"view": AGGREGATE, "lag": refresh_lag},
+            ))
+        return statements
+
+    def describe(sql: str, params: Dict[str, str]) -> str:
+        return f"{' '.join(sql.split())} {params or ''}".rstrip()
+
+    if dry_run:
+        for sql, params in plan(compression_enabled=False):
+            print(describe(sql, params))
+        return
+
+    engine = get_engine().execution_options(isolation_level="AUTOCOMMIT")
+    async with engine.connect() as connection:
+        compression_enabled = await is_compression_enabled(connection)
+        if compression_enabled and compress_after:
+            logging.info("Compression is already enabled; segment/order settings left unchanged")
+        for sql, params in plan(compression_enabled):
+            logging.info(describe(sql, params))
+            await connection.execute(text(sql), params)
+
+
+# -- CLI Entry Point --
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply TimescaleDB chunking, compression and retention")
+    parser.add_argument("--chunk-interval", default="1 day", help="Time span of each new chunk")
+    parser.add_argument("--compress-after", default="7 days", help="Compress chunks older than this")
+    parser.add_argument("--no-compression", action="store_true", help="Skip compression settings and policy")
+    parser.add_argument("--retention", default="30 days", help="Drop raw trade chunks older than this")
+    parser.add_argument("--aggregate-retention", default="365 days", help="Drop 1-minute bars older than this")
+    parser.add_argument("--no-retention", action="store_true", help="Remove both retention policies")
+    parser.add_argument("--refresh-lag", default="1 minute", help="Newest span left to real-time aggregation")
+    parser.add_argument("--refresh-window", default="1 hour", help="Span each scheduled refresh recomputes")
+    parser.add_argument("--backfill", action="store_true", help="Materialize bars for all existing trades")
+    parser.add_argument("--dry-run", action="store_true", help="Print the statements without running them")
+    add_engine_arguments(parser)
+    args = parser.parse_args()
+    configure_engine(settings_from_args(args))
+
+    asyncio.run(apply_schema(
+        chunk_interval=args.chunk_interval,
+        compress_after=None if args.no_compression else args.compress_after,
+        retention=None if args.no_retention else args.retention,
+        aggregate_retention=None if args.no_retention else args.aggregate_retention,
+        refresh_lag=args.refresh_lag,
+        refresh_window=args.refresh_window,
+        backfill=args.backfill,
+        dry_run=args.dry_run,
+    ))
+
+
+if __name__ == "__main__":
+    main()
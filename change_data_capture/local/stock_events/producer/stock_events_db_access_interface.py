@@ -1,11 +1,17 @@
+import argparse
+import asyncio
 import os
+import time
 import uuid
-from datetime import datetime
-from typing import AsyncGenerator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, fields
+from datetime import datetime, timezone
+from typing import AsyncGenerator, Dict, Optional, Union
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession, async_scoped_session
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy import Column, String, Numeric, TIMESTAMP, CheckConstraint
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy import Column, String, Numeric, TIMESTAMP, CheckConstraint, exc
 from sqlalchemy.dialects.postgresql import UUID
 from dotenv import load_dotenv
 
@@ -24,12 +30,247 @@ DATABASE_URL = (
     f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 )
 
+
+# -- Engine Settings --
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _parse_echo(value: Union[str, bool]) -> Union[str, bool]:
+    """Maps ``false``/``true``/``debug`` onto SQLAlchemy's ``echo`` values."""
+    if isinstance(value, bool):
+        return value
+    value = value.strip().lower()
+    if value == "debug":
+        return "debug"
+    return value in ("1", "true", "yes", "on", "info")
+
+
+@dataclass
+class EngineSettings:
+    """
+    Connection pool and driver settings for the async engine.
+
+    Every field can be set from a ``STOCK_EVENTS_DB_<FIELD>`` environment
+    variable (see ``from_env``) or overridden on the command line with the
+    flags added by ``add_engine_arguments``.
+
+    Attributes:
+        pool_size (int): Connections kept open in the pool.
+        max_overflow (int): Extra connections opened beyond pool_size under load.
+        pool_timeout (float): Seconds to wait for a free connection before failing.
+        pool_pre_ping (bool): Test each connection with a round trip on checkout.
+        statement_cache_size (int): Prepared statements cached per connection (0 disables,
+            e.g. behind pgbouncer in transaction mode).
+        echo (Union[str, bool]): SQL logging: False, True (statements) or "debug" (statements and rows).
+    """
+
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_pre_ping: bool = False
+    statement_cache_size: int = 100
+    echo: Union[str, bool] = False
+
+    @classmethod
+    def from_env(cls) -> "EngineSettings":
+        defaults = cls()
+        return cls(
+            pool_size=int(os.getenv("STOCK_EVENTS_DB_POOL_SIZE", defaults.pool_size)),
+            max_overflow=int(os.getenv("STOCK_EVENTS_DB_MAX_OVERFLOW", defaults.max_overflow)),
+            pool_timeout=float(os.getenv("STOCK_EVENTS_DB_POOL_TIMEOUT", defaults.pool_timeout)),
+            pool_pre_ping=_env_bool("STOCK_EVENTS_DB_POOL_PRE_PING", defaults.pool_pre_ping),
+            statement_cache_size=int(
+                os.getenv("STOCK_EVENTS_DB_STATEMENT_CACHE_SIZE", defaults.statement_cache_size)
+            ),
+            echo=_parse_echo(os.getenv("STOCK_EVENTS_DB_ECHO", "false")),
+        )
+
+
+def add_engine_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Adds connection pool flags to a CLI; unset flags keep the environment value.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser to extend.
+    """
+    group = parser.add_argument_group("connection pool")
+    group.add_argument("--pool-size", type=int, help="Connections kept open in the pool")
+    group.add_argument("--max-overflow", type=int, help="Extra connections allowed under load")
+    group.add_argument("--pool-timeout", type=float, help="Seconds to wait for a free connection")
+    group.add_argument(
+        "--pool-pre-ping", action=argparse.BooleanOptionalAction, default=None,
+        help="Test connections with a round trip on checkout",
+    )
+    group.add_argument(
+        "--statement-cache-size", type=int, help="Prepared statements cached per connection (0 disables)"
+    )
+    group.add_argument("--echo", choices=["false", "true", "debug"], help="SQL statement logging")
+
+
+def settings_from_args(args: argparse.Namespace) -> EngineSettings:
+    """
+    Environment settings with any flags from ``add_engine_arguments`` applied on top.
+
+    Args:
+        args (argparse.Namespace): Parsed CLI arguments.
+
+    Returns:
+        EngineSettings: Settings to build the engine with.
+    """
+    settings = EngineSettings.from_env()
+    for field in fields(EngineSettings):
+        value = getattr(args, field.name, None)
+        if value is not None:
+            setattr(settings, field.name, _parse_echo(value) if field.name == "echo" else value)
+    return settings
+
+
+# -- Pool Metrics --
+class PoolMetrics:
+    """
+    Checkout counts and time spent waiting for a pooled connection.
+
+    Wait time covers the whole checkout, including opening a new connection
+    when the pool grows, so a rising wait with ``checked_out`` at
+    ``pool_size + max_overflow`` means the pool is too small for the load.
+    """
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self, pool: Optional["InstrumentedQueuePool"] = None) -> Dict[str, float]:
+        """
+        Current counters plus, when a pool is given, its live occupancy.
+
+        Returns:
+            Dict[str, float]: checkouts, timeouts, wait_mean_ms and wait_max_ms, plus
+            checked_out, idle, overflow and pool_size for the pool.
+        """
+        metrics: Dict[str, float] = {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_mean_ms": self.wait_total / self.checkouts * 1e3 if self.checkouts else 0.0,
+            "wait_max_ms": self.wait_max * 1e3,
+        }
+        if pool is not None:
+            metrics.update(
+                checked_out=pool.checkedout(),
+                idle=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+                pool_size=pool.size(),
+            )
+        return metrics
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that times every checkout into a PoolMetrics."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.record(time.perf_counter() - started)
+        return record
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        # engine.dispose() swaps in a fresh pool; keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+# -- Engine and Sessions --
+def create_engine(settings: Optional[EngineSettings] = None) -> AsyncEngine:
+    """
+    Builds the async engine from pool settings (environment defaults when omitted).
+
+    Args:
+        settings (Optional[EngineSettings]): Pool and driver settings.
+
+    Returns:
+        AsyncEngine: Engine on an InstrumentedQueuePool.
+    """
+    settings = settings or EngineSettings.from_env()
+    return create_async_engine(
+        DATABASE_URL,
+        echo=settings.echo,
+        future=True,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pool_timeout=settings.pool_timeout,
+        pool_pre_ping=settings.pool_pre_ping,
+        # SQLAlchemy's per-connection prepared statement cache and asyncpg's own
+        connect_args={
+            "prepared_statement_cache_size": settings.statement_cache_size,
+            "statement_cache_size": settings.statement_cache_size,
+        },
+    )
+
+
 # Create async engine and session
-engine = create_async_engine(DATABASE_URL, echo=True, future=True)
+engine = create_engine()
 AsyncSessionLocal = sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
 
+# One session per asyncio task, for concurrent producers
+TaskSession = async_scoped_session(AsyncSessionLocal, scopefunc=asyncio.current_task)
+
+
+def configure_engine(settings: EngineSettings) -> AsyncEngine:
+    """
+    Replaces the module engine and rebinds the session factories to it.
+
+    Call once at startup, before any session is opened.
+
+    Args:
+        settings (EngineSettings): Pool and driver settings.
+
+    Returns:
+        AsyncEngine: The new engine.
+    """
+    global engine
+    engine = create_engine(settings)
+    AsyncSessionLocal.configure(bind=engine)
+    return engine
+
+
+def get_engine() -> AsyncEngine:
+    """Returns the engine currently bound to AsyncSessionLocal."""
+    return engine
+
+
+def pool_metrics() -> Dict[str, float]:
+    """
+    Checkout and wait-time metrics for the current engine's pool.
+
+    Returns:
+        Dict[str, float]: See PoolMetrics.snapshot.
+    """
+    pool = engine.pool
+    return pool.metrics.snapshot(pool)
+
+
 Base = declarative_base()
 
 
@@ -39,7 +280,7 @@ class StockTrade(Base):
     __tablename__ = "stock_trades"
 
     trade_id = Column(
-        UUID(as_uuid=True) , primary_key=True, default=lambda: str(uuid.uuid4())
+        UUID(as_uuid=True) , primary_key=True, default=uuid.uuid4
     )
     stock_name = Column(String, nullable=False)
     stock_price = Column(Numeric(12, 2), nullable=False)
@@ -49,8 +290,10 @@ class StockTrade(Base):
         nullable=False,
     )
     trader_id = Column(UUID(as_uuid=True), nullable=False, default=uuid.uuid4)
-    created_at = Column(TIMESTAMP, nullable=False, default=datetime.utcnow)
-    updated_at = Column(TIMESTAMP, nullable=False, default=datetime.utcnow)
+    # TIMESTAMPTZ in init.sql; aware UTC values bind the same way whether they
+    # come from here or back from the database as trade keys
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(TIMESTAMP(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
@@ -62,3 +305,21 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """
     async with AsyncSessionLocal() as session:
         yield session
+
+
+@asynccontextmanager
+async def task_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session owned by the current asyncio task, closed when the block exits.
+
+    Each concurrent producer task gets its own session (and at most one pooled
+    connection at a time), so tasks never share a transaction.
+
+    Yields:
+        AsyncSession: The current task's session.
+    """
+    session = TaskSession()
+    try:
+        yield session
+    finally:
+        await TaskSession.remove()
@@ -0,0 +1,290 @@
+"""
+Write paths for generated ``stock_trades`` events.
+
+A worker hands a writer a micro-batch of operations (e.g. 3 inserts,
+1 update, 1 delete) and the whole batch is applied in one transaction:
+
+- ``orm``: ``StockTrade`` objects through the session's unit of work, and one
+  keyed statement per update/delete. Every insert goes through the identity
+  map and flush machinery. Updates and deletes report keys that matched no row.
+- ``core``: SQLAlchemy Core statements executed once per batch with a list of
+  parameter sets. asyncpg runs them as prepared statements, with
+  ``executemany`` for updates/deletes and multi-row ``VALUES`` for inserts.
+  Parameters are built as plain dicts, with no ORM state.
+
+Both paths are picked by name through ``WRITERS``, so their throughput can be
+compared with the same generator settings.
+"""
+
+import logging
+import random
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, case, delete, func, insert, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from stock_events_db_access_interface import StockTrade
+
+STOCK_NAMES = ["AAPL", "GOOG", "MSFT", "AMZN", "TSLA"]
+PURCHASE_CHOICES = ["BUY", "SELL"]
+
+TradeKey = Tuple[Any, Any]
+
+
+# -- Key Reservoir --
+class KeyReservoir:
+    """
+    Bounded set of ``(trade_id, created_at)`` primary keys to pick targets from.
+
+    Replaces ``ORDER BY RANDOM()`` scans: picking, adding and removing a key
+    are all O(1), and updates/deletes then hit one row by primary key, which
+    TimescaleDB narrows to a single chunk through ``created_at``. When full,
+    a new key overwrites a random slot, so the reservoir keeps a sample of
+    recent and older keys.
+
+    Args:
+        capacity (int): Most keys held in memory.
+    """
+
+    def __init__(self, capacity: int = 100_000) -> None:
+        self.capacity = capacity
+        self._keys: List[TradeKey] = []
+        self._positions: Dict[TradeKey, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: TradeKey) -> None:
+        if key in self._positions:
+            return
+        if len(self._keys) < self.capacity:
+            self._positions[key] = len(self._keys)
+            self._keys.append(key)
+            return
+        slot = random.randrange(self.capacity)
+        del self._positions[self._keys[slot]]
+        self._keys[slot] = key
+        self._positions[key] = slot
+
+    def remove(self, key: TradeKey) -> None:
+        slot = self._positions.pop(key, None)
+        if slot is None:
+            return
+        last = self._keys.pop()
+        if slot < len(self._keys):
+            self._keys[slot] = last
+            self._positions[last] = slot
+
+    def sample(self) -> Optional[TradeKey]:
+        return random.choice(self._keys) if self._keys else None
+
+    async def refill(self, session: AsyncSession, limit: Optional[int] = None) -> int:
+        """
+        Loads the most recent keys, newest first, through the created_at index.
+
+        Args:
+            session (AsyncSession): Session to query with.
+            limit (Optional[int]): Keys to read; defaults to the capacity.
+
+        Returns:
+            int: Number of keys read.
+        """
+        result = await session.execute(
+            text("SELECT trade_id, created_at FROM stock_trades ORDER BY created_at DESC LIMIT :limit"),
+            {"limit": limit or self.capacity},
+        )
+        rows = result.fetchall()
+        await session.commit()
+        for trade_id, created_at in rows:
+            self.add((trade_id, created_at))
+        return len(rows)
+
+
+def random_price() -> Decimal:
+    return Decimal(random.randrange(5_000, 50_001)) / 100
+
+
+# -- ORM Path --
+class OrmWriter:
+    """Unit-of-work writes: ORM objects for inserts, one keyed statement per update/delete."""
+
+    name = "orm"
+
+    UPDATE = text(
+        """
+        UPDATE stock_trades
+        SET stock_price = ROUND((random() * 450 + 50)::numeric, 2),
+            stock_purchase_choice = CASE stock_purchase_choice WHEN 'BUY' THEN 'SELL' ELSE 'BUY' END,
+            updated_at = NOW()
+        WHERE trade_id = :trade_id
+          AND created_at = :created_at
+        RETURNING trade_id
+    """
+    )
+    DELETE = text(
+        """
+        DELETE FROM stock_trades
+        WHERE trade_id = :trade_id
+          AND created_at = :created_at
+        RETURNING trade_id
+    """
+    )
+
+    async def insert(self, session: AsyncSession, count: int) -> List[TradeKey]:
+        trades = [
+            StockTrade(
+                stock_name=random.choice(STOCK_NAMES),
+                stock_price=random_price(),
+                stock_purchase_choice=random.choice(PURCHASE_CHOICES),
+            )
+            for _ in range(count)
+        ]
+        session.add_all(trades)
+        await session.flush()
+        return [(trade.trade_id, trade.created_at) for trade in trades]
+
+    async def update(self, session: AsyncSession, keys: List[TradeKey]) -> List[TradeKey]:
+        missing = []
+        for trade_id, created_at in keys:
+            result = await session.execute(self.UPDATE, {"trade_id": trade_id, "created_at": created_at})
+            if result.fetchone() is None:
+                missing.append((trade_id, created_at))
+        return missing
+
+    async def delete(self, session: AsyncSession, keys: List[TradeKey]) -> List[TradeKey]:
+        missing = []
+        for trade_id, created_at in keys:
+            result = await session.execute(self.DELETE, {"trade_id": trade_id, "created_at": created_at})
+            if result.fetchone() is None:
+                missing.append((trade_id, created_at))
+        return missing
+
+
+# -- Core Path --
+trades_table = StockTrade.__table__
+
+CORE_INSERT = insert(trades_table)
+CORE_UPDATE = (
+    update(trades_table)
+    .where(
+        trades_table.c.trade_id == bindparam("key_trade_id"),
+        trades_table.c.created_at == bindparam("key_created_at"),
+    )
+    .values(
+        stock_price=bindparam("new_price"),
+        stock_purchase_choice=case(
+            (trades_table.c.stock_purchase_choice == "BUY", "SELL"), else_="BUY"
+        ),
+        updated_at=func.now(),
+    )
+)
+CORE_DELETE = delete(trades_table).where(
+    trades_table.c.trade_id == bindparam("key_trade_id"),
+    trades_table.c.created_at == bindparam("key_created_at"),
+)
+
+
+class CoreWriter:
+    """
+    Core writes: one statement per operation type per batch, many parameter sets.
+
+    ``executemany`` reports no per-row result, so an update or delete whose
+    row was deleted elsewhere is not detected and counts as applied. An
+    update's key stays in the reservoir until it is overwritten or deleted.
+    """
+
+    name = "core"
+
+    async def insert(self, session: AsyncSession, count: int) -> List[TradeKey]:
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "trade_id": uuid.uuid4(),
+                "stock_name": random.choice(STOCK_NAMES),
+                "stock_price": random_price(),
+                "stock_purchase_choice": random.choice(PURCHASE_CHOICES),
+                "trader_id": uuid.uuid4(),
+                "created_at": now,
+                "updated_at": now,
+            }
+            for _ in range(count)
+        ]
+        await session.execute(CORE_INSERT, rows)
+        return [(row["trade_id"], row["created_at"]) for row in rows]
+
+    async def update(self, session: AsyncSession, keys: List[TradeKey]) -> List[TradeKey]:
+        params = [
+            {"key_trade_id": trade_id, "key_created_at": created_at, "new_price": random_price()}
+            for trade_id, created_at in keys
+        ]
+        await session.execute(CORE_UPDATE, params)
+        return []
+
+    async def delete(self, session: AsyncSession, keys: List[TradeKey]) -> List[TradeKey]:
+        params = [{"key_trade_id": trade_id, "key_created_at": created_at} for trade_id, created_at in keys]
+        await session.execute(CORE_DELETE, params)
+        return []
+
+
+WRITERS = {"orm": OrmWriter, "core": CoreWriter}
+
+
+# -- Micro-batches --
+async def write_batch(
+    writer: Any, session: AsyncSession, reservoir: KeyReservoir, counts: Dict[str, int]
+) -> Dict[str, int]:
+    """
+    Applies a batch of generated operations in one transaction.
+
+    Update and delete targets are drawn from the reservoir first. Delete
+    targets are removed before any await, so no other worker draws them. If
+    the transaction fails, they go back into the reservoir. Updates and
+    deletes with no key to draw, or whose row is already gone, are not applied.
+
+    Args:
+        writer: OrmWriter or CoreWriter.
+        session (AsyncSession): The calling task's session.
+        reservoir (KeyReservoir): Shared primary keys to target.
+        counts (Dict[str, int]): Number of INSERT/UPDATE/DELETE operations in the batch.
+
+    Returns:
+        Dict[str, int]: INSERT/UPDATE/DELETE operations actually applied.
+    """
+    if (counts.get("UPDATE") or counts.get("DELETE")) and not len(reservoir):
+        await reservoir.refill(session)
+
+    update_keys = [reservoir.sample() for _ in range(counts.get("UPDATE", 0)) if len(reservoir)]
+    delete_keys = []
+    for _ in range(counts.get("DELETE", 0)):
+        key = reservoir.sample()
+        if key is None:
+            break
+        reservoir.remove(key)
+        delete_keys.append(key)
+
+    try:
+        inserted = await writer.insert(session, counts["INSERT"]) if counts.get("INSERT") else []
+        missing = await writer.update(session, update_keys) if update_keys else []
+        already_deleted = await writer.delete(session, delete_keys) if delete_keys else []
+        await session.commit()
+    except Exception:
+        for key in delete_keys:
+            reservoir.add(key)
+        raise
+
+    for key in inserted:
+        reservoir.add(key)
+    for key in missing:
+        # Deleted since it was sampled (e.g. by another process)
+        reservoir.remove(key)
+    applied = {
+        "INSERT": len(inserted),
+        "UPDATE": len(update_keys) - len(missing),
+        "DELETE": len(delete_keys) - len(already_deleted),
+    }
+    logging.debug(
+        f"Wrote batch: {applied['INSERT']} inserted, {applied['UPDATE']} updated, {applied['DELETE']} deleted"
+    )
+    return applied
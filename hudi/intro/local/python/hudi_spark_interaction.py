@@ -8,8 +8,13 @@ SPARK_MASTER_URL = "spark://spark-master:7077"
 NETWORK_NAME = "spark_hudi-net"
 SCRIPT_DIR = os.path.join(os.getcwd(), "jobs")
 CONTAINER_SCRIPT_DIR = "/app"
+PACKAGES = [
+    "org.apache.hudi:hudi-spark3.4-bundle_2.12:0.14.0",
+    # Kafka source for the streaming CDC sink
+    "org.apache.spark:spark-sql-kafka-0-10_2.12:3.4.1",
+]
 
-def run_spark_job(script_name):
+def run_spark_job(script_name, job_args=()):
     script_path = os.path.join(SCRIPT_DIR, script_name)
     if not os.path.exists(script_path):
         print(f"[ERROR] Script {script_name} not found in 'jobs/' folder.")
@@ -22,8 +27,9 @@ def run_spark_job(script_name):
         DOCKER_IMAGE,
         "spark-submit",
         "--master", SPARK_MASTER_URL,
-        "--packages", "org.apache.hudi:hudi-spark3.4-bundle_2.12:0.14.0",
-        f"{CONTAINER_SCRIPT_DIR}/{script_name}"
+        "--packages", ",".join(PACKAGES),
+        f"{CONTAINER_SCRIPT_DIR}/{script_name}",
+        *job_args
     ]
 
     print(f"[INFO] Running {script_name}...")
@@ -41,6 +47,9 @@ def run_spark_job(script_name):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Submit Spark jobs to the Docker cluster")
     parser.add_argument("--filename", required=True, help="Name of the PySpark script in jobs/")
+    parser.add_argument("job_args", nargs=argparse.REMAINDER,
+                        help="Arguments for the job itself, after '--'")
 
     args = parser.parse_args()
-    run_spark_job(args.filename)
+    job_args = args.job_args[1:] if args.job_args[:1] == ["--"] else args.job_args
+    run_spark_job(args.filename, job_args)
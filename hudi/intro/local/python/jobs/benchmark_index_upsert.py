@@ -0,0 +1,222 @@
+"""
+benchmark_index_upsert.py
+
+Times Hudi upserts under each index type (bloom, consistent-hashing bucket,
+record-level) on synthetic data in the local MinIO store.
+
+For each index:
+1. bulk_insert N rows (id, name, amount, ts) into a fresh table.
+2. Upsert a batch of updates to existing ids plus new ids.
+3. Read the upsert's Spark jobs from the driver's REST API
+   (/api/v1/applications/<app>/jobs). Split their time into:
+   - tag: jobs Hudi labels as index work (looking up which file group holds each key)
+   - write: jobs that merge and write the records
+   - other: metadata table, markers, clean/archive
+
+Hudi labels its Spark jobs with the class that ran them (job group) and a
+description. Both are matched to classify jobs. The bucket index hashes keys
+without running a job, so its tag time is close to zero.
+
+Assumes the Spark session is configured for S3A access to a MinIO-based object store,
+and that job scripts are mounted at /app inside the container.
+
+    python hudi_spark_interaction.py --filename benchmark_index_upsert.py -- --rows 5000000 --indexes bloom bucket record
+"""
+
+import argparse
+import json
+import logging
+import time
+import urllib.request
+from datetime import datetime
+from typing import Dict, List
+
+from pyspark.sql import DataFrame, SparkSession
+from pyspark.sql import functions as F
+from config import HUDI_INDEXES, add_profile_arguments, configure_s3a_for_minio, get_hudi_options, index_options
+
+# Configure logger with timestamp format
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+BASE_PATH = "s3a://hudi-bucket/index_benchmark"
+TAG_MARKERS = ("index", "tag", "key ranges", "comparisons", "record location", "lookup")
+WRITE_MARKERS = ("writing data", "commitactionexecutor", "write status", "merge")
+
+
+def create_rows(spark: SparkSession, start: int, count: int, sequential_keys: bool, ts: int) -> DataFrame:
+    """
+    Synthetic rows with ids start..start+count-1.
+
+    Args:
+        spark: SparkSession
+        start: First numeric id
+        count: Number of rows
+        sequential_keys: Zero-padded ids in order; otherwise hashed ids in random order
+        ts: Precombine value for every row
+    """
+    ids = spark.range(start, start + count)
+    key = F.format_string("%012d", F.col("id")) if sequential_keys else F.sha2(F.col("id").cast("string"), 256)
+    return ids.select(
+        key.alias("id"),
+        F.concat(F.lit("user_"), F.col("id").cast("string")).alias("name"),
+        (F.rand(seed=int(ts)) * 1000).cast("decimal(12,2)").alias("amount"),
+        F.lit(ts).cast("long").alias("ts"),
+    )
+
+
+def create_upsert_batch(
+    spark: SparkSession, rows: int, update_fraction: float, insert_fraction: float, sequential_keys: bool
+) -> DataFrame:
+    """Updates to a random update_fraction of existing ids plus rows*insert_fraction new ids."""
+    updates = create_rows(spark, 0, rows, sequential_keys, ts=2).sample(fraction=update_fraction, seed=42)
+    inserts = create_rows(spark, rows, int(rows * insert_fraction), sequential_keys, ts=2)
+    return updates.unionByName(inserts)
+
+
+def fetch_jobs(spark: SparkSession, after_job_id: int = -1) -> List[Dict]:
+    """Jobs with an id above after_job_id, from the driver's REST API."""
+    sc = spark.sparkContext
+    url = f"{sc.uiWebUrl}/api/v1/applications/{sc.applicationId}/jobs"
+    with urllib.request.urlopen(url, timeout=30) as response:
+        jobs = json.load(response)
+    return [job for job in jobs if job["jobId"] > after_job_id]
+
+
+def last_job_id(spark: SparkSession) -> int:
+    """Highest Spark job id so far (-1 before any job)."""
+    return max((job["jobId"] for job in fetch_jobs(spark)), default=-1)
+
+
+def parse_time(value: str) -> datetime:
+    # e.g. 2024-05-01T12:00:00.123GMT
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%Z")
+
+
+def phase_times(jobs: List[Dict]) -> Dict[str, float]:
+    """Seconds spent per phase (tag / write / other), summed over job durations."""
+    phases = {"tag": 0.0, "write": 0.0, "other": 0.0}
+    for job in jobs:
+        if job.get("status") != "SUCCEEDED" or "submissionTime" not in job or "completionTime" not in job:
+            continue
+        seconds = (parse_time(job["completionTime"]) - parse_time(job["submissionTime"])).total_seconds()
+        label = " ".join(str(job.get(k, "")) for k in ("jobGroup", "description", "name")).lower()
+        if any(marker in label for marker in TAG_MARKERS):
+            phases["tag"] += seconds
+        elif any(marker in label for marker in WRITE_MARKERS):
+            phases["write"] += seconds
+        else:
+            phases["other"] += seconds
+    return phases
+
+
+def write_to_hudi(
+    df: DataFrame,
+    base_path: str,
+    operation: str,
+    mode: str,
+    index: str,
+    table_type: str,
+    profile: str = None,
+    auto_parallelism: bool = False
+) -> float:
+    """
+    Write df with the given index and return the wall-clock seconds.
+
+    Args:
+        df: Rows to write
+        base_path: S3A path for the benchmark table
+        operation: Hudi operation ('bulk_insert' or 'upsert')
+        mode: Write mode ('append' or 'overwrite')
+        index: Index type from config.HUDI_INDEXES
+        table_type: COPY_ON_WRITE or MERGE_ON_READ
+        profile: Hudi write-tuning profile from config.HUDI_PROFILES; index overrides its index type
+        auto_parallelism: Size shuffle parallelism from df (default: the cluster's)
+    """
+    hudi_options = get_hudi_options(
+        table_name=f"index_benchmark_{index}",
+        record_key="id",
+        precombine_key="ts",
+        table_type=table_type,
+        profile=profile,
+        df=df if auto_parallelism else None,
+        index=index,
+    )
+    hudi_options["hoodie.datasource.write.operation"] = operation
+    started = time.perf_counter()
+    df.write.format("hudi") \
+        .options(**hudi_options) \
+        .mode(mode) \
+        .save(base_path)
+    return time.perf_counter() - started
+
+
+def run_benchmark(spark: SparkSession, args: argparse.Namespace) -> List[Dict]:
+    rows = int(args.rows)
+    tuning = {"profile": args.profile, "auto_parallelism": args.auto_parallelism}
+    results = []
+    for index in args.indexes:
+        base_path = f"{BASE_PATH}/{index}"
+        engine = index_options(index, "id", args.table_type).get("hoodie.index.bucket.engine")
+        logger.info(f"[{index}] bulk_insert {rows:,} rows into {base_path}"
+                    + (f" ({engine} engine)" if engine else ""))
+        load_seconds = write_to_hudi(create_rows(spark, 0, rows, args.sequential_keys, ts=1), base_path,
+                                     "bulk_insert", "overwrite", index, args.table_type, **tuning)
+
+        batch = create_upsert_batch(spark, rows, args.update_fraction, args.insert_fraction,
+                                    args.sequential_keys).cache()
+        batch_rows = batch.count()
+
+        before = last_job_id(spark)
+        upsert_seconds = write_to_hudi(batch, base_path, "upsert", "append", index, args.table_type, **tuning)
+        phases = phase_times(fetch_jobs(spark, before))
+        batch.unpersist()
+
+        result = {"index": index, "rows": rows, "upsert_rows": batch_rows, "load_s": load_seconds,
+                  "upsert_s": upsert_seconds, **{f"{k}_s": v for k, v in phases.items()}}
+        logger.info(f"[{index}] upsert of {batch_rows:,} rows: {upsert_seconds:.1f}s "
+                    f"(tag {phases['tag']:.1f}s, write {phases['write']:.1f}s, other {phases['other']:.1f}s)")
+        results.append(result)
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Time Hudi upsert tag/write phases per index type")
+    add_profile_arguments(parser)
+    parser.add_argument("--rows", type=float, default=1_000_000, help="Rows in the base table (e.g. 5e6)")
+    parser.add_argument("--update-fraction", type=float, default=0.1, help="Share of existing ids updated")
+    parser.add_argument("--insert-fraction", type=float, default=0.02, help="New ids, as a share of --rows")
+    parser.add_argument("--indexes", nargs="+", choices=HUDI_INDEXES, default=list(HUDI_INDEXES))
+    parser.add_argument("--table-type", choices=["COPY_ON_WRITE", "MERGE_ON_READ"], default="MERGE_ON_READ",
+                        help="MERGE_ON_READ is needed for the consistent-hashing bucket engine")
+    parser.add_argument("--sequential-keys", action="store_true",
+                        help="Ordered ids, so bloom range pruning can skip files (default: hashed ids)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    spark = SparkSession.builder \
+        .appName("HudiIndexUpsertBenchmark") \
+        .config("spark.serializer", "org.apache.spark.serializer.KryoSerializer") \
+        .config("spark.driver.extraJavaOptions", "-Dlog4j.configuration=file:/app/log4j.properties") \
+        .config("spark.executor.extraJavaOptions", "-Dlog4j.configuration=file:/app/log4j.properties") \
+        .getOrCreate()
+    spark.sparkContext.setLogLevel('WARN')
+
+    configure_s3a_for_minio(spark)
+
+    results = run_benchmark(spark, args)
+
+    print(f"{'index':<8} {'rows':>12} {'upsert rows':>12} {'load s':>8} {'upsert s':>9} "
+          f"{'tag s':>7} {'write s':>8} {'other s':>8}")
+    for r in results:
+        print(f"{r['index']:<8} {r['rows']:>12,} {r['upsert_rows']:>12,} {r['load_s']:>8.1f} {r['upsert_s']:>9.1f} "
+              f"{r['tag_s']:>7.1f} {r['write_s']:>8.1f} {r['other_s']:>8.1f}")
+
+    spark.stop()
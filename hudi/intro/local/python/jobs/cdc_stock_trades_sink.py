@@ -0,0 +1,294 @@
+"""
+cdc_stock_trades_sink.py
+
+Mirrors the Debezium ``stock_trades`` topic into a Hudi table with Spark
+Structured Streaming. Each micro-batch:
+
+1. Parses the Debezium envelopes (``op`` c/u/d/r with ``before``/``after``).
+2. Collapses them to the latest change per ``trade_id``. Debezium keys messages by
+   primary key, so a trade's changes share a partition and the highest offset is the
+   newest.
+3. Issues at most one Hudi upsert (creates, updates, snapshot reads) and one
+   Hudi delete per batch, using ``updated_at`` as the precombine key.
+
+Batch size is capped by ``--max-offsets-per-trigger`` and batches start every
+``--trigger-interval``. Writes are idempotent, so a batch replayed after a
+failure (foreachBatch is at-least-once) leaves the table unchanged.
+
+Assumes the Spark session is configured for S3A access to a MinIO-based object store,
+that job scripts are mounted at /app inside the container, and that the Spark
+containers can reach Kafka (e.g. ``docker network connect spark_hudi-net kafka``).
+
+    python hudi_spark_interaction.py --filename cdc_stock_trades_sink.py -- --trigger-interval "30 seconds"
+"""
+
+import argparse
+import logging
+from typing import Optional
+
+from pyspark.sql import Column, DataFrame, SparkSession, Window
+from pyspark.sql import functions as F
+from pyspark.sql.types import LongType, StringType, StructField, StructType
+from config import add_profile_arguments, get_hudi_options, configure_s3a_for_minio
+
+# Configure logger with timestamp format
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+TABLE_NAME = "stock_trades"
+PRICE_SCALE = 2
+UPSERT_OPS = ("c", "u", "r")
+
+ROW_SCHEMA = StructType([
+    StructField("trade_id", StringType()),
+    StructField("stock_name", StringType()),
+    # Base64 bytes (decimal.handling.mode=precise), or a numeric string/number
+    StructField("stock_price", StringType()),
+    StructField("stock_purchase_choice", StringType()),
+    StructField("trader_id", StringType()),
+    StructField("created_at", StringType()),
+    StructField("updated_at", StringType()),
+])
+ENVELOPE_FIELDS = [
+    StructField("before", ROW_SCHEMA),
+    StructField("after", ROW_SCHEMA),
+    StructField("op", StringType()),
+    StructField("ts_ms", LongType()),
+]
+# Bare envelope (schemas disabled on the Connect worker) or wrapped in "payload"
+MESSAGE_SCHEMA = StructType(ENVELOPE_FIELDS + [StructField("payload", StructType(ENVELOPE_FIELDS))])
+
+
+def decode_price(value: Column, decimal_mode: str) -> Column:
+    """
+    Decode a Debezium NUMERIC(12,2) column into decimal(12,2).
+
+    In precise mode the value is base64 big-endian two's-complement bytes of the
+    unscaled integer; the other modes carry the number itself.
+    """
+    if decimal_mode != "precise":
+        return value.cast("decimal(12,2)")
+    raw = F.unbase64(value)
+    unsigned = F.conv(F.hex(raw), 16, 10).cast("decimal(38,0)")
+    negative = F.substring(F.hex(raw), 1, 1) >= F.lit("8")
+    unscaled = F.when(negative, unsigned - F.pow(F.lit(2), F.length(raw) * 8).cast("decimal(38,0)")) \
+        .otherwise(unsigned)
+    return (unscaled / F.pow(F.lit(10), F.lit(PRICE_SCALE)).cast("decimal(38,0)")).cast("decimal(12,2)")
+
+
+def parse_changes(batch_df: DataFrame, decimal_mode: str = "precise") -> DataFrame:
+    """
+    Turn raw Kafka rows into one row per change with the table's columns.
+
+    Deletes take their key columns from ``before``; with the default replica
+    identity the other columns are null there, and ``updated_at`` falls back
+    to the event time so the precombine key is never null.
+    """
+    message = F.from_json(F.col("value").cast("string"), MESSAGE_SCHEMA)
+    envelope = F.coalesce(
+        message.getField("payload"),
+        F.struct(*[message.getField(field.name).alias(field.name) for field in ENVELOPE_FIELDS]),
+    )
+    changes = batch_df.select(envelope.alias("e"), "partition", "offset")
+    row = F.when(F.col("e.op") == "d", F.col("e.before")).otherwise(F.col("e.after"))
+    event_time = (F.col("e.ts_ms") / 1000).cast("timestamp")
+
+    return changes.where(F.col("e.op").isNotNull()).select(
+        F.col("e.op").alias("op"),
+        row.getField("trade_id").alias("trade_id"),
+        row.getField("stock_name").alias("stock_name"),
+        decode_price(row.getField("stock_price"), decimal_mode).alias("stock_price"),
+        row.getField("stock_purchase_choice").alias("stock_purchase_choice"),
+        row.getField("trader_id").alias("trader_id"),
+        F.to_timestamp(row.getField("created_at")).alias("created_at"),
+        F.coalesce(F.to_timestamp(row.getField("updated_at")), event_time).alias("updated_at"),
+        F.to_date(F.to_timestamp(row.getField("created_at"))).cast("string").alias("trade_date"),
+        "partition",
+        "offset",
+    )
+
+
+def latest_per_trade(changes: DataFrame) -> DataFrame:
+    """Keep only the newest change (highest Kafka offset) for each trade_id."""
+    newest_first = Window.partitionBy("trade_id").orderBy(F.col("partition").desc(), F.col("offset").desc())
+    return changes.where(F.col("trade_id").isNotNull()) \
+        .withColumn("_rank", F.row_number().over(newest_first)) \
+        .where(F.col("_rank") == 1) \
+        .drop("_rank", "partition", "offset")
+
+
+def write_to_hudi(
+    df: DataFrame,
+    base_path: str,
+    operation: str,
+    table_type: str,
+    profile: Optional[str] = None,
+    auto_parallelism: bool = False,
+) -> None:
+    """
+    Write a DataFrame to the mirrored table with the given Hudi operation.
+
+    Args:
+        df: Rows to upsert, or keys (with partition path and precombine) to delete
+        base_path: S3A path for the Hudi table
+        operation: Hudi operation ('upsert' or 'delete')
+        table_type: COPY_ON_WRITE or MERGE_ON_READ
+        profile: Hudi write-tuning profile from config.HUDI_PROFILES
+        auto_parallelism: Size shuffle parallelism from df
+    """
+    hudi_options = get_hudi_options(
+        table_name=TABLE_NAME,
+        record_key="trade_id",
+        precombine_key="updated_at",
+        table_type=table_type,
+        profile=profile,
+        df=df if auto_parallelism else None,
+    )
+    hudi_options["hoodie.datasource.write.operation"] = operation
+    hudi_options["hoodie.datasource.write.partitionpath.field"] = "trade_date"
+    df.write.format("hudi") \
+        .options(**hudi_options) \
+        .mode("append") \
+        .save(base_path)
+
+
+def apply_batch(
+    batch_df: DataFrame,
+    batch_id: int,
+    base_path: str,
+    table_type: str,
+    decimal_mode: str,
+    profile: Optional[str] = None,
+    auto_parallelism: bool = False,
+) -> None:
+    """foreachBatch handler: collapse the batch, then one upsert and one delete."""
+    latest = latest_per_trade(parse_changes(batch_df, decimal_mode)).persist()
+    try:
+        counts = {row["op"]: row["count"] for row in latest.groupBy("op").count().collect()}
+        upserts = sum(counts.get(op, 0) for op in UPSERT_OPS)
+        deletes = counts.get("d", 0)
+        if not upserts and not deletes:
+            logger.info(f"Batch {batch_id}: no changes")
+            return
+
+        if upserts:
+            write_to_hudi(latest.where(F.col("op").isin(*UPSERT_OPS)).drop("op"), base_path, "upsert", table_type,
+                          profile, auto_parallelism)
+        if deletes:
+            write_to_hudi(
+                latest.where(F.col("op") == "d").select("trade_id", "trade_date", "updated_at"),
+                base_path, "delete", table_type, profile, auto_parallelism,
+            )
+        logger.info(f"Batch {batch_id}: {upserts} upserts, {deletes} deletes")
+    finally:
+        latest.unpersist()
+
+
+def start_sink(
+    spark: SparkSession,
+    bootstrap_servers: str,
+    topic: str,
+    base_path: str,
+    checkpoint_location: str,
+    max_offsets_per_trigger: Optional[int],
+    trigger_interval: str,
+    starting_offsets: str = "earliest",
+    table_type: str = "COPY_ON_WRITE",
+    decimal_mode: str = "precise",
+    available_now: bool = False,
+    profile: Optional[str] = None,
+    auto_parallelism: bool = False,
+):
+    """
+    Start the streaming query that applies the topic's changes to Hudi.
+
+    Args:
+        spark: SparkSession
+        bootstrap_servers: Kafka bootstrap servers
+        topic: Debezium topic for stock_trades
+        base_path: S3A path for the Hudi table
+        checkpoint_location: Where Spark tracks consumed offsets
+        max_offsets_per_trigger: Most Kafka records per micro-batch (None for no cap)
+        trigger_interval: Processing-time trigger, e.g. '30 seconds'
+        starting_offsets: 'earliest' or 'latest' for the first run
+        table_type: COPY_ON_WRITE or MERGE_ON_READ
+        decimal_mode: The connector's decimal.handling.mode
+        available_now: Drain everything available in capped batches, then stop
+        profile: Hudi write-tuning profile from config.HUDI_PROFILES
+        auto_parallelism: Size shuffle parallelism from each batch
+
+    Returns:
+        StreamingQuery
+    """
+    reader = spark.readStream.format("kafka") \
+        .option("kafka.bootstrap.servers", bootstrap_servers) \
+        .option("subscribe", topic) \
+        .option("startingOffsets", starting_offsets) \
+        .option("failOnDataLoss", "false")
+    if max_offsets_per_trigger:
+        reader = reader.option("maxOffsetsPerTrigger", max_offsets_per_trigger)
+
+    writer = reader.load().writeStream \
+        .foreachBatch(lambda df, batch_id: apply_batch(df, batch_id, base_path, table_type, decimal_mode,
+                                                       profile, auto_parallelism)) \
+        .option("checkpointLocation", checkpoint_location)
+    writer = writer.trigger(availableNow=True) if available_now else writer.trigger(processingTime=trigger_interval)
+
+    logger.info(f"Mirroring {topic} into {base_path} (trigger={trigger_interval}, "
+                f"maxOffsetsPerTrigger={max_offsets_per_trigger}, profile={profile or 'default'})")
+    return writer.start()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Apply Debezium stock_trades changes to Hudi in micro-batches")
+    parser.add_argument("--bootstrap-servers", default="kafka:29092")
+    parser.add_argument("--topic", default="cdc.public.stock_trades")
+    parser.add_argument("--base-path", default="s3a://hudi-bucket/stock_trades")
+    parser.add_argument("--checkpoint-location", default="s3a://hudi-bucket/checkpoints/stock_trades")
+    parser.add_argument("--max-offsets-per-trigger", type=int, default=50000,
+                        help="Most Kafka records per micro-batch (0 for no cap)")
+    parser.add_argument("--trigger-interval", default="30 seconds", help="Time between micro-batches")
+    parser.add_argument("--starting-offsets", choices=["earliest", "latest"], default="earliest")
+    parser.add_argument("--table-type", choices=["COPY_ON_WRITE", "MERGE_ON_READ"], default="COPY_ON_WRITE")
+    parser.add_argument("--decimal-handling-mode", choices=["precise", "string", "double"], default="precise")
+    parser.add_argument("--available-now", action="store_true",
+                        help="Process what is in the topic now, then exit")
+    add_profile_arguments(parser)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    spark = SparkSession.builder \
+        .appName("CDCStockTradesHudiSink") \
+        .config("spark.serializer", "org.apache.spark.serializer.KryoSerializer") \
+        .config("spark.driver.extraJavaOptions", "-Dlog4j.configuration=file:/app/log4j.properties") \
+        .config("spark.executor.extraJavaOptions", "-Dlog4j.configuration=file:/app/log4j.properties") \
+        .getOrCreate()
+    spark.sparkContext.setLogLevel('WARN')
+
+    configure_s3a_for_minio(spark)
+
+    query = start_sink(
+        spark,
+        bootstrap_servers=args.bootstrap_servers,
+        topic=args.topic,
+        base_path=args.base_path,
+        checkpoint_location=args.checkpoint_location,
+        max_offsets_per_trigger=args.max_offsets_per_trigger or None,
+        trigger_interval=args.trigger_interval,
+        starting_offsets=args.starting_offsets,
+        table_type=args.table_type,
+        decimal_mode=args.decimal_handling_mode,
+        available_now=args.available_now,
+        profile=args.profile,
+        auto_parallelism=args.auto_parallelism,
+    )
+    query.awaitTermination()
+
+    spark.stop()
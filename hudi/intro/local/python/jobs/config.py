@@ -1,5 +1,195 @@
-def get_hudi_options(table_name, record_key, precombine_key, table_type="COPY_ON_WRITE"):
-    return {
+"""
+config.py
+
+Shared Hudi write options and MinIO/S3A setup for the jobs.
+
+``get_hudi_options`` always returns the table identity options. A named entry
+from ``HUDI_PROFILES`` adds write tuning on top. Passing the input DataFrame
+also sizes shuffle parallelism from its estimated bytes, never below its
+partition count.
+
+Profiles:
+- bulk-ingest: large files, no small-file bin-packing, sorted bulk inserts.
+  Compaction and clustering are left to async/offline runs so ingest pays
+  nothing for them.
+- streaming-upsert: mid-size files, small-file handling on, and a bucket
+  index so tagging hashes keys instead of reading file footers. Compaction
+  runs inline every few delta commits.
+- read-heavy: large files, a record-level index and column stats for data
+  skipping. Compaction runs on every delta commit and clustering inline, so
+  readers see few, well-sized base files.
+
+An index from ``HUDI_INDEXES`` (``index=``) overrides the profile's index:
+- bloom: Hudi's default; tagging checks key ranges and bloom filters in
+  every candidate file's footer.
+- bucket: consistent-hashing bucket index on the record key. Tagging is a
+  hash, with no file reads; clustering splits and merges buckets as they grow.
+  Hudi 0.14 only supports consistent hashing on MERGE_ON_READ, so
+  COPY_ON_WRITE tables get the fixed-size SIMPLE bucket engine instead.
+- record: the metadata table's record-level index, a key -> file-group
+  lookup that does not scan data files.
+
+The index type is fixed when a table is created. Pick a profile or index
+when you first write a table, and change it only with a rewrite (mode
+overwrite).
+"""
+
+import logging
+import math
+
+MB = 1024 * 1024
+
+HUDI_PROFILES = {
+    "bulk-ingest": {
+        "hoodie.parquet.max.file.size": str(256 * MB),
+        "hoodie.parquet.small.file.limit": "0",
+        "hoodie.bulkinsert.sort.mode": "PARTITION_SORT",
+        "hoodie.combine.before.insert": "false",
+        "hoodie.index.type": "BLOOM",
+        "hoodie.bloom.index.prune.by.ranges": "true",
+        "hoodie.compact.inline": "false",
+        "hoodie.datasource.compaction.async.enable": "true",
+        "hoodie.clustering.inline": "false",
+        "hoodie.clustering.async.enabled": "true",
+    },
+    "streaming-upsert": {
+        "hoodie.parquet.max.file.size": str(120 * MB),
+        "hoodie.parquet.small.file.limit": str(100 * MB),
+        "hoodie.index.type": "BUCKET",
+        "hoodie.index.bucket.engine": "SIMPLE",
+        "hoodie.bucket.index.num.buckets": "16",
+        "hoodie.compact.inline": "true",
+        "hoodie.compact.inline.max.delta.commits": "5",
+        "hoodie.clustering.inline": "false",
+        "hoodie.clustering.async.enabled": "false",
+    },
+    "read-heavy": {
+        "hoodie.parquet.max.file.size": str(256 * MB),
+        "hoodie.parquet.small.file.limit": str(200 * MB),
+        "hoodie.index.type": "RECORD_INDEX",
+        "hoodie.metadata.record.index.enable": "true",
+        "hoodie.metadata.index.column.stats.enable": "true",
+        "hoodie.compact.inline": "true",
+        "hoodie.compact.inline.max.delta.commits": "1",
+        "hoodie.clustering.inline": "true",
+        "hoodie.clustering.inline.max.commits": "4",
+        "hoodie.clustering.plan.strategy.small.file.limit": str(200 * MB),
+        "hoodie.clustering.plan.strategy.target.file.max.bytes": str(256 * MB),
+    },
+}
+
+# Input bytes per shuffle task when sizing parallelism; roughly one output file each
+PROFILE_TASK_BYTES = {
+    "bulk-ingest": 256 * MB,
+    "streaming-upsert": 64 * MB,
+    "read-heavy": 128 * MB,
+}
+DEFAULT_TASK_BYTES = 128 * MB
+
+HUDI_INDEXES = ("bloom", "bucket", "record")
+DEFAULT_NUM_BUCKETS = 8
+
+SHUFFLE_PARALLELISM_KEYS = (
+    "hoodie.insert.shuffle.parallelism",
+    "hoodie.upsert.shuffle.parallelism",
+    "hoodie.bulkinsert.shuffle.parallelism",
+    "hoodie.delete.shuffle.parallelism",
+)
+
+
+def estimate_parallelism(df, target_task_bytes=DEFAULT_TASK_BYTES, max_parallelism=None):
+    """
+    Shuffle parallelism for writing df: one task per target_task_bytes of the
+    optimizer's size estimate, but at least df's partition count. Small or
+    badly estimated inputs therefore keep the parallelism they already have.
+
+    Args:
+        df: DataFrame about to be written
+        target_task_bytes: Input bytes per task
+        max_parallelism: Upper bound, e.g. a few times the cluster's cores (None for none)
+
+    Returns:
+        int
+    """
+    partitions = max(1, df.rdd.getNumPartitions())
+    size = int(str(df._jdf.queryExecution().optimizedPlan().stats().sizeInBytes()))
+    # Sources without statistics report spark.sql.defaultSizeInBytes (Long.MaxValue)
+    if size < 2 ** 62:
+        parallelism = max(math.ceil(size / target_task_bytes), partitions)
+    else:
+        parallelism = partitions
+    return min(parallelism, max_parallelism) if max_parallelism else parallelism
+
+
+def index_options(index, record_key, table_type="COPY_ON_WRITE", num_buckets=DEFAULT_NUM_BUCKETS):
+    """
+    Options selecting an index type for a table keyed on record_key.
+
+    Args:
+        index: Name from HUDI_INDEXES
+        record_key: Record key field, hashed by the bucket index
+        table_type: COPY_ON_WRITE or MERGE_ON_READ
+        num_buckets: Initial buckets per partition for the bucket index
+
+    Returns:
+        dict of Hudi options
+    """
+    if index == "bloom":
+        return {"hoodie.index.type": "BLOOM"}
+    if index == "record":
+        return {
+            "hoodie.index.type": "RECORD_INDEX",
+            "hoodie.metadata.enable": "true",
+            "hoodie.metadata.record.index.enable": "true",
+        }
+    if index != "bucket":
+        raise ValueError(f"Unknown Hudi index '{index}', expected one of {list(HUDI_INDEXES)}")
+
+    options = {
+        "hoodie.index.type": "BUCKET",
+        "hoodie.bucket.index.hash.field": record_key,
+        "hoodie.bucket.index.num.buckets": str(num_buckets),
+    }
+    if table_type != "MERGE_ON_READ":
+        logging.getLogger(__name__).warning(
+            "Consistent-hashing bucket index needs MERGE_ON_READ in Hudi 0.14; using the SIMPLE bucket engine"
+        )
+        options["hoodie.index.bucket.engine"] = "SIMPLE"
+        return options
+    options.update({
+        "hoodie.index.bucket.engine": "CONSISTENT_HASHING",
+        "hoodie.bucket.index.min.num.buckets": str(num_buckets),
+        "hoodie.bucket.index.max.num.buckets": str(num_buckets * 16),
+        # Resizing happens in clustering with the consistent-bucket strategies
+        "hoodie.clustering.plan.strategy.class":
+            "org.apache.hudi.client.clustering.plan.strategy.SparkConsistentBucketClusteringPlanStrategy",
+        "hoodie.clustering.execution.strategy.class":
+            "org.apache.hudi.client.clustering.run.strategy.SparkConsistentBucketClusteringExecutionStrategy",
+        "hoodie.clustering.updates.strategy":
+            "org.apache.hudi.client.clustering.update.strategy.SparkConsistentBucketDuplicateUpdateStrategy",
+    })
+    return options
+
+
+def get_hudi_options(
+    table_name, record_key, precombine_key, table_type="COPY_ON_WRITE", profile=None, df=None, index=None
+):
+    """
+    Hudi write options for a table, optionally tuned by a profile.
+
+    Args:
+        table_name: Hudi table name
+        record_key: Record key field
+        precombine_key: Field that picks the winner among duplicate keys
+        table_type: COPY_ON_WRITE or MERGE_ON_READ
+        profile: Name from HUDI_PROFILES (None for Hudi's defaults)
+        df: When given, shuffle parallelism is sized from this DataFrame
+        index: Name from HUDI_INDEXES, overriding the profile's index (None to keep it)
+
+    Returns:
+        dict of options for df.write.options(**...)
+    """
+    options = {
         "hoodie.table.name": table_name,
         "hoodie.datasource.write.recordkey.field": record_key,
         "hoodie.datasource.write.precombine.field": precombine_key,
@@ -8,6 +198,33 @@ def get_hudi_options(table_name, record_key, precombine_key, table_type="COPY_ON
         "hoodie.datasource.write.table.type": table_type,
         "hoodie.datasource.write.hive.style.partitioning": "false",
     }
+    if profile:
+        if profile not in HUDI_PROFILES:
+            raise ValueError(f"Unknown Hudi profile '{profile}', expected one of {sorted(HUDI_PROFILES)}")
+        options.update(HUDI_PROFILES[profile])
+    if index:
+        options.update(index_options(index, record_key, table_type))
+    if df is not None:
+        parallelism = estimate_parallelism(df, PROFILE_TASK_BYTES.get(profile, DEFAULT_TASK_BYTES))
+        options.update({key: str(parallelism) for key in SHUFFLE_PARALLELISM_KEYS})
+    return options
+
+
+def add_profile_arguments(parser):
+    """Adds --profile and --auto-parallelism to a job's argument parser."""
+    parser.add_argument("--profile", choices=sorted(HUDI_PROFILES), default=None,
+                        help="Hudi write-tuning profile (default: Hudi's own defaults)")
+    parser.add_argument("--auto-parallelism", action="store_true",
+                        help="Size shuffle parallelism from each input DataFrame's partitions and bytes")
+    return parser
+
+
+def add_index_argument(parser):
+    """Adds --index to a job's argument parser."""
+    parser.add_argument("--index", choices=HUDI_INDEXES, default=None,
+                        help="Index type for the table's record key (default: the profile's, else bloom)")
+    return parser
+
 
 def configure_s3a_for_minio(spark_session):
     hadoop_conf = spark_session._jsc.hadoopConfiguration()
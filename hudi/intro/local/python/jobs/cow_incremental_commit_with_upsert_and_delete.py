@@ -11,9 +11,10 @@ Assumes the Spark session is configured for S3A access to a MinIO-based object s
 and that job scripts are mounted at /app inside the container.
 """
 
+import argparse
 import logging
 from pyspark.sql import SparkSession, DataFrame
-from config import get_hudi_options, configure_s3a_for_minio
+from config import add_index_argument, add_profile_arguments, get_hudi_options, configure_s3a_for_minio
 
 # Configure logger with timestamp format
 logging.basicConfig(
@@ -49,7 +50,16 @@ def create_delete_df(spark: SparkSession) -> DataFrame:
     ]
     return spark.createDataFrame(data)
 
-def write_to_hudi(spark: SparkSession, df: DataFrame, base_path: str, mode: str, operation: str = "upsert") -> None:
+def write_to_hudi(
+    spark: SparkSession,
+    df: DataFrame,
+    base_path: str,
+    mode: str,
+    operation: str = "upsert",
+    profile: str = None,
+    auto_parallelism: bool = False,
+    index: str = None
+) -> None:
     """
     Write a DataFrame to Hudi with specified mode and operation.
 
@@ -59,12 +69,18 @@ def write_to_hudi(spark: SparkSession, df: DataFrame, base_path: str, mode: str,
         base_path: S3A path for the Hudi table
         mode: Write mode ('append' or 'overwrite')
         operation: Hudi operation ('upsert' or 'delete')
+        profile: Hudi write-tuning profile from config.HUDI_PROFILES
+        auto_parallelism: Size shuffle parallelism from df
+        index: Index type from config.HUDI_INDEXES (keyed on id)
     """
     table_name = "users_table"
     hudi_options = get_hudi_options(
         table_name=table_name,
         record_key="id",
-        precombine_key="ts"  # Specified for deletes too
+        precombine_key="ts",  # Specified for deletes too
+        profile=profile,
+        df=df if auto_parallelism else None,
+        index=index
     )
     hudi_options["hoodie.datasource.write.operation"] = operation
 
@@ -98,6 +114,10 @@ def read_incremental(spark: SparkSession, base_path: str, begin_time: str) -> Da
         .load(base_path)
 
 if __name__ == "__main__":
+    parser = add_profile_arguments(argparse.ArgumentParser(description="COW upsert, delete and incremental read"))
+    args = add_index_argument(parser).parse_args()
+    tuning = {"profile": args.profile, "auto_parallelism": args.auto_parallelism, "index": args.index}
+
     spark = SparkSession.builder \
         .appName("COWIncrementalUpsertDeleteDemo") \
         .config("spark.serializer", "org.apache.spark.serializer.KryoSerializer") \
@@ -112,20 +132,20 @@ if __name__ == "__main__":
 
     # Step 1: Initial write
     initial_df = create_initial_df(spark)
-    write_to_hudi(spark, initial_df, base_path, mode="overwrite")
+    write_to_hudi(spark, initial_df, base_path, mode="overwrite", **tuning)
     commit1 = "00000000000001"  # Placeholder; will be actual instant time in prod
     logger.info("=== STATE AFTER INITIAL WRITE ===")
     read_hudi_table(spark, base_path).show(truncate=False)
 
     # Step 2: Upsert
     upsert_df = create_upsert_df(spark)
-    write_to_hudi(spark, upsert_df, base_path, mode="append")
+    write_to_hudi(spark, upsert_df, base_path, mode="append", **tuning)
     logger.info("=== STATE AFTER UPSERT ===")
     read_hudi_table(spark, base_path).show(truncate=False)
 
     # Step 3: Delete
     delete_df = create_delete_df(spark)
-    write_to_hudi(spark, delete_df, base_path, mode="append", operation="delete")
+    write_to_hudi(spark, delete_df, base_path, mode="append", operation="delete", **tuning)
     logger.info("=== STATE AFTER DELETE ===")
     read_hudi_table(spark, base_path).show(truncate=False)
 
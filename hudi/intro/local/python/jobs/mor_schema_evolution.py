@@ -15,16 +15,19 @@ This example uses:
 - MERGE_ON_READ table type
 - Inline compaction for simplicity
 - Direct marker type to avoid timeline-server dependencies in local/minimal setups
+- Optional write-tuning profile from config.HUDI_PROFILES (--profile); the
+  demo's compaction-after-every-delta-commit is kept on top of it
 
 Assumes:
 - Spark session is configured for S3A access to a MinIO-based object store.
 - Job scripts are mounted at /app inside the container.
 """
 
+import argparse
 import logging
 import sys
 from pyspark.sql import SparkSession, DataFrame
-from config import configure_s3a_for_minio  # existing MinIO/S3A helper
+from config import add_profile_arguments, configure_s3a_for_minio, get_hudi_options
 
 # Logger setup
 logging.basicConfig(
@@ -37,6 +40,13 @@ logger = logging.getLogger(__name__)
 BASE_PATH = "s3a://hudi-bucket/users_mor_evolution_table"
 TABLE_NAME = "users_mor_evolution_table"
 
+# The read-optimized view in step 3 relies on compacting after every delta commit
+DEMO_OPTIONS = {
+    "hoodie.compact.inline": "true",
+    "hoodie.compact.inline.max.delta.commits": "1",
+    "hoodie.write.markers.type": "DIRECT",
+}
+
 def create_initial_df(spark: SparkSession) -> DataFrame:
     """Initial dataset with schema: id, name, ts."""
     data = [
@@ -58,24 +68,23 @@ def write_to_hudi_simple(
     df: DataFrame,
     base_path: str,
     mode: str,
-    operation: str = "upsert"
+    operation: str = "upsert",
+    profile: str = None,
+    auto_parallelism: bool = False
 ) -> None:
     """
     Minimal MOR write with inline compaction and direct markers.
     """
-    hudi_options = {
-        "hoodie.table.name": TABLE_NAME,
-        "hoodie.datasource.write.table.name": TABLE_NAME,
-        "hoodie.datasource.write.table.type": "MERGE_ON_READ",
-        "hoodie.datasource.write.operation": operation,
-        "hoodie.datasource.write.recordkey.field": "id",
-        "hoodie.datasource.write.precombine.field": "ts",
-        "hoodie.compact.inline": "true",
-        "hoodie.compact.inline.max.delta.commits": "1",
-        "hoodie.write.markers.type": "DIRECT",
-        "hoodie.upsert.shuffle.parallelism": "2",
-        "hoodie.insert.shuffle.parallelism": "2",
-    }
+    hudi_options = get_hudi_options(
+        table_name=TABLE_NAME,
+        record_key="id",
+        precombine_key="ts",
+        table_type="MERGE_ON_READ",
+        profile=profile,
+        df=df if auto_parallelism else None
+    )
+    hudi_options["hoodie.datasource.write.operation"] = operation
+    hudi_options.update(DEMO_OPTIONS)
 
     logger.info(f"[{operation.upper()}] Writing to Hudi MERGE_ON_READ at {base_path} with mode={mode}")
     try:
@@ -99,6 +108,9 @@ def read_read_optimized(spark: SparkSession, base_path: str) -> DataFrame:
         .load(base_path)
 
 def main():
+    args = add_profile_arguments(argparse.ArgumentParser(description="MOR schema evolution demo")).parse_args()
+    tuning = {"profile": args.profile, "auto_parallelism": args.auto_parallelism}
+
     spark = SparkSession.builder \
         .appName("MORSchemaEvolutionKISS") \
         .config("spark.serializer", "org.apache.spark.serializer.KryoSerializer") \
@@ -112,13 +124,13 @@ def main():
     try:
         # Step 1: Initial MOR write (bulk_insert to establish table)
         initial_df = create_initial_df(spark)
-        write_to_hudi_simple(spark, initial_df, BASE_PATH, mode="overwrite", operation="bulk_insert")
+        write_to_hudi_simple(spark, initial_df, BASE_PATH, mode="overwrite", operation="bulk_insert", **tuning)
         logger.info("=== STATE AFTER INITIAL WRITE (SNAPSHOT) ===")
         read_snapshot(spark, BASE_PATH).show(truncate=False)
 
         # Step 2: Schema evolution - upsert with new 'email' column
         evolved_df = create_evolved_df(spark)
-        write_to_hudi_simple(spark, evolved_df, BASE_PATH, mode="append", operation="upsert")
+        write_to_hudi_simple(spark, evolved_df, BASE_PATH, mode="append", operation="upsert", **tuning)
         logger.info("=== STATE AFTER SCHEMA EVOLUTION (SNAPSHOT) ===")
         read_snapshot(spark, BASE_PATH).show(truncate=False)
 
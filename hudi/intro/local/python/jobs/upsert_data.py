@@ -10,9 +10,10 @@ Assumes the Spark session is configured for S3A access to a MinIO-based object s
 and that job scripts are mounted at /app inside the container.
 """
 
+import argparse
 import logging
 from pyspark.sql import SparkSession, DataFrame
-from config import get_hudi_options, configure_s3a_for_minio
+from config import add_index_argument, add_profile_arguments, get_hudi_options, configure_s3a_for_minio
 
 # Configure logger with timestamp format
 logging.basicConfig(
@@ -45,7 +46,15 @@ def create_upsert_df(spark: SparkSession) -> DataFrame:
     ]
     return spark.createDataFrame(data)
 
-def write_to_hudi(spark: SparkSession, df: DataFrame, base_path: str, mode: str) -> None:
+def write_to_hudi(
+    spark: SparkSession,
+    df: DataFrame,
+    base_path: str,
+    mode: str,
+    profile: str = None,
+    auto_parallelism: bool = False,
+    index: str = None
+) -> None:
     """
     Write a DataFrame to Hudi with specified mode.
 
@@ -54,12 +63,18 @@ def write_to_hudi(spark: SparkSession, df: DataFrame, base_path: str, mode: str)
         df: DataFrame to write
         base_path: S3A path for the Hudi table
         mode: Write mode ('append' or 'overwrite')
+        profile: Hudi write-tuning profile from config.HUDI_PROFILES
+        auto_parallelism: Size shuffle parallelism from df
+        index: Index type from config.HUDI_INDEXES (keyed on id)
     """
     table_name = "users_table"
     hudi_options = get_hudi_options(
         table_name=table_name,
         record_key="id",
-        precombine_key="ts"
+        precombine_key="ts",
+        profile=profile,
+        df=df if auto_parallelism else None,
+        index=index
     )
     logger.info(f"Writing to Hudi table at {base_path} with mode='{mode}'")
     df.write.format("hudi") \
@@ -82,6 +97,10 @@ def read_hudi_table(spark: SparkSession, base_path: str) -> DataFrame:
     return spark.read.format("hudi").load(base_path)
 
 if __name__ == "__main__":
+    parser = add_profile_arguments(argparse.ArgumentParser(description="Hudi upsert demo"))
+    args = add_index_argument(parser).parse_args()
+    tuning = {"profile": args.profile, "auto_parallelism": args.auto_parallelism, "index": args.index}
+
     spark = SparkSession.builder \
         .appName("HudiUpsertDemo") \
         .config("spark.serializer", "org.apache.spark.serializer.KryoSerializer") \
@@ -95,7 +114,7 @@ if __name__ == "__main__":
 
     # Step 1: Write initial data
     initial_df = create_initial_df(spark)
-    write_to_hudi(spark, initial_df, base_path, mode="overwrite")
+    write_to_hudi(spark, initial_df, base_path, mode="overwrite", **tuning)
 
     # Step 2: Read and display table before upsert
     logger.info("=== STATE BEFORE UPSERT ===")
@@ -104,7 +123,7 @@ if __name__ == "__main__":
 
     # Step 3: Write upsert data
     upsert_df = create_upsert_df(spark)
-    write_to_hudi(spark, upsert_df, base_path, mode="append")
+    write_to_hudi(spark, upsert_df, base_path, mode="append", **tuning)
 
     # Step 4: Read and display table after upsert
     logger.info("=== STATE AFTER UPSERT ===")
@@ -8,9 +8,10 @@ to verify the write. The write operation uses overwrite mode and assumes a Copy-
 Assumes the environment is correctly set up with S3A, Hudi dependencies, and logging.
 """
 
+import argparse
 import logging
 from pyspark.sql import SparkSession, DataFrame
-from config import get_hudi_options, configure_s3a_for_minio
+from config import add_profile_arguments, get_hudi_options, configure_s3a_for_minio
 
 # Configure logger with timestamp format
 logging.basicConfig(
@@ -37,7 +38,9 @@ def create_sample_df(spark: SparkSession) -> DataFrame:
     ]
     return spark.createDataFrame(data)
 
-def write_to_hudi(spark: SparkSession, df: DataFrame, base_path: str) -> None:
+def write_to_hudi(
+    spark: SparkSession, df: DataFrame, base_path: str, profile: str = None, auto_parallelism: bool = False
+) -> None:
     """
     Write the given DataFrame to a Hudi table using overwrite mode.
 
@@ -45,12 +48,16 @@ def write_to_hudi(spark: SparkSession, df: DataFrame, base_path: str) -> None:
         spark: SparkSession instance
         df: DataFrame to write
         base_path: S3A path where the Hudi table will be stored
+        profile: Hudi write-tuning profile from config.HUDI_PROFILES
+        auto_parallelism: Size shuffle parallelism from df
     """
     table_name = "users_table"
     hudi_options = get_hudi_options(
         table_name=table_name,
         record_key="id",
-        precombine_key="ts"
+        precombine_key="ts",
+        profile=profile,
+        df=df if auto_parallelism else None
     )
     logger.info(f"Writing to Hudi table at {base_path} with overwrite mode")
     df.write.format("hudi") \
@@ -72,6 +79,8 @@ def read_from_hudi(spark: SparkSession, base_path: str) -> None:
     df.show(truncate=False)
 
 if __name__ == "__main__":
+    args = add_profile_arguments(argparse.ArgumentParser(description="Write and read back a Hudi table")).parse_args()
+
     spark = SparkSession.builder \
         .appName("HudiInteractions") \
         .config("spark.serializer", "org.apache.spark.serializer.KryoSerializer") \
@@ -83,7 +92,7 @@ if __name__ == "__main__":
 
     base_path = "s3a://hudi-bucket/users_table"
     df = create_sample_df(spark)
-    write_to_hudi(spark, df, base_path)
+    write_to_hudi(spark, df, base_path, args.profile, args.auto_parallelism)
     read_from_hudi(spark, base_path)
 
     spark.stop()
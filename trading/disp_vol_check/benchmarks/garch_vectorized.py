@@ -0,0 +1,98 @@
+"""
+Benchmark the vectorized GARCH(1,1) engine against per-ticker arch fits.
+
+Run from trading/disp_vol_check:
+
+    python -m benchmarks.garch_vectorized --sizes 100,1000,5000
+
+arch is timed on --arch-sample tickers per size and extrapolated, since a
+5,000-ticker serial arch run takes minutes. Every arch fit in the sample is
+also compared with the vectorized fit and the run fails if they disagree by
+more than --tolerance.
+"""
+
+import argparse
+import time
+import warnings
+
+import numpy as np
+from arch import arch_model
+
+from garch_vectorized import fit_garch_panel
+from synthetic import simulate_garch_returns
+
+warnings.filterwarnings('ignore')
+
+
+def fit_with_arch(returns_panel):
+    fits = {}
+    for ticker in returns_panel.columns:
+        garch = arch_model(returns_panel[ticker] * 100, vol='Garch', p=1, q=1, dist='normal')
+        fits[ticker] = garch.fit(update_freq=0, disp='off')
+    return fits
+
+
+def compare(vectorized, fits):
+    """Relative conditional-vol error and log-likelihood gap per ticker"""
+    vol_errors, ll_gaps = [], []
+    for ticker, fit in fits.items():
+        arch_vol = fit.conditional_volatility / 100
+        ours = vectorized[ticker]['conditional_vol']
+        vol_errors.append(np.max(np.abs(ours - arch_vol) / arch_vol))
+
+        params = fit.params.copy()
+        params['omega'] = vectorized[ticker]['omega']
+        params['alpha[1]'] = vectorized[ticker]['alpha']
+        params['beta[1]'] = vectorized[ticker]['beta']
+        ll_gaps.append(fit.loglikelihood - fit.model.fix(params).loglikelihood)
+    return np.array(vol_errors), np.array(ll_gaps)
+
+
+def run(sizes, n_obs, arch_sample, tolerance, seed):
+    failures = 0
+    print(f"{'Tickers':>8} {'Vectorized (s)':>15} {'arch est. (s)':>14} {'Speedup':>8} "
+          f"{'Median vol err':>15} {'Within tol':>11}")
+
+    for size in sizes:
+        panel = simulate_garch_returns(n_obs, size, seed=seed)
+
+        start = time.perf_counter()
+        vectorized = fit_garch_panel(panel)
+        vectorized_seconds = time.perf_counter() - start
+
+        sample = panel.iloc[:, :min(arch_sample, size)]
+        start = time.perf_counter()
+        fits = fit_with_arch(sample)
+        arch_seconds = (time.perf_counter() - start) * size / sample.shape[1]
+
+        vol_errors, ll_gaps = compare(vectorized, fits)
+        # Boundary solutions (alpha + beta -> 1) are flat in the likelihood, so
+        # a small loglik gap counts as agreement even if the paths differ.
+        within = (vol_errors <= tolerance) | (np.abs(ll_gaps) <= 1e-2)
+        failures += int((~within).sum())
+
+        print(f"{size:>8} {vectorized_seconds:>15.2f} {arch_seconds:>14.2f} "
+              f"{arch_seconds / vectorized_seconds:>7.1f}x {np.median(vol_errors):>15.2e} "
+              f"{within.sum():>5}/{within.size:<5}")
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized GARCH(1,1) against arch")
+    parser.add_argument("--sizes", default="100,1000,5000", help="Comma-separated ticker counts")
+    parser.add_argument("--obs", type=int, default=500, help="Trading days per ticker")
+    parser.add_argument("--arch-sample", type=int, default=50, help="Tickers fitted with arch per size")
+    parser.add_argument("--tolerance", type=float, default=1e-2,
+                        help="Max relative conditional-vol difference against arch")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    failures = run(sizes, args.obs, args.arch_sample, args.tolerance, args.seed)
+    if failures:
+        raise SystemExit(f"{failures} tickers outside tolerance against arch")
+
+
+if __name__ == "__main__":
+    main()
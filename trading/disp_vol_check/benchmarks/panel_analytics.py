@@ -0,0 +1,76 @@
+"""
+Benchmark panel regimes/dispersion against the per-ticker stocks.py functions.
+
+Run from trading/disp_vol_check:
+
+    python -m benchmarks.panel_analytics --tickers 5000 --obs 500
+
+Builds a dates x tickers volatility/returns panel with ragged histories
+(each ticker starts on a random date), then times
+analyze_volatility_regimes + analyze_dispersion once per ticker against one
+panel_analytics call, which also produces the cross-sectional dispersion
+series. Per-ticker results are compared.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from panel_analytics import panel_analytics
+from stocks import analyze_dispersion, analyze_volatility_regimes
+
+
+def make_panel(n_obs, n_tickers, seed):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2022-01-03", periods=n_obs)
+    volatility = np.abs(rng.normal(0.02, 0.006, (n_obs, n_tickers)))
+    returns = rng.normal(0, 1, (n_obs, n_tickers)) * volatility
+
+    # Ragged histories: tickers listed part-way through the sample
+    starts = rng.integers(0, n_obs // 2, n_tickers)
+    missing = np.arange(n_obs)[:, None] < starts[None, :]
+    volatility[missing] = np.nan
+    returns[missing] = np.nan
+    return pd.DataFrame(returns, index=index), pd.DataFrame(volatility, index=index)
+
+
+def per_ticker(returns, volatility):
+    rows = {}
+    for ticker in volatility.columns:
+        vol = volatility[ticker].dropna()
+        stats = analyze_volatility_regimes(returns[ticker], vol)
+        stats['dispersion'] = analyze_dispersion(vol)
+        rows[ticker] = stats
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark panel regime/dispersion analytics")
+    parser.add_argument("--tickers", type=int, default=5000)
+    parser.add_argument("--obs", type=int, default=500, help="Trading days in the panel")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    returns, volatility = make_panel(args.obs, args.tickers, args.seed)
+
+    start = time.perf_counter()
+    reference = per_ticker(returns, volatility)
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stats, cross_section = panel_analytics(returns, volatility)
+    panel_seconds = time.perf_counter() - start
+
+    print(f"Panel: {args.obs} days x {args.tickers} tickers (ragged)")
+    print(f"Per-ticker loop:  {loop_seconds:8.3f}s")
+    print(f"panel_analytics:  {panel_seconds:8.3f}s  (incl. {len(cross_section)}-date cross-sectional series)")
+    print(f"Speedup: {loop_seconds / panel_seconds:.0f}x")
+    for column in ('high_vol_return', 'low_vol_return', 'high_vol_days', 'low_vol_days', 'dispersion'):
+        error = np.nanmax(np.abs(stats[column].to_numpy(dtype=float) - reference[column].to_numpy(dtype=float)))
+        print(f"  max abs error {column:<16} {error:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Benchmark the per-ticker stages of the volatility pipeline on synthetic data.
+
+Run from trading/disp_vol_check:
+
+    python -m benchmarks.pipeline --sizes 10,50,200 --output bench_pipeline.json
+
+For each universe size, simulated OHLCV bars (GBM or GARCH) are written as
+Parquet fixtures and read back through LocalFileSource, so no network access
+is needed. Every ticker then goes through the same stages as analyze_stock,
+each timed on its own:
+
+    get_stock_data -> calculate_returns -> fit_garch_model -> fit_egarch_model
+    -> analyze_dispersion (GARCH and EGARCH) -> analyze_volatility_regimes
+
+The report has p50/p90/p99/mean latency per stage, peak traced memory
+(tracemalloc) and tickers per second for each size. --output writes it as JSON
+so runs on different commits can be diffed. Pass --no-tracemalloc for timings
+without tracing overhead.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import warnings
+from contextlib import redirect_stdout
+
+import numpy as np
+import pandas as pd
+
+from data_sources import LocalFileSource
+from stocks import (analyze_dispersion, analyze_volatility_regimes, calculate_returns,
+                    fit_egarch_model, fit_garch_model, get_stock_data)
+from synthetic import simulate_ohlcv, write_ohlcv_fixtures
+
+warnings.filterwarnings('ignore')
+
+STAGES = [
+    'get_stock_data',
+    'calculate_returns',
+    'fit_garch_model',
+    'fit_egarch_model',
+    'analyze_dispersion',
+    'analyze_volatility_regimes',
+]
+PERCENTILES = (50, 90, 99)
+
+
+def run_ticker(ticker, start_date, end_date, source, timings):
+    """One ticker through every stage, appending each stage's seconds to timings"""
+    def timed(stage, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        timings[stage].append(time.perf_counter() - start)
+        return result
+
+    data = timed('get_stock_data', get_stock_data, ticker, start_date, end_date, None, source)
+    data, _ = timed('calculate_returns', calculate_returns, data)
+    _, garch_results = timed('fit_garch_model', fit_garch_model, data['Log_Returns'])
+    _, egarch_results = timed('fit_egarch_model', fit_egarch_model, data['Log_Returns'])
+
+    garch_vol = pd.Series(garch_results['conditional_vol'], index=data.index)
+    egarch_vol = garch_vol if egarch_results is None else pd.Series(egarch_results['conditional_vol'], index=data.index)
+
+    start = time.perf_counter()
+    analyze_dispersion(garch_vol)
+    analyze_dispersion(egarch_vol)
+    timings['analyze_dispersion'].append(time.perf_counter() - start)
+
+    timed('analyze_volatility_regimes', analyze_volatility_regimes, data['Log_Returns'], garch_vol)
+
+
+def summarize(samples):
+    samples = np.asarray(samples)
+    summary = {f"p{q}": float(np.percentile(samples, q)) for q in PERCENTILES}
+    summary['mean'] = float(samples.mean())
+    summary['total'] = float(samples.sum())
+    return summary
+
+
+def run_size(size, n_obs, model, seed, trace_memory):
+    bars = simulate_ohlcv(n_obs + 1, size, model=model, seed=seed)
+    first = next(iter(bars.values())).index
+    start_date, end_date = first[0], first[-1] + pd.Timedelta(days=1)
+
+    with tempfile.TemporaryDirectory() as fixtures_dir:
+        write_ohlcv_fixtures(fixtures_dir, bars)
+        del bars
+        source = LocalFileSource(fixtures_dir)
+        timings = {stage: [] for stage in STAGES}
+
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        # The stage functions print progress (e.g. EGARCH fallbacks); keep it out of the report
+        with redirect_stdout(io.StringIO()):
+            for ticker in source_tickers(fixtures_dir):
+                run_ticker(ticker, start_date, end_date, source, timings)
+        wall_seconds = time.perf_counter() - start
+        peak_bytes = None
+        if trace_memory:
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    return {
+        'tickers': size,
+        'observations': n_obs,
+        'wall_seconds': wall_seconds,
+        'tickers_per_second': size / wall_seconds,
+        'peak_traced_mib': None if peak_bytes is None else peak_bytes / 2**20,
+        'stages': {stage: summarize(samples) for stage, samples in timings.items()},
+    }
+
+
+def source_tickers(fixtures_dir):
+    return sorted(name[:-len(".parquet")] for name in os.listdir(fixtures_dir) if name.endswith(".parquet"))
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    import arch
+
+    return {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'arch': arch.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def print_report(result):
+    memory = "n/a" if result['peak_traced_mib'] is None else f"{result['peak_traced_mib']:.1f} MiB"
+    print(f"\n{result['tickers']} tickers x {result['observations']} days: "
+          f"{result['wall_seconds']:.2f}s, {result['tickers_per_second']:.1f} tickers/s, peak traced {memory}")
+    print(f"  {'Stage':<28} {'p50 (ms)':>10} {'p90 (ms)':>10} {'p99 (ms)':>10} {'Share':>7}")
+    stage_total = sum(stats['total'] for stats in result['stages'].values())
+    for stage, stats in result['stages'].items():
+        print(f"  {stage:<28} {stats['p50'] * 1e3:>10.2f} {stats['p90'] * 1e3:>10.2f} "
+              f"{stats['p99'] * 1e3:>10.2f} {stats['total'] / stage_total:>6.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the per-ticker volatility pipeline stages")
+    parser.add_argument("--sizes", default="10,50,200", help="Comma-separated universe sizes")
+    parser.add_argument("--obs", type=int, default=500, help="Trading days per ticker")
+    parser.add_argument("--model", choices=["garch", "gbm"], default="garch", help="Price process for the fixtures")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-tracemalloc", action="store_true", help="Skip peak memory tracing")
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    report = {
+        'benchmark': 'pipeline',
+        'parameters': vars(args),
+        'environment': environment(),
+        'results': [],
+    }
+    for size in (int(size) for size in args.sizes.split(",")):
+        result = run_size(size, args.obs, args.model, args.seed, not args.no_tracemalloc)
+        print_report(result)
+        report['results'].append(result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
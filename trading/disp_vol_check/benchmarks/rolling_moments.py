@@ -0,0 +1,73 @@
+"""
+Benchmark rolling_moments against the pandas path main.py used before.
+
+Run from trading/disp_vol_check:
+
+    python -m benchmarks.rolling_moments --rows 1000000 --window 20
+
+The old path is rolling().mean(), rolling().std() and
+rolling().apply(scipy.stats.skew). The apply step is timed on --apply-rows
+rows and scaled linearly, since a full 1M-row apply runs for minutes.
+Outputs are compared on the overlapping rows.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from rolling_moments import rolling_moments
+
+
+def pandas_moments(series, window, apply_rows):
+    start = time.perf_counter()
+    mean = series.rolling(window=window).mean()
+    std = series.rolling(window=window).std()
+    cv = std / mean
+    vectorized_seconds = time.perf_counter() - start
+
+    sample = series.iloc[:apply_rows]
+    start = time.perf_counter()
+    skew = sample.rolling(window=window).apply(lambda x: stats.skew(x))
+    apply_seconds = (time.perf_counter() - start) * len(series) / len(sample)
+
+    return pd.DataFrame({'mean': mean, 'std': std, 'cv': cv}), skew, vectorized_seconds + apply_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rolling_moments against pandas rolling")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--window", type=int, default=20)
+    parser.add_argument("--apply-rows", type=int, default=100_000,
+                        help="Rows used to time the rolling().apply(stats.skew) step")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    # Positive, slowly varying series shaped like a conditional volatility path
+    series = pd.Series(0.02 * np.exp(np.cumsum(rng.normal(0, 0.01, args.rows))))
+
+    start = time.perf_counter()
+    moments = rolling_moments(series, args.window)
+    kernel_seconds = time.perf_counter() - start
+
+    reference, skew, pandas_seconds = pandas_moments(series, args.window, min(args.apply_rows, args.rows))
+
+    errors = {
+        name: np.nanmax(np.abs(moments[name] - reference[name]) / np.abs(reference[name]))
+        for name in ('mean', 'std', 'cv')
+    }
+    errors['skew'] = np.nanmax(np.abs(moments['skew'].iloc[:len(skew)] - skew))
+
+    print(f"Rows: {args.rows:,}  window: {args.window}")
+    print(f"pandas (mean/std/apply skew, est.): {pandas_seconds:8.2f}s")
+    print(f"rolling_moments (all five):         {kernel_seconds:8.2f}s")
+    print(f"Speedup: {pandas_seconds / kernel_seconds:.0f}x")
+    for name, error in errors.items():
+        print(f"  max {'abs' if name == 'skew' else 'rel'} error {name:<5} {error:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import os
+
+import pandas as pd
+
+
+# ============================================
+# DATA SOURCES
+# ============================================
+# A data source exposes download(tickers, start_date, end_date) and returns one
+# wide frame for the whole batch, with (Price, Ticker) MultiIndex columns in the
+# same layout yf.download uses for a list of tickers.
+
+class YFinanceSource:
+    """Fetch OHLCV bars from Yahoo Finance, one HTTP call per batch"""
+
+    def __init__(self, threads=True):
+        self.threads = threads
+
+    def download(self, tickers, start_date, end_date):
+        import yfinance as yf
+
+        return yf.download(
+            list(tickers),
+            start=start_date,
+            end=end_date,
+            group_by="column",
+            threads=self.threads,
+            progress=False,
+        )
+
+
+class LocalFileSource:
+    """Read OHLCV bars from <directory>/<TICKER>.parquet or .csv files.
+
+    Stands in for YFinanceSource in tests and benchmarks, so no network access
+    is needed. Tickers without a file are returned as empty frames.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def read(self, ticker):
+        parquet_path = os.path.join(self.directory, f"{ticker}.parquet")
+        if os.path.exists(parquet_path):
+            return pd.read_parquet(parquet_path)
+
+        csv_path = os.path.join(self.directory, f"{ticker}.csv")
+        if os.path.exists(csv_path):
+            return pd.read_csv(csv_path, index_col=0, parse_dates=True)
+
+        return None
+
+    def download(self, tickers, start_date, end_date):
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        frames = {}
+        for ticker in tickers:
+            data = self.read(ticker)
+            if data is not None:
+                frames[ticker] = data[(data.index >= start) & (data.index < end)]
+
+        if not frames:
+            return pd.DataFrame()
+
+        wide = pd.concat(frames, axis=1, names=["Ticker", "Price"])
+        return wide.swaplevel(axis=1).sort_index(axis=1)
+
+
+# ============================================
+# LOADING
+# ============================================
+def flatten_columns(data):
+    """Collapse yfinance MultiIndex columns down to the price field level"""
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = data.columns.get_level_values(0)
+    return data
+
+
+def split_by_ticker(wide, tickers):
+    """Split a wide (Price, Ticker) frame into one flat frame per ticker"""
+    if wide.empty:
+        return {ticker: pd.DataFrame() for ticker in tickers}
+
+    if not isinstance(wide.columns, pd.MultiIndex):
+        # Some yfinance versions return flat columns for a single ticker
+        if len(tickers) != 1:
+            raise ValueError("Expected (Price, Ticker) MultiIndex columns for a multi-ticker batch")
+        return {tickers[0]: wide}
+
+    column_tickers = wide.columns.get_level_values(1)
+    frames = {}
+    for ticker in tickers:
+        frame = wide.loc[:, column_tickers == ticker].copy()
+        frames[ticker] = flatten_columns(frame).dropna(how="all")
+    return frames
+
+
+def load_stock_data_bulk(ticker_list, start_date="2022-01-01", end_date="2024-01-01",
+                         batch_size=100, source=None, cache=None):
+    """Load bars for many tickers with one source call per batch.
+
+    With an OHLCVCache, tickers already covered are served from disk and the
+    rest are grouped by the date range they are missing, so each group is still
+    fetched in batches.
+    """
+    source = source or YFinanceSource()
+    tickers = list(dict.fromkeys(ticker_list))
+
+    if cache is None:
+        return _download_batched(tickers, start_date, end_date, batch_size, source)
+
+    all_data = {}
+    lookups = {}
+    pending = {}
+    for ticker in tickers:
+        cached, coverage, missing = cache.lookup(ticker, start_date, end_date)
+        if cache.offline or not missing:
+            all_data[ticker] = cache.slice(cached, start_date, end_date)
+            continue
+        lookups[ticker] = (cached, coverage)
+        pending.setdefault(tuple(missing), []).append(ticker)
+
+    for missing, group in pending.items():
+        fetched = {ticker: [] for ticker in group}
+        for fetch_start, fetch_end in missing:
+            frames = _download_batched(
+                group,
+                fetch_start.strftime("%Y-%m-%d"),
+                fetch_end.strftime("%Y-%m-%d"),
+                batch_size,
+                source,
+            )
+            for ticker, frame in frames.items():
+                fetched[ticker].append(((fetch_start, fetch_end), frame))
+
+        for ticker in group:
+            cached, coverage = lookups[ticker]
+            all_data[ticker] = cache.update(ticker, cached, coverage, fetched[ticker], start_date, end_date)
+
+    return {ticker: all_data[ticker] for ticker in tickers}
+
+
+def _download_batched(tickers, start_date, end_date, batch_size, source):
+    all_data = {}
+    for i in range(0, len(tickers), batch_size):
+        batch = tickers[i:i + batch_size]
+        wide = source.download(batch, start_date, end_date)
+        all_data.update(split_by_ticker(wide, batch))
+    return all_data
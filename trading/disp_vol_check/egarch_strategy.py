@@ -0,0 +1,159 @@
+import multiprocessing
+import time
+from multiprocessing.connection import wait
+
+DEFAULT_DISTRIBUTIONS = ('normal', 'ged', 't')
+SELECTION_RULES = ('first', 'aic', 'bic')
+
+
+# ============================================
+# CONCURRENT EGARCH SPECIFICATION SEARCH
+# ============================================
+# Each candidate error distribution is fitted in its own process so a slow or
+# non-converging optimizer can be killed outright: with select='first' the
+# later candidates are terminated as soon as the winner is known, and any fit
+# still running when the timeout expires is terminated and reported as timed
+# out. Callers that are already one of many worker processes (stocks.py
+# --workers) pass parallel=False and the candidates are fitted in turn.
+
+def fit_egarch_candidates(returns_series, distributions=DEFAULT_DISTRIBUTIONS, select='first',
+                          timeout=None, fit_options=None, parallel=True):
+    """Fit EGARCH(1,1) under several error distributions.
+
+    select='first' keeps the earliest distribution in the given order whose
+    fit succeeds, so the winner does not depend on which process finishes
+    first; 'aic'/'bic' wait for all fits (up to timeout seconds) and keep the
+    lowest criterion.
+
+    With parallel=False the fits run one after another in this process. The
+    timeout then cannot interrupt a fit that is already running: candidates
+    not yet started when it expires are skipped and reported as timed out.
+
+    Returns {'dist', 'fit', 'attempts'}; dist/fit are None when nothing
+    succeeded, and attempts maps each distribution to its status
+    ('ok', 'failed', 'timeout' or 'cancelled'), wall time and AIC/BIC.
+    """
+    if select not in SELECTION_RULES:
+        raise ValueError(f"select must be one of {SELECTION_RULES}, got {select!r}")
+
+    if not parallel or multiprocessing.current_process().daemon:
+        # Daemonic processes cannot start children either
+        return _fit_sequential(returns_series, distributions, select, timeout, fit_options)
+
+    context = multiprocessing.get_context()
+    started = time.perf_counter()
+    running = {}
+    for dist in distributions:
+        reader, writer = context.Pipe(duplex=False)
+        process = context.Process(
+            target=_fit_in_child,
+            args=(writer, returns_series, dist, fit_options),
+            daemon=True,
+        )
+        process.start()
+        writer.close()
+        running[reader] = (dist, process)
+
+    attempts = {}
+    fits = {}
+    deadline = None if timeout is None else started + timeout
+
+    while running:
+        remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+        ready = wait(list(running), timeout=remaining)
+        if not ready:
+            break
+
+        for reader in ready:
+            dist, process = running.pop(reader)
+            try:
+                status, payload = reader.recv()
+            except EOFError:
+                status, payload = 'failed', f"worker exited with code {process.exitcode}"
+            reader.close()
+            process.join()
+
+            attempts[dist] = _attempt(status, time.perf_counter() - started, payload)
+            if status == 'ok':
+                fits[dist] = payload
+
+        if select == 'first' and _first_decided(fits, attempts, distributions):
+            break
+
+    decided = select == 'first' and _first_decided(fits, attempts, distributions)
+    for reader, (dist, process) in running.items():
+        process.terminate()
+        process.join()
+        reader.close()
+        attempts[dist] = _attempt('cancelled' if decided else 'timeout', time.perf_counter() - started)
+
+    return _select(fits, attempts, distributions, select)
+
+
+def _fit_in_child(writer, returns_series, dist, fit_options):
+    try:
+        writer.send(('ok', _fit_one(returns_series, dist, fit_options)))
+    except Exception as e:
+        writer.send(('failed', str(e)))
+    finally:
+        writer.close()
+
+
+def _fit_one(returns_series, dist, fit_options):
+    from arch import arch_model
+
+    egarch = arch_model(returns_series * 100, vol='EGARCH', p=1, q=1, o=1, dist=dist)
+    return egarch.fit(update_freq=0, disp='off', show_warning=False, options=fit_options)
+
+
+def _first_decided(fits, attempts, distributions):
+    """True once every candidate listed before the first success has finished"""
+    for dist in distributions:
+        if dist in fits:
+            return True
+        if dist not in attempts:
+            return False
+    return False
+
+
+def _fit_sequential(returns_series, distributions, select, timeout, fit_options):
+    attempts = {}
+    fits = {}
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    for dist in distributions:
+        if deadline is not None and time.perf_counter() >= deadline:
+            attempts[dist] = _attempt('timeout', 0.0)
+            continue
+        started = time.perf_counter()
+        try:
+            fit = _fit_one(returns_series, dist, fit_options)
+        except Exception as e:
+            attempts[dist] = _attempt('failed', time.perf_counter() - started, str(e))
+            continue
+        attempts[dist] = _attempt('ok', time.perf_counter() - started, fit)
+        fits[dist] = fit
+        if select == 'first':
+            break
+    return _select(fits, attempts, distributions, select)
+
+
+def _attempt(status, seconds, payload=None):
+    attempt = {'status': status, 'seconds': seconds, 'aic': None, 'bic': None, 'error': None}
+    if status == 'ok':
+        attempt['aic'], attempt['bic'] = payload.aic, payload.bic
+    elif status == 'failed':
+        attempt['error'] = payload
+    return attempt
+
+
+def _select(fits, attempts, distributions, select):
+    # Report attempts in the order the candidates were given
+    attempts = {dist: attempts[dist] for dist in distributions if dist in attempts}
+    if not fits:
+        return {'dist': None, 'fit': None, 'attempts': attempts}
+
+    if select == 'first':
+        dist = next(d for d in distributions if d in fits)
+    else:
+        dist = min(fits, key=lambda d: attempts[d][select])
+    return {'dist': dist, 'fit': fits[dist], 'attempts': attempts}
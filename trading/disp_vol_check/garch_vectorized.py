@@ -0,0 +1,213 @@
+import numpy as np
+import pandas as pd
+
+# ============================================
+# VECTORIZED GARCH(1,1) ENGINE
+# ============================================
+# Fits a constant-mean GARCH(1,1) with normal errors -- the same specification
+# fit_garch_model uses -- for every column of a dates x tickers returns panel at
+# once. The variance recursion and the log-likelihood run over the time axis as
+# 2D NumPy operations across all tickers, and each ticker takes its own BHHH
+# step with its own line search, so tickers converge independently.
+#
+# Parameters are optimized in an unconstrained space:
+#   omega = exp(u1), persistence = sigmoid(u2),
+#   alpha = persistence * sigmoid(u3), beta = persistence - alpha
+# which keeps omega > 0, alpha, beta >= 0 and alpha + beta < 1.
+
+_LOG_2PI = np.log(2 * np.pi)
+_BACKCAST_TAU = 75
+
+
+def fit_garch_panel(returns_panel, max_iter=100, tol=1e-8):
+    """Fit GARCH(1,1) to each column of a dates x tickers returns DataFrame.
+
+    Returns {ticker: garch_results} with the same keys as fit_garch_model.
+    Tickers with fewer than 10 observations are left out.
+    """
+    values, lengths, positions = _pack_columns(returns_panel.to_numpy(dtype=float) * 100)
+    usable = lengths >= 10
+
+    params, sigma2, _, _ = garch_panel_mle(values[:, usable], lengths[usable], max_iter, tol)
+
+    all_results = {}
+    for j, column in enumerate(np.flatnonzero(usable)):
+        ticker = returns_panel.columns[column]
+        n = lengths[column]
+        _, omega, alpha, beta = params[j]
+        index = returns_panel.index[positions[:n, column]]
+        all_results[ticker] = {
+            'omega': omega,
+            'alpha': alpha,
+            'beta': beta,
+            'persistence': alpha + beta,
+            'conditional_vol': pd.Series(np.sqrt(sigma2[:n, j]) / 100, index=index, name=ticker)
+        }
+
+    return all_results
+
+
+def garch_panel_mle(values, lengths=None, max_iter=100, tol=1e-8):
+    """Maximum-likelihood GARCH(1,1) for a T x N array of (percent) returns.
+
+    Column n holds lengths[n] observations from row 0; rows past that are
+    ignored. Returns (params, sigma2, loglik, converged) where params is N x 4
+    in arch order (mu, omega, alpha, beta).
+    """
+    n_obs, n_series = values.shape
+    if lengths is None:
+        lengths = np.full(n_series, n_obs)
+    mask = np.arange(n_obs)[:, None] < lengths[None, :]
+
+    # Starting values mirror typical arch estimates for daily equity returns
+    mu0 = np.nanmean(np.where(mask, values, np.nan), axis=0)
+    var0 = np.nanvar(np.where(mask, values, np.nan), axis=0)
+    backcast = _backcast(values - mu0, lengths)
+    u = np.column_stack([
+        mu0,
+        np.log(np.maximum(var0 * 0.05, 1e-8)),
+        np.full(n_series, _logit(0.95)),
+        np.full(n_series, _logit(0.1 / 0.95)),
+    ])
+
+    loglik = _loglik(values, mask, backcast, _to_params(u))
+    converged = np.zeros(n_series, dtype=bool)
+
+    for _ in range(max_iter):
+        active = np.flatnonzero(~converged)
+        if active.size == 0:
+            break
+
+        v, m, bc, ua = values[:, active], mask[:, active], backcast[active], u[active]
+        scores = np.einsum('tni,nij->tnj', _scores(v, m, bc, _to_params(ua)), _jacobian(ua))
+
+        # BHHH: outer product of per-observation scores approximates -Hessian
+        gradient = scores.sum(axis=0)
+        hessian = np.einsum('tni,tnj->nij', scores, scores) + 1e-8 * np.eye(4)
+        direction = np.linalg.solve(hessian, gradient[..., None])[..., 0]
+
+        old = loglik[active]
+        step = np.ones(active.size)
+        accepted = np.zeros(active.size, dtype=bool)
+        new_u, new_ll = ua.copy(), old.copy()
+        for _ in range(30):
+            trying = np.flatnonzero(~accepted)
+            if trying.size == 0:
+                break
+            candidate = ua[trying] + step[trying, None] * direction[trying]
+            ll = _loglik(v[:, trying], m[:, trying], bc[trying], _to_params(candidate))
+            better = np.isfinite(ll) & (ll >= old[trying])
+            new_u[trying[better]] = candidate[better]
+            new_ll[trying[better]] = ll[better]
+            accepted[trying[better]] = True
+            step[trying[~better]] *= 0.5
+
+        u[active] = new_u
+        loglik[active] = new_ll
+        gain = new_ll - old
+        done = ~accepted | (np.abs(gain) <= tol * (1 + np.abs(old)))
+        converged[active[done]] = True
+
+    params = _to_params(u)
+    sigma2 = _variance(values, mask, backcast, params)
+    return params, sigma2, loglik, converged
+
+
+# ============================================
+# RECURSIONS
+# ============================================
+def _variance(values, mask, backcast, params):
+    mu, omega, alpha, beta = params.T
+    resid = np.where(mask, values - mu, 0.0)
+    sigma2 = np.empty_like(values)
+    sigma2[0] = omega + (alpha + beta) * backcast
+    for t in range(1, len(values)):
+        sigma2[t] = omega + alpha * resid[t - 1] ** 2 + beta * sigma2[t - 1]
+    return sigma2
+
+
+def _loglik(values, mask, backcast, params):
+    resid = np.where(mask, values - params[:, 0], 0.0)
+    sigma2 = _variance(values, mask, backcast, params)
+    terms = -0.5 * (_LOG_2PI + np.log(sigma2) + resid ** 2 / sigma2)
+    return np.where(mask, terms, 0.0).sum(axis=0)
+
+
+def _scores(values, mask, backcast, params):
+    """Per-observation score of the log-likelihood w.r.t. (mu, omega, alpha, beta)"""
+    mu, omega, alpha, beta = params.T
+    n_obs, n_series = values.shape
+    resid = np.where(mask, values - mu, 0.0)
+
+    scores = np.zeros((n_obs, n_series, 4))
+    sigma2 = omega + (alpha + beta) * backcast
+    d_sigma2 = np.column_stack([np.zeros(n_series), np.ones(n_series), backcast, backcast])
+    for t in range(n_obs):
+        if t > 0:
+            d_sigma2 = beta[:, None] * d_sigma2
+            d_sigma2[:, 0] += -2 * alpha * resid[t - 1]
+            d_sigma2[:, 1] += 1
+            d_sigma2[:, 2] += resid[t - 1] ** 2
+            d_sigma2[:, 3] += sigma2
+            sigma2 = omega + alpha * resid[t - 1] ** 2 + beta * sigma2
+
+        weight = -0.5 * (1 / sigma2 - resid[t] ** 2 / sigma2 ** 2)
+        scores[t] = weight[:, None] * d_sigma2
+        scores[t, :, 0] += resid[t] / sigma2
+        scores[t] *= mask[t][:, None]
+
+    return scores
+
+
+# ============================================
+# HELPERS
+# ============================================
+def _to_params(u):
+    persistence = _sigmoid(u[:, 2])
+    alpha = persistence * _sigmoid(u[:, 3])
+    return np.column_stack([u[:, 0], np.exp(u[:, 1]), alpha, persistence - alpha])
+
+
+def _jacobian(u):
+    """d(mu, omega, alpha, beta) / du for each series, shape N x 4 x 4"""
+    persistence, share = _sigmoid(u[:, 2]), _sigmoid(u[:, 3])
+    d_persistence = persistence * (1 - persistence)
+    d_share = share * (1 - share)
+
+    jac = np.zeros((len(u), 4, 4))
+    jac[:, 0, 0] = 1
+    jac[:, 1, 1] = np.exp(u[:, 1])
+    jac[:, 2, 2] = share * d_persistence
+    jac[:, 2, 3] = persistence * d_share
+    jac[:, 3, 2] = (1 - share) * d_persistence
+    jac[:, 3, 3] = -persistence * d_share
+    return jac
+
+
+def _backcast(resid, lengths):
+    """arch's exponentially weighted backcast of the initial variance"""
+    tau = min(_BACKCAST_TAU, len(resid))
+    weights = 0.94 ** np.arange(tau)
+    backcast = np.empty(resid.shape[1])
+    for n, length in enumerate(lengths):
+        k = min(tau, length)
+        w = weights[:k] / weights[:k].sum()
+        backcast[n] = np.sum(resid[:k, n] ** 2 * w)
+    return backcast
+
+
+def _pack_columns(values):
+    """Move each column's non-NaN values to the top so ragged histories line up"""
+    valid = ~np.isnan(values)
+    lengths = valid.sum(axis=0)
+    order = np.argsort(~valid, axis=0, kind='stable')
+    packed = np.take_along_axis(values, order, axis=0)
+    return packed, lengths, order
+
+
+def _sigmoid(x):
+    return 1 / (1 + np.exp(-np.clip(x, -50, 50)))
+
+
+def _logit(p):
+    return np.log(p / (1 - p))
@@ -1,235 +1,339 @@
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from arch import arch_model
-import yfinance as yf
-from scipy import stats
+"""
+Single-ticker GARCH/EGARCH volatility and dispersion pipeline.
+
+Stages (each usable on its own): fetch -> returns -> fit -> dispersion ->
+regimes -> plots -> export. Importing this module is cheap: pandas/numpy come
+in up front, while arch, yfinance, matplotlib and seaborn are only imported
+by the stage that needs them.
+
+    python main.py --ticker AAPL --start 2022-01-01 --end 2024-01-01 --no-plot
+"""
+
+import argparse
 import warnings
-warnings.filterwarnings('ignore')
 
-# Set style
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
+import numpy as np
 
+from ohlcv_cache import DEFAULT_CACHE_DIR, OHLCVCache
+from rolling_moments import coefficient_of_variation, rolling_moments
 
+warnings.filterwarnings('ignore')
 
-print("Fetching APPLE OHLCV data...")
-ticker = "AAPL"
+EGARCH_DISTRIBUTIONS = ['normal', 'ged', 't']
 
-APPLE = yf.download(ticker, start="2022-01-01", end="2024-01-01", progress=False)
 
-if isinstance(APPLE.columns, pd.MultiIndex):
-    APPLE.columns = APPLE.columns.get_level_values(0)
+# ============================================
+# PIPELINE STAGES
+# ============================================
+def fetch(ticker, start_date="2022-01-01", end_date="2024-01-01", cache=None):
+    """Load OHLCV bars for one ticker"""
+    from stocks import get_stock_data
 
-print(f"Data shape: {APPLE.shape}")
-print(f"Date range: {APPLE.index[0].date()} to {APPLE.index[-1].date()}")
-print("\nFirst few rows:")
-print(APPLE[['Open', 'High', 'Low', 'Close', 'Volume']].head())
+    print(f"Fetching {ticker} OHLCV data...")
+    data = get_stock_data(ticker, start_date, end_date, cache=cache)
+    if data.empty:
+        raise ValueError(f"No data for {ticker} between {start_date} and {end_date}")
 
+    print(f"Data shape: {data.shape}")
+    print(f"Date range: {data.index[0].date()} to {data.index[-1].date()}")
+    print("\nFirst few rows:")
+    print(data[['Open', 'High', 'Low', 'Close', 'Volume']].head())
+    return data
 
 
-# Log returns are better for volatility modeling
-APPLE['Log_Returns'] = np.log(APPLE['Close'] / APPLE['Close'].shift(1))
-APPLE = APPLE.dropna()
+def compute_returns(data):
+    """Add log returns and the Parkinson high-low range estimator"""
+    # Log returns are better for volatility modeling
+    data = data.copy()
+    data['Log_Returns'] = np.log(data['Close'] / data['Close'].shift(1))
+    data = data.dropna()
 
-APPLE['HL_Range'] = np.log(APPLE['High'] / APPLE['Low'])
-APPLE['Parkinson_Vol'] = (1/(4*np.log(2))) * (APPLE['HL_Range']**2)
+    data['HL_Range'] = np.log(data['High'] / data['Low'])
+    data['Parkinson_Vol'] = (1/(4*np.log(2))) * (data['HL_Range']**2)
 
-print(f"\n=== RETURN STATISTICS ===")
-print(f"Mean return: {APPLE['Log_Returns'].mean():.6f}")
-print(f"Std dev: {APPLE['Log_Returns'].std():.6f}")
-print(f"Skewness: {APPLE['Log_Returns'].skew():.4f}")
-print(f"Kurtosis: {APPLE['Log_Returns'].kurtosis():.4f}")
-print(f"Min return: {APPLE['Log_Returns'].min():.6f}")
-print(f"Max return: {APPLE['Log_Returns'].max():.6f}")
+    print(f"\n=== RETURN STATISTICS ===")
+    print(f"Mean return: {data['Log_Returns'].mean():.6f}")
+    print(f"Std dev: {data['Log_Returns'].std():.6f}")
+    print(f"Skewness: {data['Log_Returns'].skew():.4f}")
+    print(f"Kurtosis: {data['Log_Returns'].kurtosis():.4f}")
+    print(f"Min return: {data['Log_Returns'].min():.6f}")
+    print(f"Max return: {data['Log_Returns'].max():.6f}")
+    return data
 
 
+def fit_models(data, egarch_select='first', egarch_timeout=None):
+    """Fit GARCH(1,1) and EGARCH(1,1), adding their conditional volatilities"""
+    from arch import arch_model
 
-print("\n" + "="*50)
-print("GARCH(1,1) MODEL FITTING")
-print("="*50)
+    from egarch_strategy import fit_egarch_candidates
 
-garch = arch_model(APPLE['Log_Returns'] * 100, vol='Garch', p=1, q=1, dist='normal')
-garch_fit = garch.fit(update_freq=5, disp='off')
+    data = data.copy()
 
-print(garch_fit.summary())
+    print("\n" + "="*50)
+    print("GARCH(1,1) MODEL FITTING")
+    print("="*50)
 
-APPLE['GARCH_Volatility'] = garch_fit.conditional_volatility / 100  # Convert back from percentage
+    garch = arch_model(data['Log_Returns'] * 100, vol='Garch', p=1, q=1, dist='normal')
+    garch_fit = garch.fit(update_freq=5, disp='off')
 
+    print(garch_fit.summary())
 
+    data['GARCH_Volatility'] = garch_fit.conditional_volatility / 100  # Convert back from percentage
 
-print("\n" + "="*50)
-print("EGARCH(1,1) MODEL FITTING")
-print("="*50)
+    print("\n" + "="*50)
+    print("EGARCH(1,1) MODEL FITTING")
+    print("="*50)
 
-distributions = ['normal', 'ged', 't']
-egarch_success = False
+    # Candidate distributions are fitted in parallel; the losers are cancelled
+    print(f"Fitting EGARCH with {', '.join(d.upper() for d in EGARCH_DISTRIBUTIONS)} "
+          f"distributions concurrently (select={egarch_select})...")
+    selection = fit_egarch_candidates(data['Log_Returns'], EGARCH_DISTRIBUTIONS, egarch_select, egarch_timeout,
+                                      fit_options={'maxiter': 1000, 'ftol': 1e-10})
+    for dist, attempt in selection['attempts'].items():
+        detail = f"AIC {attempt['aic']:.2f}" if attempt['status'] == 'ok' else (attempt['error'] or '')[:80]
+        print(f"  {dist.upper():<7} {attempt['status']:<10} {attempt['seconds']:6.2f}s  {detail}")
 
-for dist in distributions:
-    try:
-        print(f"Trying EGARCH with {dist.upper()} distribution...")
-        egarch = arch_model(APPLE['Log_Returns'] * 100, vol='EGARCH', p=1, q=1, o=1, dist=dist)
-        
-        egarch_fit = egarch.fit(update_freq=5, disp='off', show_warning=False,
-                               options={'maxiter': 1000, 'ftol': 1e-10})
-        
-        print(f"Success with {dist.upper()} distribution!")
+    egarch_fit = selection['fit']
+    if egarch_fit is not None:
+        print(f"Selected {selection['dist'].upper()} distribution")
         print(egarch_fit.summary())
-        
-        APPLE['EGARCH_Volatility'] = egarch_fit.conditional_volatility / 100
-        egarch_success = True
-        break
-        
-    except Exception as e:
-        print(f"  {dist.upper()} failed: {str(e)[:80]}...")
-        continue
-
-if not egarch_success:
-    print("\nAll EGARCH specifications failed. Using GARCH volatility as proxy.")
-    APPLE['EGARCH_Volatility'] = APPLE['GARCH_Volatility']
-
-
-
-print("\n" + "="*50)
-print("VOLATILITY DISPERSION ANALYSIS")
-print("="*50)
-
-window = 20  
-
-APPLE['GARCH_Vol_MA'] = APPLE['GARCH_Volatility'].rolling(window=window).mean()
-APPLE['GARCH_Vol_Std'] = APPLE['GARCH_Volatility'].rolling(window=window).std()
-APPLE['GARCH_Vol_Skew'] = APPLE['GARCH_Volatility'].rolling(window=window).apply(lambda x: stats.skew(x))
-APPLE['GARCH_Vol_Dispersion'] = APPLE['GARCH_Vol_Std'] / APPLE['GARCH_Vol_MA']  # Coefficient of variation
-
-APPLE['EGARCH_Vol_Std'] = APPLE['EGARCH_Volatility'].rolling(window=window).std()
-APPLE['EGARCH_Vol_Dispersion'] = APPLE['EGARCH_Vol_Std'] / APPLE['EGARCH_Volatility'].rolling(window=window).mean()
-
-print("\nOverall Dispersion Statistics:")
-print(f"GARCH Volatility Mean: {APPLE['GARCH_Volatility'].mean():.6f}")
-print(f"GARCH Volatility Std Dev: {APPLE['GARCH_Volatility'].std():.6f}")
-print(f"GARCH Volatility CV (Dispersion): {APPLE['GARCH_Volatility'].std()/APPLE['GARCH_Volatility'].mean():.4f}")
-print(f"EGARCH Volatility CV (Dispersion): {APPLE['EGARCH_Volatility'].std()/APPLE['EGARCH_Volatility'].mean():.4f}")
-
-
-
-vol_threshold = APPLE['GARCH_Volatility'].quantile(0.75)  
-APPLE['Vol_Regime'] = np.where(APPLE['GARCH_Volatility'] > vol_threshold, 'High Vol', 'Low Vol')
-
-regime_stats = APPLE.groupby('Vol_Regime')['Log_Returns'].agg(['mean', 'std', 'count'])
-print("\n=== RETURN STATISTICS BY VOLATILITY REGIME ===")
-print(regime_stats)
-
-
-
-fig, axes = plt.subplots(4, 2, figsize=(15, 18))
-fig.suptitle(f'APPLE ({ticker}) Volatility Analysis with GARCH/EGARCH Models', fontsize=16, y=1.02)
-
-# Plot 1: Price and Returns
-axes[0, 0].plot(APPLE.index, APPLE['Close'], color='blue', linewidth=1.5)
-axes[0, 0].set_title('APPLE Stock Price', fontsize=12)
-axes[0, 0].set_ylabel('Price ($)')
-axes[0, 0].grid(True, alpha=0.3)
-
-axes[0, 1].plot(APPLE.index, APPLE['Log_Returns'], color='red', linewidth=0.8, alpha=0.7)
-axes[0, 1].axhline(y=0, color='black', linestyle='-', linewidth=0.5)
-axes[0, 1].set_title('Daily Log Returns', fontsize=12)
-axes[0, 1].set_ylabel('Returns')
-axes[0, 1].grid(True, alpha=0.3)
-
-# Plot 2: GARCH vs EGARCH Volatility
-axes[1, 0].plot(APPLE.index, APPLE['GARCH_Volatility'], color='green', linewidth=1.5, alpha=0.8, label='GARCH(1,1)')
-axes[1, 0].fill_between(APPLE.index, 0, APPLE['GARCH_Volatility'], alpha=0.2, color='green')
-axes[1, 0].set_title('GARCH(1,1) Conditional Volatility', fontsize=12)
-axes[1, 0].set_ylabel('Volatility')
-axes[1, 0].legend()
-axes[1, 0].grid(True, alpha=0.3)
-
-axes[1, 1].plot(APPLE.index, APPLE['EGARCH_Volatility'], color='purple', linewidth=1.5, alpha=0.8, label='EGARCH(1,1)')
-axes[1, 1].fill_between(APPLE.index, 0, APPLE['EGARCH_Volatility'], alpha=0.2, color='purple')
-axes[1, 1].set_title('EGARCH(1,1) Conditional Volatility', fontsize=12)
-axes[1, 1].set_ylabel('Volatility')
-axes[1, 1].legend()
-axes[1, 1].grid(True, alpha=0.3)
-
-# Plot 3: Volatility Dispersion
-axes[2, 0].plot(APPLE.index, APPLE['GARCH_Vol_Dispersion'], color='orange', linewidth=1.5)
-axes[2, 0].axhline(y=APPLE['GARCH_Vol_Dispersion'].mean(), color='red', linestyle='--', label=f'Mean: {APPLE["GARCH_Vol_Dispersion"].mean():.3f}')
-axes[2, 0].set_title('GARCH Volatility Dispersion (Coefficient of Variation)', fontsize=12)
-axes[2, 0].set_ylabel('Dispersion')
-axes[2, 0].legend()
-axes[2, 0].grid(True, alpha=0.3)
-
-# Plot 4: Rolling Volatility Statistics
-axes[2, 1].plot(APPLE.index, APPLE['GARCH_Vol_MA'], color='blue', label='20-day MA', linewidth=1.5)
-axes[2, 1].plot(APPLE.index, APPLE['GARCH_Volatility'], color='gray', alpha=0.3, label='Daily Vol', linewidth=0.5)
-axes[2, 1].fill_between(APPLE.index, 
-                        APPLE['GARCH_Vol_MA'] - APPLE['GARCH_Vol_Std'], 
-                        APPLE['GARCH_Vol_MA'] + APPLE['GARCH_Vol_Std'], 
-                        alpha=0.2, color='blue', label='±1 Std Dev')
-axes[2, 1].set_title('Rolling Volatility with Dispersion Bands', fontsize=12)
-axes[2, 1].set_ylabel('Volatility')
-axes[2, 1].legend()
-axes[2, 1].grid(True, alpha=0.3)
-
-# Plot 5: Volatility Distribution
-axes[3, 0].hist(APPLE['GARCH_Volatility'].dropna(), bins=50, color='green', alpha=0.7, edgecolor='black', density=True)
-axes[3, 0].axvline(x=APPLE['GARCH_Volatility'].mean(), color='red', linestyle='--', 
-                   label=f'Mean: {APPLE["GARCH_Volatility"].mean():.4f}')
-axes[3, 0].set_title('Distribution of GARCH Volatility', fontsize=12)
-axes[3, 0].set_xlabel('Volatility')
-axes[3, 0].set_ylabel('Density')
-axes[3, 0].legend()
-axes[3, 0].grid(True, alpha=0.3)
-
-# Plot 6: Volume vs Volatility
-scatter = axes[3, 1].scatter(APPLE['Volume']/1e6, APPLE['GARCH_Volatility']*100, 
-                            c=APPLE['Log_Returns'], cmap='coolwarm', alpha=0.6, s=20)
-axes[3, 1].set_title('Trading Volume vs. Volatility (color = return)', fontsize=12)
-axes[3, 1].set_xlabel('Volume (millions)')
-axes[3, 1].set_ylabel('Volatility (%)')
-plt.colorbar(scatter, ax=axes[3, 1], label='Return')
-
-plt.tight_layout()
-plt.show()
-
-
-
-print("\n" + "="*50)
-print("KEY INSIGHTS SUMMARY")
-print("="*50)
-
-print("\n1. VOLATILITY CHARACTERISTICS:")
-print(f"   - Average daily volatility: {APPLE['GARCH_Volatility'].mean()*100:.2f}%")
-print(f"   - Maximum volatility: {APPLE['GARCH_Volatility'].max()*100:.2f}%")
-print(f"   - Minimum volatility: {APPLE['GARCH_Volatility'].min()*100:.2f}%")
-
-print("\n2. DISPERSION ANALYSIS:")
-print(f"   - Volatility of volatility: {APPLE['GARCH_Volatility'].std()*100:.3f}%")
-print(f"   - Coefficient of Variation: {APPLE['GARCH_Volatility'].std()/APPLE['GARCH_Volatility'].mean():.3f}")
-print(f"   - Higher CV means more erratic/unpredictable volatility")
-
-print("\n3. REGIME ANALYSIS:")
-print(f"   - High volatility days (>75th percentile): {regime_stats.loc['High Vol', 'count']}")
-print(f"   - Low volatility days: {regime_stats.loc['Low Vol', 'count']}")
-print(f"   - Returns in high vol periods: {regime_stats.loc['High Vol', 'mean']*100:.3f}%")
-print(f"   - Returns in low vol periods: {regime_stats.loc['Low Vol', 'mean']*100:.3f}%")
-
-print("\n4. EGARCH LEVERAGE EFFECT:")
-egarch_params = egarch_fit.params
-if egarch_params.get('gamma[1]', 0) < 0:
-    print(f"   - Gamma parameter: {egarch_params.get('gamma[1]', 0):.4f}")
-    print("   - NEGATIVE gamma indicates leverage effect (bad news increases vol more than good news)")
-else:
-    print("   - No significant leverage effect detected")
-
-print("\n5. TRADING IMPLICATIONS:")
-print("   - High dispersion periods: Options more expensive, hedging more challenging")
-print("   - Low dispersion periods: More predictable risk environment")
-print("   - Use EGARCH for options pricing (captures asymmetry)")
-print("   - Use GARCH for risk management (VaR calculations)")
-
-# Save results to CSV
-APPLE[['Close', 'Log_Returns', 'GARCH_Volatility', 'EGARCH_Volatility', 
-       'GARCH_Vol_Dispersion', 'Vol_Regime']].to_csv(r'trading/disp_vol_check/APPLE_volatility_analysis.csv')
-print(f"\nResults saved to 'APPLE_volatility_analysis.csv'")
\ No newline at end of file
+        data['EGARCH_Volatility'] = egarch_fit.conditional_volatility / 100
+    else:
+        print("\nAll EGARCH specifications failed. Using GARCH volatility as proxy.")
+        data['EGARCH_Volatility'] = data['GARCH_Volatility']
+
+    return data, garch_fit, egarch_fit
+
+
+def compute_dispersion(data, window=20):
+    """Add rolling volatility moments and dispersion (coefficient of variation)"""
+    data = data.copy()
+
+    print("\n" + "="*50)
+    print("VOLATILITY DISPERSION ANALYSIS")
+    print("="*50)
+
+    # One running-sums pass per series gives all rolling moments at once
+    garch_moments = rolling_moments(data['GARCH_Volatility'], window)
+    data['GARCH_Vol_MA'] = garch_moments['mean']
+    data['GARCH_Vol_Std'] = garch_moments['std']
+    data['GARCH_Vol_Skew'] = garch_moments['skew']
+    data['GARCH_Vol_Dispersion'] = garch_moments['cv']  # Coefficient of variation
+
+    egarch_moments = rolling_moments(data['EGARCH_Volatility'], window)
+    data['EGARCH_Vol_Std'] = egarch_moments['std']
+    data['EGARCH_Vol_Dispersion'] = egarch_moments['cv']
+
+    print("\nOverall Dispersion Statistics:")
+    print(f"GARCH Volatility Mean: {data['GARCH_Volatility'].mean():.6f}")
+    print(f"GARCH Volatility Std Dev: {data['GARCH_Volatility'].std():.6f}")
+    print(f"GARCH Volatility CV (Dispersion): {coefficient_of_variation(data['GARCH_Volatility']):.4f}")
+    print(f"EGARCH Volatility CV (Dispersion): {coefficient_of_variation(data['EGARCH_Volatility']):.4f}")
+    return data
+
+
+def compute_regimes(data, quantile=0.75):
+    """Label high/low volatility regimes and summarize returns in each"""
+    data = data.copy()
+
+    vol_threshold = data['GARCH_Volatility'].quantile(quantile)
+    data['Vol_Regime'] = np.where(data['GARCH_Volatility'] > vol_threshold, 'High Vol', 'Low Vol')
+
+    regime_stats = data.groupby('Vol_Regime')['Log_Returns'].agg(['mean', 'std', 'count'])
+    print("\n=== RETURN STATISTICS BY VOLATILITY REGIME ===")
+    print(regime_stats)
+    return data, regime_stats
+
+
+def plot_analysis(data, ticker, show=True, path=None):
+    """Draw the 4x2 volatility dashboard; show it and/or save it to path"""
+    import matplotlib
+
+    if not show:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Set style
+    plt.style.use('seaborn-v0_8-darkgrid')
+    sns.set_palette("husl")
+
+    fig, axes = plt.subplots(4, 2, figsize=(15, 18))
+    fig.suptitle(f'{ticker} Volatility Analysis with GARCH/EGARCH Models', fontsize=16, y=1.02)
+
+    # Plot 1: Price and Returns
+    axes[0, 0].plot(data.index, data['Close'], color='blue', linewidth=1.5)
+    axes[0, 0].set_title(f'{ticker} Stock Price', fontsize=12)
+    axes[0, 0].set_ylabel('Price ($)')
+    axes[0, 0].grid(True, alpha=0.3)
+
+    axes[0, 1].plot(data.index, data['Log_Returns'], color='red', linewidth=0.8, alpha=0.7)
+    axes[0, 1].axhline(y=0, color='black', linestyle='-', linewidth=0.5)
+    axes[0, 1].set_title('Daily Log Returns', fontsize=12)
+    axes[0, 1].set_ylabel('Returns')
+    axes[0, 1].grid(True, alpha=0.3)
+
+    # Plot 2: GARCH vs EGARCH Volatility
+    axes[1, 0].plot(data.index, data['GARCH_Volatility'], color='green', linewidth=1.5, alpha=0.8, label='GARCH(1,1)')
+    axes[1, 0].fill_between(data.index, 0, data['GARCH_Volatility'], alpha=0.2, color='green')
+    axes[1, 0].set_title('GARCH(1,1) Conditional Volatility', fontsize=12)
+    axes[1, 0].set_ylabel('Volatility')
+    axes[1, 0].legend()
+    axes[1, 0].grid(True, alpha=0.3)
+
+    axes[1, 1].plot(data.index, data['EGARCH_Volatility'], color='purple', linewidth=1.5, alpha=0.8, label='EGARCH(1,1)')
+    axes[1, 1].fill_between(data.index, 0, data['EGARCH_Volatility'], alpha=0.2, color='purple')
+    axes[1, 1].set_title('EGARCH(1,1) Conditional Volatility', fontsize=12)
+    axes[1, 1].set_ylabel('Volatility')
+    axes[1, 1].legend()
+    axes[1, 1].grid(True, alpha=0.3)
+
+    # Plot 3: Volatility Dispersion
+    axes[2, 0].plot(data.index, data['GARCH_Vol_Dispersion'], color='orange', linewidth=1.5)
+    axes[2, 0].axhline(y=data['GARCH_Vol_Dispersion'].mean(), color='red', linestyle='--', label=f'Mean: {data["GARCH_Vol_Dispersion"].mean():.3f}')
+    axes[2, 0].set_title('GARCH Volatility Dispersion (Coefficient of Variation)', fontsize=12)
+    axes[2, 0].set_ylabel('Dispersion')
+    axes[2, 0].legend()
+    axes[2, 0].grid(True, alpha=0.3)
+
+    # Plot 4: Rolling Volatility Statistics
+    axes[2, 1].plot(data.index, data['GARCH_Vol_MA'], color='blue', label='20-day MA', linewidth=1.5)
+    axes[2, 1].plot(data.index, data['GARCH_Volatility'], color='gray', alpha=0.3, label='Daily Vol', linewidth=0.5)
+    axes[2, 1].fill_between(data.index,
+                            data['GARCH_Vol_MA'] - data['GARCH_Vol_Std'],
+                            data['GARCH_Vol_MA'] + data['GARCH_Vol_Std'],
+                            alpha=0.2, color='blue', label='±1 Std Dev')
+    axes[2, 1].set_title('Rolling Volatility with Dispersion Bands', fontsize=12)
+    axes[2, 1].set_ylabel('Volatility')
+    axes[2, 1].legend()
+    axes[2, 1].grid(True, alpha=0.3)
+
+    # Plot 5: Volatility Distribution
+    axes[3, 0].hist(data['GARCH_Volatility'].dropna(), bins=50, color='green', alpha=0.7, edgecolor='black', density=True)
+    axes[3, 0].axvline(x=data['GARCH_Volatility'].mean(), color='red', linestyle='--',
+                       label=f'Mean: {data["GARCH_Volatility"].mean():.4f}')
+    axes[3, 0].set_title('Distribution of GARCH Volatility', fontsize=12)
+    axes[3, 0].set_xlabel('Volatility')
+    axes[3, 0].set_ylabel('Density')
+    axes[3, 0].legend()
+    axes[3, 0].grid(True, alpha=0.3)
+
+    # Plot 6: Volume vs Volatility
+    scatter = axes[3, 1].scatter(data['Volume']/1e6, data['GARCH_Volatility']*100,
+                                 c=data['Log_Returns'], cmap='coolwarm', alpha=0.6, s=20)
+    axes[3, 1].set_title('Trading Volume vs. Volatility (color = return)', fontsize=12)
+    axes[3, 1].set_xlabel('Volume (millions)')
+    axes[3, 1].set_ylabel('Volatility (%)')
+    plt.colorbar(scatter, ax=axes[3, 1], label='Return')
+
+    plt.tight_layout()
+    if path:
+        fig.savefig(path, bbox_inches='tight')
+        print(f"\nPlots saved to '{path}'")
+    if show:
+        plt.show()
+    plt.close(fig)
+
+
+def print_insights(data, regime_stats, egarch_fit):
+    """Print the key insights summary"""
+    print("\n" + "="*50)
+    print("KEY INSIGHTS SUMMARY")
+    print("="*50)
+
+    print("\n1. VOLATILITY CHARACTERISTICS:")
+    print(f"   - Average daily volatility: {data['GARCH_Volatility'].mean()*100:.2f}%")
+    print(f"   - Maximum volatility: {data['GARCH_Volatility'].max()*100:.2f}%")
+    print(f"   - Minimum volatility: {data['GARCH_Volatility'].min()*100:.2f}%")
+
+    print("\n2. DISPERSION ANALYSIS:")
+    print(f"   - Volatility of volatility: {data['GARCH_Volatility'].std()*100:.3f}%")
+    print(f"   - Coefficient of Variation: {coefficient_of_variation(data['GARCH_Volatility']):.3f}")
+    print(f"   - Higher CV means more erratic/unpredictable volatility")
+
+    print("\n3. REGIME ANALYSIS:")
+    print(f"   - High volatility days (>75th percentile): {regime_stats.loc['High Vol', 'count']}")
+    print(f"   - Low volatility days: {regime_stats.loc['Low Vol', 'count']}")
+    print(f"   - Returns in high vol periods: {regime_stats.loc['High Vol', 'mean']*100:.3f}%")
+    print(f"   - Returns in low vol periods: {regime_stats.loc['Low Vol', 'mean']*100:.3f}%")
+
+    print("\n4. EGARCH LEVERAGE EFFECT:")
+    gamma = egarch_fit.params.get('gamma[1]', 0) if egarch_fit is not None else 0
+    if gamma < 0:
+        print(f"   - Gamma parameter: {gamma:.4f}")
+        print("   - NEGATIVE gamma indicates leverage effect (bad news increases vol more than good news)")
+    else:
+        print("   - No significant leverage effect detected")
+
+    print("\n5. TRADING IMPLICATIONS:")
+    print("   - High dispersion periods: Options more expensive, hedging more challenging")
+    print("   - Low dispersion periods: More predictable risk environment")
+    print("   - Use EGARCH for options pricing (captures asymmetry)")
+    print("   - Use GARCH for risk management (VaR calculations)")
+
+
+def export(data, path):
+    """Save the per-day volatility analysis to CSV"""
+    data[['Close', 'Log_Returns', 'GARCH_Volatility', 'EGARCH_Volatility',
+          'GARCH_Vol_Dispersion', 'Vol_Regime']].to_csv(path)
+    print(f"\nResults saved to '{path}'")
+
+
+# ============================================
+# PIPELINE
+# ============================================
+def run_pipeline(ticker="AAPL", start_date="2022-01-01", end_date="2024-01-01", cache=None,
+                 window=20, plot=True, plot_path=None, output=None, egarch_select='first', egarch_timeout=None):
+    """Run every stage for one ticker and return the enriched daily frame"""
+    data = fetch(ticker, start_date, end_date, cache)
+    data = compute_returns(data)
+    data, garch_fit, egarch_fit = fit_models(data, egarch_select, egarch_timeout)
+    data = compute_dispersion(data, window)
+    data, regime_stats = compute_regimes(data)
+
+    if plot or plot_path:
+        plot_analysis(data, ticker, show=plot, path=plot_path)
+
+    print_insights(data, regime_stats, egarch_fit)
+
+    if output:
+        export(data, output)
+
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GARCH/EGARCH volatility analysis for one ticker")
+    parser.add_argument("--ticker", default="AAPL")
+    parser.add_argument("--start", default="2022-01-01", help="First date (inclusive)")
+    parser.add_argument("--end", default="2024-01-01", help="Last date (exclusive)")
+    parser.add_argument("--window", type=int, default=20, help="Rolling dispersion window in days")
+    parser.add_argument("--egarch-select", choices=['first', 'aic', 'bic'], default='first',
+                        help="Keep the earliest-listed EGARCH distribution that converges, or the best by AIC/BIC")
+    parser.add_argument("--egarch-timeout", type=float, default=None,
+                        help="Seconds before a still-running EGARCH fit is abandoned")
+    parser.add_argument("--no-plot", action="store_true", help="Skip plotting (no matplotlib import)")
+    parser.add_argument("--plot-path", default=None, help="Save the dashboard to this image file")
+    parser.add_argument("--output", default=None,
+                        help="CSV path for the daily results (default: <TICKER>_volatility_analysis.csv)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help="Directory of cached per-ticker OHLCV Parquet files")
+    parser.add_argument("--offline", action="store_true", help="Read bars only from --cache-dir")
+    args = parser.parse_args()
+
+    run_pipeline(
+        args.ticker,
+        args.start,
+        args.end,
+        cache=OHLCVCache(args.cache_dir, offline=args.offline),
+        window=args.window,
+        plot=not args.no_plot,
+        plot_path=args.plot_path,
+        output=args.output or f"{args.ticker}_volatility_analysis.csv",
+        egarch_select=args.egarch_select,
+        egarch_timeout=args.egarch_timeout,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import json
+import math
+import os
+from dataclasses import asdict, dataclass
+
+import pandas as pd
+
+DEFAULT_STATE_DIR = os.getenv("DISP_VOL_STATE_DIR", ".model_state")
+_EXPECTED_ABS_NORMAL = math.sqrt(2 / math.pi)
+
+
+# ============================================
+# ONE-STEP VARIANCE RECURSIONS
+# ============================================
+# All values are in the percent units arch_model works in (returns * 100).
+
+def garch_next_variance(params, resid, variance):
+    """GARCH(1,1): sigma2[t+1] = omega + alpha * e[t]^2 + beta * sigma2[t]"""
+    return params['omega'] + params['alpha[1]'] * resid ** 2 + params['beta[1]'] * variance
+
+
+def egarch_next_variance(params, resid, variance):
+    """EGARCH(1,1,1) with normal errors, as parameterized by arch"""
+    z = resid / math.sqrt(variance)
+    log_variance = (
+        params['omega']
+        + params['alpha[1]'] * (abs(z) - _EXPECTED_ABS_NORMAL)
+        + params['gamma[1]'] * z
+        + params['beta[1]'] * math.log(variance)
+    )
+    return math.exp(log_variance)
+
+
+NEXT_VARIANCE = {
+    'garch': garch_next_variance,
+    'egarch': egarch_next_variance,
+}
+
+
+# ============================================
+# PER-TICKER MODEL STATE
+# ============================================
+@dataclass
+class ModelState:
+    """Fitted parameters plus the last residual and variance for one model.
+
+    Enough to roll the conditional variance forward one bar at a time without
+    touching the earlier history.
+    """
+
+    ticker: str
+    model: str
+    params: dict
+    last_date: str
+    last_resid: float
+    last_variance: float
+    fitted_through: str
+    steps_since_fit: int = 0
+    drift_sum: float = 0.0
+
+    @classmethod
+    def from_fit(cls, ticker, model, fit):
+        last_date = fit.conditional_volatility.index[-1]
+        return cls(
+            ticker=ticker,
+            model=model,
+            params={name: float(value) for name, value in fit.params.items()},
+            last_date=pd.Timestamp(last_date).isoformat(),
+            last_resid=float(fit.resid.iloc[-1]),
+            last_variance=float(fit.conditional_volatility.iloc[-1] ** 2),
+            fitted_through=pd.Timestamp(last_date).isoformat(),
+        )
+
+    @property
+    def conditional_vol(self):
+        """Conditional volatility on last_date, as a daily decimal"""
+        return math.sqrt(self.last_variance) / 100
+
+    def next_variance(self):
+        return NEXT_VARIANCE[self.model](self.params, self.last_resid, self.last_variance)
+
+    def advance(self, returns_series):
+        """Roll the state forward over new daily log returns, one recursion step each"""
+        mu = self.params.get('mu', 0.0)
+        for date, value in returns_series.items():
+            variance = self.next_variance()
+            resid = value * 100 - mu
+            self.drift_sum += resid ** 2 / variance
+            self.steps_since_fit += 1
+            self.last_date = pd.Timestamp(date).isoformat()
+            self.last_resid = resid
+            self.last_variance = variance
+        return self
+
+    def param_values(self):
+        """Parameters as an array in arch order, for fit(starting_values=...) or fix()"""
+        return list(self.params.values())
+
+
+class ModelStateStore:
+    """Directory of JSON model states, one file per ticker and model.
+
+    refresh() re-uses a stored state when the new data only appends bars: the
+    state is advanced by one recursion step per new bar and the full
+    conditional-vol path is evaluated at the stored parameters. A full fit only
+    happens every refit_every new bars, or when the mean squared standardized
+    residual since the last fit drifts more than drift_tolerance away from 1;
+    that fit is warm-started from the stored parameters.
+    """
+
+    def __init__(self, state_dir=DEFAULT_STATE_DIR, refit_every=20, drift_tolerance=0.5, min_drift_obs=5):
+        self.state_dir = state_dir
+        self.refit_every = refit_every
+        self.drift_tolerance = drift_tolerance
+        self.min_drift_obs = min_drift_obs
+
+    def path(self, ticker, model):
+        return os.path.join(self.state_dir, f"{ticker}.{model}.json")
+
+    def load(self, ticker, model):
+        path = self.path(ticker, model)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return ModelState(**json.load(f))
+
+    def save(self, state):
+        os.makedirs(self.state_dir, exist_ok=True)
+        path = self.path(state.ticker, state.model)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(asdict(state), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def needs_refit(self, state):
+        if state.steps_since_fit >= self.refit_every:
+            return True
+        if state.steps_since_fit >= self.min_drift_obs:
+            mean_z2 = state.drift_sum / state.steps_since_fit
+            return abs(mean_z2 - 1) > self.drift_tolerance
+        return False
+
+    def refresh(self, ticker, model, returns_series, fit_fn):
+        """Return (fit, results, refitted) for a ticker's full returns history.
+
+        fit_fn(returns_series, starting_values=None, params=None) is
+        fit_garch_model or fit_egarch_model.
+        """
+        state = self.load(ticker, model)
+
+        if state is not None and pd.Timestamp(state.last_date) in returns_series.index:
+            new_returns = returns_series[returns_series.index > pd.Timestamp(state.last_date)]
+            state.advance(new_returns)
+            if not self.needs_refit(state):
+                fit, results = fit_fn(returns_series, params=state.param_values())
+                if results is not None:
+                    self.save(state)
+                    return fit, results, False
+
+        starting_values = state.param_values() if state is not None else None
+        fit, results = fit_fn(returns_series, starting_values=starting_values)
+        if fit is not None:
+            self.save(ModelState.from_fit(ticker, model, fit))
+        return fit, results, True
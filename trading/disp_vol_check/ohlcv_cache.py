@@ -0,0 +1,133 @@
+import json
+import os
+from datetime import date
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+DEFAULT_CACHE_DIR = os.getenv("DISP_VOL_CACHE_DIR", ".ohlcv_cache")
+_METADATA_KEY = b"disp_vol_check.coverage"
+
+
+# ============================================
+# LOCAL OHLCV CACHE
+# ============================================
+class OHLCVCache:
+    """On-disk Parquet cache of daily OHLCV bars, one file per ticker.
+
+    Each file records the date range that has already been requested from the
+    data source, so later calls only fetch bars outside that range. With
+    offline=True the directory is treated as a read-only set of fixtures and
+    nothing is ever downloaded.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, offline=False):
+        self.cache_dir = cache_dir
+        self.offline = offline
+
+    def path(self, ticker):
+        return os.path.join(self.cache_dir, f"{ticker}.parquet")
+
+    def read(self, ticker):
+        """Return (bars, coverage) for a ticker, or (None, None) if not cached"""
+        path = self.path(ticker)
+        if not os.path.exists(path):
+            return None, None
+
+        table = pq.read_table(path)
+        metadata = table.schema.metadata or {}
+        data = table.to_pandas()
+
+        if _METADATA_KEY in metadata:
+            coverage = json.loads(metadata[_METADATA_KEY])
+            coverage = (pd.Timestamp(coverage["start"]), pd.Timestamp(coverage["end"]))
+        elif len(data):
+            # Plain fixture files: assume they cover exactly the bars they hold
+            coverage = (data.index[0], data.index[-1] + pd.Timedelta(days=1))
+        else:
+            coverage = None
+
+        return data, coverage
+
+    def write(self, ticker, data, coverage):
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        table = pa.Table.from_pandas(data, preserve_index=True)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_METADATA_KEY] = json.dumps({
+            "start": coverage[0].isoformat(),
+            "end": coverage[1].isoformat(),
+        })
+        table = table.replace_schema_metadata(metadata)
+
+        # Write to a temp file first so readers never see a partial file
+        path = self.path(ticker)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+    def lookup(self, ticker, start_date, end_date):
+        """Return (bars, coverage, missing date ranges) for a request"""
+        cached, coverage = self.read(ticker)
+        missing = _missing_ranges(coverage, pd.Timestamp(start_date), pd.Timestamp(end_date))
+        return cached, coverage, missing
+
+    def update(self, ticker, cached, coverage, fetched, start_date, end_date):
+        """Merge freshly fetched frames into the cached bars and persist them.
+
+        fetched is a list of ((fetch_start, fetch_end), frame) pairs. Coverage
+        only grows over ranges that returned bars or hold no trading days, so a
+        failed download is retried on the next call instead of being cached.
+        """
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        frames = [frame for frame in [cached, *(frame for _, frame in fetched)]
+                  if frame is not None and not frame.empty]
+        if not frames:
+            return pd.DataFrame()
+
+        merged = pd.concat(frames)
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+
+        covered = [] if coverage is None else [coverage]
+        covered += [fetch_range for fetch_range, frame in fetched if _fetch_complete(fetch_range, frame)]
+        if covered:
+            # Today's bar may still be forming, so never mark it as covered
+            today = pd.Timestamp(date.today())
+            new_start = min(covered_start for covered_start, _ in covered)
+            new_end = min(max(covered_end for _, covered_end in covered), today)
+            self.write(ticker, merged, (new_start, max(new_start, new_end)))
+
+        return _slice(merged, start, end)
+
+    def slice(self, data, start_date, end_date):
+        if data is None:
+            return pd.DataFrame()
+        return _slice(data, pd.Timestamp(start_date), pd.Timestamp(end_date))
+
+
+def _missing_ranges(coverage, start, end):
+    """Date ranges needed so the cache covers [start, end) without gaps"""
+    if coverage is None:
+        return [(start, end)]
+
+    covered_start, covered_end = coverage
+    missing = []
+    if start < covered_start:
+        missing.append((start, covered_start))
+    if end > covered_end:
+        missing.append((covered_end, end))
+    return missing
+
+
+def _fetch_complete(fetch_range, frame):
+    """True if a fetched range returned bars or has no trading days to return"""
+    if frame is not None and not frame.empty:
+        return True
+    fetch_start, fetch_end = fetch_range
+    return len(pd.bdate_range(fetch_start, fetch_end - pd.Timedelta(days=1))) == 0
+
+
+def _slice(data, start, end):
+    # yfinance treats end_date as exclusive; mirror that here
+    return data[(data.index >= start) & (data.index < end)]
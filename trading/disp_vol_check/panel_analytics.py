@@ -0,0 +1,98 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================
+# PANEL REGIMES AND DISPERSION
+# ============================================
+# Panel versions of stocks.analyze_volatility_regimes and
+# stocks.analyze_dispersion: every ticker (column) of a dates x tickers matrix
+# is handled by the same few NumPy reductions instead of a pandas mask per
+# ticker. NaN marks dates a ticker has no value for (ragged histories) and is
+# left out of every statistic, so a column gives the same numbers as its
+# non-NaN values passed through the single-Series functions.
+
+def _values(panel):
+    if isinstance(panel, pd.DataFrame):
+        return panel.to_numpy(dtype=float)
+    return np.asarray(panel, dtype=float)
+
+
+def _coefficient_of_variation(values, axis):
+    """std (ddof=1) / mean along an axis, ignoring NaN; NaN with fewer than 2 values"""
+    count = np.sum(~np.isnan(values), axis=axis)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.nansum(values, axis=axis) / count
+        deviations = values - np.expand_dims(mean, axis)
+        variance = np.nansum(deviations ** 2, axis=axis) / (count - 1)
+        cv = np.sqrt(variance) / mean
+    return np.where(count >= 2, cv, np.nan), mean, count
+
+
+def panel_dispersion(volatility):
+    """Coefficient of variation of each ticker's volatility over time"""
+    cv, _, _ = _coefficient_of_variation(_values(volatility), axis=0)
+    if isinstance(volatility, pd.DataFrame):
+        return pd.Series(cv, index=volatility.columns)
+    return cv
+
+
+def cross_sectional_dispersion(volatility):
+    """Per-date dispersion of volatility across tickers (CV, mean and ticker count)"""
+    cv, mean, count = _coefficient_of_variation(_values(volatility), axis=1)
+    index = volatility.index if isinstance(volatility, pd.DataFrame) else None
+    return pd.DataFrame({'cross_sectional_cv': cv, 'mean_vol': mean, 'tickers': count}, index=index)
+
+
+def panel_regimes(returns, volatility, quantile=0.75):
+    """High/low volatility regime stats for every ticker of a panel.
+
+    High-vol days are those above the ticker's own quantile of volatility
+    (linear interpolation, like Series.quantile). Returns a tickers-indexed
+    DataFrame with threshold, high/low-vol mean return and day counts, plus
+    the dates x tickers boolean high-vol mask.
+    """
+    r = _values(returns)
+    vol = _values(volatility)
+    has_vol = ~np.isnan(vol)
+
+    with warnings.catch_warnings():
+        # Tickers with no data at all get a NaN threshold
+        warnings.simplefilter('ignore', RuntimeWarning)
+        threshold = np.nanquantile(vol, quantile, axis=0)
+
+    with np.errstate(invalid='ignore'):
+        high = has_vol & (vol > threshold)
+    low = has_vol & ~high
+
+    has_return = ~np.isnan(r)
+    r_filled = np.where(has_return, r, 0.0)
+    stats = {'threshold': threshold}
+    for name, mask in (('high_vol', high), ('low_vol', low)):
+        with_return = mask & has_return
+        n = with_return.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(n > 0, (r_filled * with_return).sum(axis=0) / n, 0.0)
+        stats[f'{name}_return'] = mean
+        stats[f'{name}_days'] = mask.sum(axis=0)
+
+    columns = volatility.columns if isinstance(volatility, pd.DataFrame) else None
+    return pd.DataFrame(stats, index=columns), high
+
+
+def panel_analytics(returns, volatility, quantile=0.75):
+    """Regimes, per-ticker dispersion and cross-sectional dispersion in one pass.
+
+    Returns (per_ticker, per_date): per_ticker adds a 'dispersion' column to
+    the panel_regimes stats; per_date is cross_sectional_dispersion plus the
+    share of tickers in their high-vol regime on each date.
+    """
+    per_ticker, high = panel_regimes(returns, volatility, quantile)
+    per_ticker['dispersion'] = panel_dispersion(volatility)
+
+    per_date = cross_sectional_dispersion(volatility)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        per_date['high_vol_share'] = high.sum(axis=1) / per_date['tickers'].to_numpy()
+    return per_ticker, per_date
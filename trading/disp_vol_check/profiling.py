@@ -0,0 +1,88 @@
+import cProfile
+import functools
+import os
+import pstats
+import tracemalloc
+
+PROFILE_ENV = "DISP_VOL_PROFILE"
+PROFILE_DIR_ENV = "DISP_VOL_PROFILE_DIR"
+PROFILE_MODES = ('cprofile', 'tracemalloc')
+
+
+# ============================================
+# OPT-IN PROFILING HOOK
+# ============================================
+# Set DISP_VOL_PROFILE=cprofile, tracemalloc or cprofile,tracemalloc to profile
+# every analyze_stock call. Results go to DISP_VOL_PROFILE_DIR (default
+# ./profiles) as <ticker>.prof (load with pstats or snakeviz) and
+# <ticker>.tracemalloc.txt (top allocation sites and peak traced memory).
+# The variable is read per call and inherited by worker processes, so the
+# hook also covers parallel runs. With it unset the wrapper only checks the
+# environment and calls through.
+
+def profile_modes():
+    """The profiling modes requested through DISP_VOL_PROFILE"""
+    value = os.getenv(PROFILE_ENV, "")
+    modes = {mode.strip().lower() for mode in value.split(",") if mode.strip()}
+    if 'all' in modes:
+        return set(PROFILE_MODES)
+    unknown = modes - set(PROFILE_MODES)
+    if unknown:
+        raise ValueError(f"Unknown {PROFILE_ENV} mode(s) {sorted(unknown)}, expected {PROFILE_MODES} or 'all'")
+    return modes
+
+
+def enable_profiling(modes="cprofile,tracemalloc", output_dir=None):
+    """Turn the hook on for this process and any workers it starts afterwards"""
+    os.environ[PROFILE_ENV] = modes
+    if output_dir is not None:
+        os.environ[PROFILE_DIR_ENV] = output_dir
+
+
+def profiled(func):
+    """Profile func(ticker, ...) when DISP_VOL_PROFILE is set"""
+
+    @functools.wraps(func)
+    def wrapper(ticker, *args, **kwargs):
+        modes = profile_modes()
+        if not modes:
+            return func(ticker, *args, **kwargs)
+
+        output_dir = os.getenv(PROFILE_DIR_ENV, "profiles")
+        os.makedirs(output_dir, exist_ok=True)
+
+        profiler = cProfile.Profile() if 'cprofile' in modes else None
+        # Leave tracing alone if something further up is already tracing
+        trace = 'tracemalloc' in modes and not tracemalloc.is_tracing()
+        if trace:
+            tracemalloc.start()
+        if profiler is not None:
+            profiler.enable()
+
+        try:
+            return func(ticker, *args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(os.path.join(output_dir, f"{ticker}.prof"))
+            if trace:
+                snapshot = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                _write_tracemalloc_report(os.path.join(output_dir, f"{ticker}.tracemalloc.txt"), snapshot, peak)
+
+    return wrapper
+
+
+def _write_tracemalloc_report(path, snapshot, peak, limit=25):
+    stats = snapshot.statistics('lineno')
+    with open(path, "w") as f:
+        f.write(f"Peak traced memory: {peak / 2**20:.1f} MiB\n")
+        f.write(f"Top {min(limit, len(stats))} allocation sites still held at exit:\n")
+        for stat in stats[:limit]:
+            f.write(f"{stat}\n")
+
+
+def print_profile(path, sort='cumulative', limit=30):
+    """Print the top functions of a saved .prof file"""
+    pstats.Stats(path).sort_stats(sort).print_stats(limit)
@@ -0,0 +1,147 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SERIES_DIR = os.getenv("DISP_VOL_SERIES_DIR", "volatility_series")
+
+# Summary columns in CSV order, with the dtype each one is stored as
+COLUMNS = {
+    'Ticker': object,
+    'Start_Date': 'datetime64[D]',
+    'End_Date': 'datetime64[D]',
+    'Mean_Return': np.float64,
+    'Daily_Volatility': np.float64,
+    'Annualized_Vol': np.float64,
+    'Skewness': np.float64,
+    'Kurtosis': np.float64,
+    'High_Vol_Return': np.float64,
+    'Low_Vol_Return': np.float64,
+    'High_Vol_Days': np.int32,
+    'Low_Vol_Days': np.int32,
+    'Trading_Pattern': object,
+    'GARCH_Dispersion': np.float64,
+    'EGARCH_Dispersion': np.float64,
+    'GARCH_Alpha': np.float64,
+    'GARCH_Beta': np.float64,
+    'GARCH_Persistence': np.float64,
+    'EGARCH_Gamma': np.float64,
+    'Leverage_Effect': object,
+}
+
+SERIES_COLUMNS = ['Close', 'Log_Returns', 'GARCH_Volatility', 'EGARCH_Volatility']
+
+
+# ============================================
+# COLUMNAR RESULTS STORE
+# ============================================
+class ResultsStore:
+    """Per-ticker summary rows in preallocated typed columns.
+
+    append() copies the scalar results of analyze_stock into the next row and,
+    when series_dir is set, writes the ticker's price/volatility series to a
+    Parquet dataset partitioned by ticker (series_dir/ticker=XXX/). Nothing
+    else from the results dict is kept, so memory only grows with the summary
+    rows. Columns double in size when full.
+    """
+
+    def __init__(self, series_dir=None, capacity=64):
+        self.series_dir = series_dir
+        self._size = 0
+        self._columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in COLUMNS.items()}
+
+    @classmethod
+    def from_results(cls, results_dict, series_dir=None):
+        """Build a store from an {ticker: analyze_stock results} dict"""
+        store = cls(series_dir, capacity=max(len(results_dict), 1))
+        for results in results_dict.values():
+            store.append(results)
+        return store
+
+    def __len__(self):
+        return self._size
+
+    def column(self, name):
+        """A read-only view of one column's filled rows"""
+        view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def append(self, results):
+        """Add one ticker's analyze_stock results"""
+        if self._size == len(self._columns['Ticker']):
+            self._grow()
+
+        data = results['data']
+        return_stats = results['return_stats']
+        regime_stats = results['regime_stats']
+        garch_results = results['garch_results']
+        gamma = results['egarch_results'].get('gamma')
+
+        row = {
+            'Ticker': results['ticker'],
+            'Start_Date': data.index[0].date(),
+            'End_Date': data.index[-1].date(),
+            'Mean_Return': return_stats['mean'],
+            'Daily_Volatility': return_stats['std'],
+            'Annualized_Vol': return_stats['std'] * np.sqrt(252),
+            'Skewness': return_stats['skew'],
+            'Kurtosis': return_stats['kurt'],
+            'High_Vol_Return': regime_stats['high_vol_return'],
+            'Low_Vol_Return': regime_stats['low_vol_return'],
+            'High_Vol_Days': regime_stats['high_vol_days'],
+            'Low_Vol_Days': regime_stats['low_vol_days'],
+            'Trading_Pattern': results['pattern'],
+            'GARCH_Dispersion': results['garch_dispersion'],
+            'EGARCH_Dispersion': results['egarch_dispersion'],
+            'GARCH_Alpha': garch_results['alpha'],
+            'GARCH_Beta': garch_results['beta'],
+            'GARCH_Persistence': garch_results['persistence'],
+            'EGARCH_Gamma': np.nan if gamma is None else gamma,
+            'Leverage_Effect': 'Yes' if gamma is not None and gamma < 0 else 'No/Unknown',
+        }
+        for name, value in row.items():
+            self._columns[name][self._size] = value
+        self._size += 1
+
+        if self.series_dir is not None:
+            self.write_series(results['ticker'], data)
+
+    def _grow(self):
+        capacity = 2 * len(self._columns['Ticker'])
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    # ============================================
+    # VOLATILITY SERIES DATASET
+    # ============================================
+    def series_path(self, ticker):
+        return os.path.join(self.series_dir, f"ticker={ticker}", "part-0.parquet")
+
+    def write_series(self, ticker, data):
+        path = self.series_path(ticker)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temp file first so readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        data[[column for column in SERIES_COLUMNS if column in data]].to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+
+    def load_series(self, ticker=None):
+        """Read one ticker's series back, or the whole dataset with a ticker column"""
+        if ticker is not None:
+            return pd.read_parquet(self.series_path(ticker))
+        return pd.read_parquet(self.series_dir)
+
+    # ============================================
+    # EXPORT
+    # ============================================
+    def to_frame(self):
+        return pd.DataFrame({name: self.column(name) for name in COLUMNS})
+
+    def save_csv(self, filename):
+        frame = self.to_frame()
+        frame.to_csv(filename, index=False)
+        return frame
@@ -0,0 +1,119 @@
+from math import comb
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================
+# ROLLING MOMENTS
+# ============================================
+# Rolling mean, std, skew, kurtosis and coefficient of variation from running
+# sums of x, x^2, x^3 and x^4, so every window costs O(1) regardless of its
+# length and there is no Python callback per window.
+#
+# Power sums lose precision when the values sit far from the point they are
+# taken about, so the series is cut into blocks that are each centered on
+# their own mean and summed separately. A window that crosses into the
+# previous block re-centers that part with a binomial shift.
+
+_MIN_BLOCK = 128
+
+
+def rolling_moments(series, window):
+    """Rolling mean, std, skew, kurt and cv of a Series in one pass.
+
+    Matches pandas rolling(window).mean()/std() and
+    rolling(window).apply(scipy.stats.skew / kurtosis): std uses ddof=1,
+    skew and kurtosis are the biased (population) estimates, kurtosis is excess
+    kurtosis. Windows that are not full or contain NaN give NaN.
+    """
+    values = np.asarray(series, dtype=float)
+    moments = _rolling_moments(values, window)
+    index = series.index if isinstance(series, pd.Series) else None
+    return pd.DataFrame(moments, index=index)
+
+
+def coefficient_of_variation(values):
+    """std (ddof=1) / mean over the non-NaN values of a 1D array or Series"""
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if len(values) < 2:
+        return np.nan
+    mean = values.mean()
+    return np.sqrt(np.sum((values - mean) ** 2) / (len(values) - 1)) / mean
+
+
+def _rolling_moments(values, window):
+    n = len(values)
+    result = {name: np.full(n, np.nan) for name in ('mean', 'std', 'skew', 'kurt', 'cv')}
+    if window < 2 or n < window:
+        return result
+
+    sums, centers, n_missing = _window_power_sums(values, window, max(window, _MIN_BLOCK))
+
+    # Central moments of each window from its power sums about the block center
+    s1, s2, s3, s4 = (sums[k] / window for k in range(1, 5))
+    mean = s1
+    m2 = np.maximum(s2 - mean ** 2, 0.0)
+    m3 = s3 - 3 * mean * s2 + 2 * mean ** 3
+    m4 = s4 - 4 * mean * s3 + 6 * mean ** 2 * s2 - 3 * mean ** 4
+    mean = mean + centers
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std = np.sqrt(m2 * window / (window - 1))
+        skew = np.where(m2 > 0, m3 / m2 ** 1.5, np.nan)
+        kurt = np.where(m2 > 0, m4 / m2 ** 2 - 3, np.nan)
+        cv = std / mean
+
+    valid = n_missing == 0
+    for name, column in (('mean', mean), ('std', std), ('skew', skew), ('kurt', kurt), ('cv', cv)):
+        result[name][window - 1:] = np.where(valid, column, np.nan)
+    return result
+
+
+def _window_power_sums(values, window, block):
+    """Sums of (x - c)^k, k = 0..4, for every full window, c = center of the window's last block"""
+    n = len(values)
+    missing = np.isnan(values)
+    block_id = np.arange(n) // block
+    block_start = np.arange(0, n, block)
+
+    counts = np.add.reduceat((~missing).astype(float), block_start)
+    totals = np.add.reduceat(np.where(missing, 0.0, values), block_start)
+    with np.errstate(invalid='ignore'):
+        block_centers = np.where(counts > 0, totals / np.maximum(counts, 1), 0.0)
+
+    y = np.where(missing, 0.0, values - block_centers[block_id])
+    powers = np.stack([(~missing).astype(float), y, y ** 2, y ** 3, y ** 4])
+
+    # Prefix sums that restart at every block boundary
+    prefix = np.cumsum(powers, axis=1)
+    offsets = np.concatenate((np.zeros((5, 1)), prefix[:, block_start[1:] - 1]), axis=1)
+    prefix -= offsets[:, block_id]
+
+    ends = np.arange(window - 1, n)
+    before = ends - window
+    end_block = block_id[ends]
+    same_block = before + 1 >= block_start[end_block]
+
+    sums = prefix[:, ends].copy()
+    inside = same_block & (before >= 0) & (before >= block_start[end_block])
+    sums[:, inside] -= prefix[:, before[inside]]
+
+    # Windows that start in the previous block: take that block's tail and
+    # shift it from the previous center onto the current one
+    crossing = np.flatnonzero(~same_block)
+    if crossing.size:
+        prev_block = end_block[crossing] - 1
+        prev_total = prefix[:, block_start[prev_block + 1] - 1]
+        tail = prev_total - prefix[:, before[crossing]]
+        shift = block_centers[prev_block] - block_centers[end_block[crossing]]
+        shifted = np.zeros_like(tail)
+        for k in range(5):
+            for j in range(k + 1):
+                shifted[k] += comb(k, j) * shift ** (k - j) * tail[j]
+        sums[:, crossing] += shifted
+
+    missing_cumulative = np.concatenate(([0], np.cumsum(missing)))
+    n_missing = missing_cumulative[ends + 1] - missing_cumulative[ends + 1 - window]
+    return sums, block_centers[end_block], n_missing
@@ -0,0 +1,277 @@
+import math
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from data_sources import load_stock_data_bulk
+from panel_analytics import panel_analytics, panel_dispersion
+
+# Arrays held in a panel, all dates x tickers float64
+INPUT_ARRAYS = ('close', 'returns')
+OUTPUT_ARRAYS = ('garch_vol', 'egarch_vol')
+ARRAYS = INPUT_ARRAYS + OUTPUT_ARRAYS
+BACKENDS = ('shm', 'memmap')
+
+
+# ============================================
+# SHARED DATES x TICKERS PANEL
+# ============================================
+# The parent loads closes and log returns once into shared memory (or .npy
+# files mapped into memory) and workers attach to the same pages by name, so
+# only a PanelSpec and lists of column indices cross the process boundary.
+# Each worker writes conditional vols into its own columns of the output
+# arrays; columns never overlap, so no locking is needed.
+
+@dataclass
+class PanelSpec:
+    """Everything a worker needs to attach to a SharedPanel"""
+
+    backend: str
+    location: str
+    shape: tuple
+    tickers: list
+    dates: np.ndarray
+
+
+class SharedPanel:
+    """Close, log-return and conditional-vol matrices shared between processes.
+
+    backend='shm' keeps all four arrays in one multiprocessing.shared_memory
+    block; backend='memmap' keeps one .npy file per array under a directory,
+    which also leaves the outputs on disk after the run.
+    """
+
+    def __init__(self, spec, arrays, shm=None, owner=False):
+        self.spec = spec
+        self.arrays = arrays
+        self._shm = shm
+        self._owner = owner
+        self._columns = {ticker: i for i, ticker in enumerate(spec.tickers)}
+
+    @classmethod
+    def create(cls, closes, backend='shm', directory=None):
+        """Allocate a panel from a dates x tickers DataFrame of closes (owner side)"""
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
+        shape = closes.shape
+        dates = closes.index.to_numpy(dtype='datetime64[ns]')
+        tickers = list(closes.columns)
+
+        if backend == 'shm':
+            size = len(ARRAYS) * _array_bytes(shape)
+            shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+            spec = PanelSpec(backend, shm.name, shape, tickers, dates)
+            panel = cls(spec, _shm_arrays(shm, shape), shm, owner=True)
+        else:
+            directory = directory or tempfile.mkdtemp(prefix="disp_vol_panel_")
+            os.makedirs(directory, exist_ok=True)
+            arrays = {
+                name: np.lib.format.open_memmap(os.path.join(directory, f"{name}.npy"), mode='w+',
+                                                dtype=np.float64, shape=shape)
+                for name in ARRAYS
+            }
+            panel = cls(PanelSpec(backend, directory, shape, tickers, dates), arrays, owner=True)
+
+        values = closes.to_numpy(dtype=np.float64)
+        panel.arrays['close'][:] = values
+        # Chain each ticker's consecutive closes across dates where it has no
+        # bar, as calculate_returns does: divide by the last earlier close
+        previous = closes.ffill().to_numpy(dtype=np.float64)[:-1]
+        panel.arrays['returns'][0] = np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.log(values[1:] / previous, out=panel.arrays['returns'][1:])
+        for name in OUTPUT_ARRAYS:
+            panel.arrays[name][:] = np.nan
+        return panel
+
+    @classmethod
+    def attach(cls, spec):
+        """Map an existing panel into this process without copying (worker side)"""
+        if spec.backend == 'shm':
+            shm = _attach_shm(spec.location)
+            return cls(spec, _shm_arrays(shm, spec.shape), shm)
+        arrays = {name: np.load(os.path.join(spec.location, f"{name}.npy"), mmap_mode='r+') for name in ARRAYS}
+        return cls(spec, arrays)
+
+    def column(self, ticker):
+        return self._columns[ticker]
+
+    def frame(self, name):
+        """One array as a dates x tickers DataFrame (copies out of shared memory)"""
+        return pd.DataFrame(np.array(self.arrays[name]), index=pd.DatetimeIndex(self.spec.dates),
+                            columns=self.spec.tickers)
+
+    def close(self):
+        """Drop this process's mapping; the owner also frees the shared block"""
+        self.arrays = {}
+        if self._shm is not None:
+            self._shm.close()
+            if self._owner:
+                self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _array_bytes(shape):
+    return math.prod(shape) * np.dtype(np.float64).itemsize
+
+
+def _shm_arrays(shm, shape):
+    step = _array_bytes(shape)
+    return {
+        name: np.ndarray(shape, dtype=np.float64, buffer=shm.buf, offset=i * step)
+        for i, name in enumerate(ARRAYS)
+    }
+
+
+def _attach_shm(name):
+    # Workers share the parent's resource tracker, so the block registered
+    # here is the one the owner unregisters when it unlinks it
+    return shared_memory.SharedMemory(name=name)
+
+
+def load_close_panel(ticker_list, start_date="2022-01-01", end_date="2024-01-01", batch_size=100,
+                     source=None, cache=None):
+    """Closes for many tickers as one dates x tickers DataFrame (NaN where a ticker has no bar)"""
+    bars = load_stock_data_bulk(ticker_list, start_date, end_date, batch_size, source, cache)
+    closes = {ticker: data['Close'] for ticker, data in bars.items() if not data.empty}
+    del bars
+    return pd.DataFrame(closes).sort_index()
+
+
+# ============================================
+# PANEL ANALYSIS
+# ============================================
+def _analyze_columns(spec, columns):
+    """Fit GARCH/EGARCH for some columns of an attached panel (runs in a worker)"""
+    from stocks import fit_egarch_model, fit_garch_model
+
+    panel = SharedPanel.attach(spec)
+    dates = pd.DatetimeIndex(spec.dates)
+    summaries = {}
+    try:
+        for column in columns:
+            ticker = spec.tickers[column]
+            returns = panel.arrays['returns'][:, column]
+            valid = np.flatnonzero(np.isfinite(returns))
+            if len(valid) < 2:
+                continue
+            try:
+                log_returns = pd.Series(returns[valid], index=dates[valid])
+                garch_fit, garch_results = fit_garch_model(log_returns)
+                garch_vol = garch_results.pop('conditional_vol')
+                panel.arrays['garch_vol'][valid, column] = garch_vol.to_numpy()
+
+                egarch_fit, egarch_results = fit_egarch_model(log_returns)
+                if egarch_results:
+                    egarch_vol = egarch_results.pop('conditional_vol')
+                else:
+                    egarch_vol, egarch_results = garch_vol, {'gamma': None}
+                panel.arrays['egarch_vol'][valid, column] = egarch_vol.to_numpy()
+            except Exception as e:
+                summaries[ticker] = {'error': str(e)}
+                continue
+
+            summaries[ticker] = {
+                'return_stats': {
+                    'mean': log_returns.mean(),
+                    'std': log_returns.std(),
+                    'skew': log_returns.skew(),
+                    'kurt': log_returns.kurtosis(),
+                    'min': log_returns.min(),
+                    'max': log_returns.max(),
+                },
+                'garch_results': garch_results,
+                'egarch_results': egarch_results,
+            }
+    finally:
+        panel.close()
+    return summaries
+
+
+def _results(panel, ticker, summary, per_ticker, egarch_dispersion):
+    """Rebuild an analyze_stock-style results dict from a summary plus the shared arrays"""
+    column = panel.column(ticker)
+    dates = pd.DatetimeIndex(panel.spec.dates)
+    valid = np.flatnonzero(np.isfinite(panel.arrays['returns'][:, column]))
+    data = pd.DataFrame({
+        'Close': panel.arrays['close'][valid, column],
+        'Log_Returns': panel.arrays['returns'][valid, column],
+        'GARCH_Volatility': panel.arrays['garch_vol'][valid, column],
+        'EGARCH_Volatility': panel.arrays['egarch_vol'][valid, column],
+    }, index=dates[valid])
+
+    stats = per_ticker.iloc[column]
+    regime_stats = {
+        'high_vol_return': stats['high_vol_return'],
+        'low_vol_return': stats['low_vol_return'],
+        'high_vol_days': int(stats['high_vol_days']),
+        'low_vol_days': int(stats['low_vol_days']),
+    }
+    if regime_stats['high_vol_return'] < regime_stats['low_vol_return']:
+        pattern = "Buy when boring (sells off in high vol)"
+    else:
+        pattern = "Buy when exciting (rallies in high vol)"
+    return {
+        'ticker': ticker,
+        **summary,
+        'garch_dispersion': stats['dispersion'],
+        'egarch_dispersion': egarch_dispersion[column],
+        'regime_stats': regime_stats,
+        'pattern': pattern,
+        'data': data,
+    }
+
+
+def analyze_panel(closes, workers=None, backend='shm', directory=None, store=None):
+    """GARCH/EGARCH analysis of a dates x tickers close panel across worker processes.
+
+    Workers attach to the shared panel and receive only column indices; they
+    send back per-ticker scalars while the conditional vols go straight into
+    the shared output arrays. Regimes and dispersion are then computed for
+    all tickers at once from those arrays with panel_analytics.
+
+    Returns (results, cross_section): results is {ticker: results} in the
+    same shape analyze_stock returns, or the ResultsStore they were appended
+    to when one is given; cross_section is the per-date cross-sectional
+    dispersion of GARCH volatility.
+    """
+    workers = workers or os.cpu_count() or 1
+    completed = {}
+    with SharedPanel.create(closes, backend, directory) as panel:
+        chunks = [chunk for chunk in np.array_split(np.arange(closes.shape[1]), workers) if len(chunk)]
+        if len(chunks) <= 1:
+            summaries = [_analyze_columns(panel.spec, range(closes.shape[1]))]
+        else:
+            with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+                futures = [pool.submit(_analyze_columns, panel.spec, chunk.tolist()) for chunk in chunks]
+                summaries = [future.result() for future in futures]
+
+        per_ticker, cross_section = panel_analytics(panel.arrays['returns'], panel.arrays['garch_vol'])
+        cross_section.index = pd.DatetimeIndex(panel.spec.dates)
+        egarch_dispersion = panel_dispersion(panel.arrays['egarch_vol'])
+
+        for chunk_summaries in summaries:
+            for ticker, summary in chunk_summaries.items():
+                if 'error' in summary:
+                    print(f"Error analyzing {ticker}: {summary['error']}")
+                    continue
+                results = _results(panel, ticker, summary, per_ticker, egarch_dispersion)
+                if store is not None:
+                    store.append(results)
+                else:
+                    completed[ticker] = results
+
+    if store is not None:
+        return store, cross_section
+    return {ticker: completed[ticker] for ticker in closes.columns if ticker in completed}, cross_section
@@ -1,21 +1,27 @@
+import io
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+
 import numpy as np
 import pandas as pd
-from arch import arch_model
-import yfinance as yf
-import warnings
+
+from data_sources import LocalFileSource, load_stock_data_bulk
+from egarch_strategy import fit_egarch_candidates
+from model_state import DEFAULT_STATE_DIR, ModelStateStore
+from ohlcv_cache import DEFAULT_CACHE_DIR, OHLCVCache
+from profiling import enable_profiling, profiled
+from results_store import DEFAULT_SERIES_DIR, ResultsStore
+from rolling_moments import coefficient_of_variation, rolling_moments
 warnings.filterwarnings('ignore')
 
 # ============================================
 # CORE ANALYSIS FUNCTIONS
 # ============================================
-def get_stock_data(ticker, start_date="2022-01-01", end_date="2024-01-01"):
-    """Download and clean stock data"""
-    data = yf.download(ticker, start=start_date, end=end_date, progress=False)
-    
-    if isinstance(data.columns, pd.MultiIndex):
-        data.columns = data.columns.get_level_values(0)
-    
-    return data
+def get_stock_data(ticker, start_date="2022-01-01", end_date="2024-01-01", cache=None, source=None):
+    """Download and clean stock data, reading through an OHLCVCache when one is given"""
+    return load_stock_data_bulk([ticker], start_date, end_date, source=source, cache=cache)[ticker]
 
 
 def calculate_returns(data):
@@ -36,10 +42,15 @@ def calculate_returns(data):
     return data, stats
 
 
-def fit_garch_model(returns_series):
-    """Fit GARCH(1,1) model"""
+def fit_garch_model(returns_series, starting_values=None, params=None):
+    """Fit GARCH(1,1) model (warm-started from starting_values, or fixed at params)"""
+    from arch import arch_model
+    
     garch = arch_model(returns_series * 100, vol='Garch', p=1, q=1, dist='normal')
-    garch_fit = garch.fit(update_freq=0, disp='off')
+    if params is not None:
+        garch_fit = garch.fix(params)
+    else:
+        garch_fit = garch.fit(update_freq=0, disp='off', starting_values=starting_values)
     
     # Get parameters
     params = garch_fit.params
@@ -54,11 +65,33 @@ def fit_garch_model(returns_series):
     return garch_fit, garch_results
 
 
-def fit_egarch_model(returns_series):
-    """Fit EGARCH(1,1) model with fallback"""
+def fit_egarch_model(returns_series, starting_values=None, params=None, distributions=None,
+                     select='first', timeout=None, parallel=True):
+    """Fit EGARCH(1,1) model with fallback (warm-started from starting_values, or fixed at params).
+
+    With distributions, the candidate error distributions are fitted
+    (concurrently unless parallel=False) and the winner is picked by select
+    ('first', 'aic' or 'bic').
+    """
+    from arch import arch_model
+    
     try:
-        egarch = arch_model(returns_series * 100, vol='EGARCH', p=1, q=1, o=1, dist='normal')
-        egarch_fit = egarch.fit(update_freq=0, disp='off', show_warning=False)
+        dist = 'normal'
+        if distributions and params is None and starting_values is None:
+            selection = fit_egarch_candidates(returns_series, distributions, select, timeout,
+                                              parallel=parallel)
+            for name, attempt in selection['attempts'].items():
+                print(f"  {name.upper():<7} {attempt['status']:<10} {attempt['seconds']:.2f}s")
+            if selection['fit'] is None:
+                return None, None
+            dist, egarch_fit = selection['dist'], selection['fit']
+        else:
+            egarch = arch_model(returns_series * 100, vol='EGARCH', p=1, q=1, o=1, dist=dist)
+            if params is not None:
+                egarch_fit = egarch.fix(params)
+            else:
+                egarch_fit = egarch.fit(update_freq=0, disp='off', show_warning=False,
+                                        starting_values=starting_values)
         
         params = egarch_fit.params
         egarch_results = {
@@ -66,6 +99,7 @@ def fit_egarch_model(returns_series):
             'alpha': params.get('alpha[1]', 0),
             'gamma': params.get('gamma[1]', 0),
             'beta': params.get('beta[1]', 0),
+            'distribution': dist,
             'conditional_vol': egarch_fit.conditional_volatility / 100
         }
         
@@ -74,11 +108,13 @@ def fit_egarch_model(returns_series):
         return None, None
 
 
-def analyze_dispersion(volatility_series):
-    """Calculate dispersion (coefficient of variation)"""
+def analyze_dispersion(volatility_series, window=None):
+    """Calculate dispersion (coefficient of variation), or its rolling series if window is given"""
+    if window is not None:
+        return rolling_moments(volatility_series, window)['cv']
     if len(volatility_series) == 0:
         return 0.0
-    return volatility_series.std() / volatility_series.mean()
+    return coefficient_of_variation(volatility_series)
 
 
 def analyze_volatility_regimes(returns_series, volatility_series):
@@ -101,15 +137,31 @@ def analyze_volatility_regimes(returns_series, volatility_series):
     }
 
 
-def analyze_stock(ticker, start_date="2022-01-01", end_date="2024-01-01"):
-    """Complete analysis for a single stock"""
+def _fit(ticker, model, fit_fn, returns_series, model_store):
+    """Fit a model, or roll its stored state forward when a ModelStateStore is given"""
+    if model_store is None:
+        return fit_fn(returns_series)
+    fit, results, refitted = model_store.refresh(ticker, model, returns_series, fit_fn)
+    print("  (full re-fit, warm-started)" if refitted else "  (incremental update from stored state)")
+    return fit, results
+
+
+@profiled
+def analyze_stock(ticker, start_date="2022-01-01", end_date="2024-01-01", cache=None, source=None, data=None,
+                  model_store=None, egarch_distributions=None, egarch_parallel=True):
+    """Complete analysis for a single stock (data may be preloaded by a bulk loader).
+
+    egarch_parallel=False fits the egarch_distributions candidates one after
+    another; the worker-pool path uses it so N workers stay N processes.
+    """
     print(f"\n{'='*60}")
     print(f"ANALYZING {ticker}")
     print(f"{'='*60}")
     
     # 1. Get data
-    print("Fetching data...")
-    data = get_stock_data(ticker, start_date, end_date)
+    if data is None:
+        print("Fetching data...")
+        data = get_stock_data(ticker, start_date, end_date, cache, source)
     
     if data.empty:
         print(f"No data for {ticker}")
@@ -128,7 +180,7 @@ def analyze_stock(ticker, start_date="2022-01-01", end_date="2024-01-01"):
     
     # 3. Fit GARCH model
     print("\nFitting GARCH(1,1)...")
-    garch_fit, garch_results = fit_garch_model(data['Log_Returns'])
+    garch_fit, garch_results = _fit(ticker, 'garch', fit_garch_model, data['Log_Returns'], model_store)
     
     print(f"GARCH Parameters:")
     print(f"  Alpha (news impact): {garch_results['alpha']:.4f}")
@@ -140,10 +192,15 @@ def analyze_stock(ticker, start_date="2022-01-01", end_date="2024-01-01"):
     
     # 4. Fit EGARCH model
     print("\nFitting EGARCH(1,1)...")
-    egarch_fit, egarch_results = fit_egarch_model(data['Log_Returns'])
+    if egarch_distributions and model_store is None:
+        egarch_fit, egarch_results = fit_egarch_model(data['Log_Returns'], distributions=egarch_distributions,
+                                                      parallel=egarch_parallel)
+    else:
+        egarch_fit, egarch_results = _fit(ticker, 'egarch', fit_egarch_model, data['Log_Returns'], model_store)
     
     if egarch_results:
         print(f"EGARCH Parameters:")
+        print(f"  Distribution: {egarch_results['distribution']}")
         print(f"  Gamma (leverage effect): {egarch_results['gamma']:.4f}")
         data['EGARCH_Volatility'] = pd.Series(egarch_results['conditional_vol'], index=data.index)
     else:
@@ -199,112 +256,241 @@ def analyze_stock(ticker, start_date="2022-01-01", end_date="2024-01-01"):
     return results
 
 
-def analyze_stock_list(ticker_list, start_date="2022-01-01", end_date="2024-01-01"):
-    """Analyze multiple stocks"""
-    all_results = {}
+def _analyze_stock_captured(ticker, start_date, end_date, options):
+    """Run analyze_stock in a worker, capturing its printed report"""
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        try:
+            results = analyze_stock(ticker, start_date, end_date, **options)
+            error = None
+        except Exception as e:
+            results = None
+            error = e
+    return results, buffer.getvalue(), error
+
+
+def _print_ticker_header(ticker):
+    print(f"\n{'#'*70}")
+    print(f"PROCESSING: {ticker}")
+    print(f"{'#'*70}")
+
+
+def analyze_stock_list(ticker_list, start_date="2022-01-01", end_date="2024-01-01", workers=1,
+                       cache=None, source=None, batch_size=None, model_store=None, egarch_distributions=None,
+                       store=None):
+    """Analyze multiple stocks, optionally across a pool of worker processes.
+
+    With batch_size set, all bars are loaded up front with one source call per
+    batch of tickers instead of one download per ticker.
+
+    Returns {ticker: results}, or with a ResultsStore, appends each ticker to
+    the store as it finishes (in completion order) and returns the store, so
+    no per-ticker DataFrames are kept.
+    """
+    preloaded = {}
+    if batch_size:
+        print(f"Loading {len(ticker_list)} tickers in batches of {batch_size}...")
+        preloaded = load_stock_data_bulk(ticker_list, start_date, end_date, batch_size, source, cache)
+    
+    def options(ticker):
+        return {'cache': cache, 'source': source, 'data': preloaded.get(ticker), 'model_store': model_store,
+                'egarch_distributions': egarch_distributions}
+    
+    completed = {}
+    collect = completed.__setitem__ if store is None else lambda ticker, results: store.append(results)
+    
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(ticker_list) <= 1:
+        _analyze_stock_list_serial(ticker_list, start_date, end_date, options, collect)
+    else:
+        _analyze_stock_list_parallel(ticker_list, start_date, end_date, workers, options, collect)
     
+    if store is not None:
+        return store
+    # Keep the serial path's ticker ordering
+    return {ticker: completed[ticker] for ticker in ticker_list if ticker in completed}
+
+
+def _analyze_stock_list_serial(ticker_list, start_date, end_date, options, collect):
     for ticker in ticker_list:
-        print(f"\n{'#'*70}")
-        print(f"PROCESSING: {ticker}")
-        print(f"{'#'*70}")
+        _print_ticker_header(ticker)
         
         try:
-            results = analyze_stock(ticker, start_date, end_date)
+            results = analyze_stock(ticker, start_date, end_date, **options(ticker))
             if results:
-                all_results[ticker] = results
+                collect(ticker, results)
         except Exception as e:
             print(f"Error analyzing {ticker}: {e}")
             continue
+
+
+def _analyze_stock_list_parallel(ticker_list, start_date, end_date, workers, options, collect):
+    # Each worker buffers its own report, which is printed in one block as soon
+    # as the ticker finishes so output from different tickers never interleaves.
+    with ProcessPoolExecutor(max_workers=min(workers, len(ticker_list))) as pool:
+        futures = {
+            pool.submit(_analyze_stock_captured, ticker, start_date, end_date,
+                        {**options(ticker), 'egarch_parallel': False}): ticker
+            for ticker in ticker_list
+        }
+        # Drop each Future as it completes: a Future keeps its result (with the
+        # ticker's full DataFrame) alive for as long as it is referenced
+        for future in as_completed(futures):
+            ticker = futures.pop(future)
+            _collect_future(ticker, future, collect)
+            del future
+
+
+def _collect_future(ticker, future, collect):
+    """Print one finished ticker's report and hand its results to collect"""
+    _print_ticker_header(ticker)
     
-    return all_results
+    try:
+        results, output, error = future.result()
+    except Exception as e:
+        # Worker died or results could not be sent back
+        results, output, error = None, "", e
+    
+    print(output, end="")
+    if error is not None:
+        print(f"Error analyzing {ticker}: {error}")
+    elif results:
+        collect(ticker, results)
+
 
+def _as_store(results):
+    """Accept either a ResultsStore or an {ticker: results} dict"""
+    if isinstance(results, ResultsStore):
+        return results
+    return ResultsStore.from_results(results)
 
-def print_summary_table(results_dict):
+
+def print_summary_table(results):
     """Print a clean summary table of all stocks"""
+    store = _as_store(results)
+    
     print(f"\n{'='*80}")
     print("SUMMARY TABLE")
     print(f"{'='*80}")
     print(f"{'Ticker':<8} {'Volatility':<12} {'High Vol Return':<18} {'Low Vol Return':<18} {'Pattern':<30} {'Dispersion':<12}")
     print(f"{'-'*80}")
     
-    for ticker, results in results_dict.items():
-        vol = results['return_stats']['std'] * 100
-        high_vol = results['regime_stats']['high_vol_return'] * 100
-        low_vol = results['regime_stats']['low_vol_return'] * 100
-        pattern = results['pattern'][:28]  # Truncate if too long
-        dispersion = results['garch_dispersion']
-        
+    rows = zip(
+        store.column('Ticker'),
+        store.column('Daily_Volatility') * 100,
+        store.column('High_Vol_Return') * 100,
+        store.column('Low_Vol_Return') * 100,
+        store.column('Trading_Pattern'),
+        store.column('GARCH_Dispersion'),
+    )
+    for ticker, vol, high_vol, low_vol, pattern, dispersion in rows:
+        pattern = pattern[:28]  # Truncate if too long
         print(f"{ticker:<8} {vol:>6.2f}%{'':<4} {high_vol:>7.3f}%{'':<8} {low_vol:>7.3f}%{'':<8} {pattern:<30} {dispersion:>7.3f}")
 
 
-def save_results_to_csv(results_dict, filename="stock_volatility_results.csv"):
+def save_results_to_csv(results, filename="stock_volatility_results.csv"):
     """Save all results to CSV"""
-    summary_data = []
-    
-    for ticker, results in results_dict.items():
-        summary_data.append({
-            'Ticker': ticker,
-            'Start_Date': results['data'].index[0].date(),
-            'End_Date': results['data'].index[-1].date(),
-            'Mean_Return': results['return_stats']['mean'],
-            'Daily_Volatility': results['return_stats']['std'],
-            'Annualized_Vol': results['return_stats']['std'] * np.sqrt(252),
-            'Skewness': results['return_stats']['skew'],
-            'Kurtosis': results['return_stats']['kurt'],
-            'High_Vol_Return': results['regime_stats']['high_vol_return'],
-            'Low_Vol_Return': results['regime_stats']['low_vol_return'],
-            'High_Vol_Days': results['regime_stats']['high_vol_days'],
-            'Low_Vol_Days': results['regime_stats']['low_vol_days'],
-            'Trading_Pattern': results['pattern'],
-            'GARCH_Dispersion': results['garch_dispersion'],
-            'EGARCH_Dispersion': results['egarch_dispersion'],
-            'GARCH_Alpha': results['garch_results']['alpha'],
-            'GARCH_Beta': results['garch_results']['beta'],
-            'GARCH_Persistence': results['garch_results']['persistence'],
-            'EGARCH_Gamma': results['egarch_results'].get('gamma', None),
-            'Leverage_Effect': 'Yes' if results['egarch_results'].get('gamma', 0) < 0 else 'No/Unknown'
-        })
-    
-    df = pd.DataFrame(summary_data)
-    df.to_csv(filename, index=False)
+    df = _as_store(results).save_csv(filename)
     print(f"\nResults saved to {filename}")
     
     return df
 
 
+def print_insights(results):
+    """Print pattern counts and the most/least volatile stocks"""
+    store = _as_store(results)
+    if not len(store):
+        return
+    
+    print(f"\n{'='*80}")
+    print("KEY INSIGHTS")
+    print(f"{'='*80}")
+    
+    # Count patterns
+    patterns = store.column('Trading_Pattern')
+    boring_count = sum(1 for pattern in patterns if "Buy when boring" in pattern)
+    exciting_count = sum(1 for pattern in patterns if "Buy when exciting" in pattern)
+    
+    print(f"Stocks that 'Buy when boring': {boring_count}")
+    print(f"Stocks that 'Buy when exciting': {exciting_count}")
+    
+    # Find highest/lowest volatility
+    tickers = store.column('Ticker')
+    vol = store.column('Daily_Volatility')
+    highest, lowest = np.argmax(vol), np.argmin(vol)
+    
+    print(f"\nHighest volatility: {tickers[highest]} ({vol[highest]*100:.2f}%)")
+    print(f"Lowest volatility: {tickers[lowest]} ({vol[lowest]*100:.2f}%)")
+
+
 # ============================================
 # MAIN EXECUTION
 # ============================================
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="GARCH/EGARCH volatility analysis for a list of stocks")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes for per-ticker analysis (0 = one per CPU)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help="Directory of cached per-ticker OHLCV Parquet files")
+    parser.add_argument("--no-cache", action="store_true", help="Always download the full history")
+    parser.add_argument("--offline", action="store_true",
+                        help="Read bars only from --cache-dir (e.g. a fixtures directory), never download")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Load bars for this many tickers per download call before analysis")
+    parser.add_argument("--source-dir", default=None,
+                        help="Read bars from local <TICKER>.parquet/.csv files instead of yfinance")
+    parser.add_argument("--state-dir", default=None,
+                        help=f"Keep per-ticker GARCH/EGARCH state here (e.g. {DEFAULT_STATE_DIR}) "
+                             "and update incrementally instead of re-fitting every run")
+    parser.add_argument("--refit-every", type=int, default=20,
+                        help="With --state-dir, force a full re-fit after this many new bars")
+    parser.add_argument("--egarch-dists", default=None,
+                        help="Comma-separated EGARCH error distributions to try concurrently (e.g. normal,ged,t)")
+    parser.add_argument("--series-dir", default=DEFAULT_SERIES_DIR,
+                        help="Parquet dataset (partitioned by ticker) for the per-ticker volatility series")
+    parser.add_argument("--shared-panel", choices=["shm", "memmap"], default=None,
+                        help="Load all closes into one shared dates x tickers panel and fit across workers "
+                             "without per-ticker reports (see shared_panel.py)")
+    parser.add_argument("--profile", default=None,
+                        help="Profile each ticker: cprofile, tracemalloc or all (see profiling.py)")
+    parser.add_argument("--profile-dir", default="profiles", help="Where --profile writes its reports")
+    args = parser.parse_args()
+    
+    if args.profile:
+        enable_profiling(args.profile, args.profile_dir)
+    
+    cache = None if args.no_cache else OHLCVCache(args.cache_dir, offline=args.offline)
+    source = LocalFileSource(args.source_dir) if args.source_dir else None
+    model_store = ModelStateStore(args.state_dir, refit_every=args.refit_every) if args.state_dir else None
+    
     # Define your stock list
     stocks = ["AAPL", "MSFT", "TSLA", "NVDA", "JNJ", "PG", "KO", "AMD"]
     
     # Analyze all stocks
-    results = analyze_stock_list(stocks)
+    if args.shared_panel:
+        from shared_panel import analyze_panel, load_close_panel
+        
+        closes = load_close_panel(stocks, batch_size=args.batch_size or 100, source=source, cache=cache)
+        results, cross_section = analyze_panel(closes, workers=args.workers or None, backend=args.shared_panel,
+                                               store=ResultsStore(args.series_dir))
+        cross_section.to_csv("cross_sectional_dispersion.csv")
+        print(f"\nCross-sectional GARCH vol dispersion (CV across tickers): "
+              f"mean {cross_section['cross_sectional_cv'].mean():.3f}, "
+              f"latest {cross_section['cross_sectional_cv'].iloc[-1]:.3f}")
+        print("Per-date cross-sectional dispersion saved to cross_sectional_dispersion.csv")
+    else:
+        results = analyze_stock_list(stocks, workers=args.workers or None, cache=cache,
+                                     source=source, batch_size=args.batch_size, model_store=model_store,
+                                     egarch_distributions=args.egarch_dists.split(",") if args.egarch_dists else None,
+                                     store=ResultsStore(args.series_dir))
     
     # Print summary table
     print_summary_table(results)
     
     # Save results
-    if results:
+    if len(results):
         save_results_to_csv(results)
-        
-        # Print some insights
-        print(f"\n{'='*80}")
-        print("KEY INSIGHTS")
-        print(f"{'='*80}")
-        
-        # Count patterns
-        boring_count = sum(1 for r in results.values() if "Buy when boring" in r['pattern'])
-        exciting_count = sum(1 for r in results.values() if "Buy when exciting" in r['pattern'])
-        
-        print(f"Stocks that 'Buy when boring': {boring_count}")
-        print(f"Stocks that 'Buy when exciting': {exciting_count}")
-        
-        # Find highest/lowest volatility
-        if results:
-            highest_vol = max(results.items(), key=lambda x: x[1]['return_stats']['std'])
-            lowest_vol = min(results.items(), key=lambda x: x[1]['return_stats']['std'])
-            
-            print(f"\nHighest volatility: {highest_vol[0]} ({highest_vol[1]['return_stats']['std']*100:.2f}%)")
-            print(f"Lowest volatility: {lowest_vol[0]} ({lowest_vol[1]['return_stats']['std']*100:.2f}%)")
\ No newline at end of file
+        print_insights(results)
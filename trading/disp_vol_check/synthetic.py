@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================
+# SYNTHETIC FIXTURES
+# ============================================
+def simulate_garch_returns(n_obs, n_tickers, omega=0.05, alpha=0.08, beta=0.9, mu=0.05,
+                           start_date="2022-01-03", seed=0):
+    """Simulate a dates x tickers panel of daily log returns from GARCH(1,1).
+
+    omega and mu are in percent units, as arch_model sees returns * 100.
+    """
+    rng = np.random.default_rng(seed)
+    returns = np.empty((n_obs, n_tickers))
+    sigma2 = np.full(n_tickers, omega / (1 - alpha - beta))
+
+    for t in range(n_obs):
+        shock = np.sqrt(sigma2) * rng.standard_normal(n_tickers)
+        returns[t] = mu + shock
+        sigma2 = omega + alpha * shock ** 2 + beta * sigma2
+
+    index = pd.bdate_range(start_date, periods=n_obs)
+    columns = [f"SYN{i:05d}" for i in range(n_tickers)]
+    return pd.DataFrame(returns / 100, index=index, columns=columns)
+
+
+def simulate_ohlcv(n_obs, n_tickers, model='garch', start_price=100.0, drift=0.0003, sigma=0.015,
+                   start_date="2022-01-03", seed=0):
+    """Simulate daily OHLCV bars for n_tickers, returned as {ticker: DataFrame}.
+
+    model='gbm' uses constant-volatility log returns (drift, sigma per day);
+    model='garch' draws them from simulate_garch_returns. Open/High/Low are
+    spread around the close path so the frames look like yfinance bars.
+    """
+    if model == 'gbm':
+        rng = np.random.default_rng(seed)
+        log_returns = drift - sigma ** 2 / 2 + sigma * rng.standard_normal((n_obs, n_tickers))
+        index = pd.bdate_range(start_date, periods=n_obs)
+        columns = [f"SYN{i:05d}" for i in range(n_tickers)]
+    elif model == 'garch':
+        panel = simulate_garch_returns(n_obs, n_tickers, start_date=start_date, seed=seed)
+        log_returns, index, columns = panel.to_numpy(), panel.index, panel.columns
+    else:
+        raise ValueError(f"model must be 'gbm' or 'garch', got {model!r}")
+
+    rng = np.random.default_rng(seed + 1)
+    close = start_price * np.exp(np.cumsum(log_returns, axis=0))
+    open_ = np.vstack([np.full((1, n_tickers), start_price), close[:-1]])
+    spread = np.abs(rng.normal(0, 0.005, (2, n_obs, n_tickers)))
+    high = np.maximum(open_, close) * (1 + spread[0])
+    low = np.minimum(open_, close) * (1 - spread[1])
+    volume = rng.integers(100_000, 10_000_000, (n_obs, n_tickers))
+
+    return {
+        ticker: pd.DataFrame({
+            'Open': open_[:, i],
+            'High': high[:, i],
+            'Low': low[:, i],
+            'Close': close[:, i],
+            'Volume': volume[:, i],
+        }, index=index.rename('Date'))
+        for i, ticker in enumerate(columns)
+    }
+
+
+def write_ohlcv_fixtures(directory, bars):
+    """Write {ticker: bars} as <directory>/<TICKER>.parquet for LocalFileSource"""
+    os.makedirs(directory, exist_ok=True)
+    for ticker, data in bars.items():
+        data.to_parquet(os.path.join(directory, f"{ticker}.parquet"))
@@ -0,0 +1,264 @@
+"""
+Walk-forward GARCH/EGARCH backtest with out-of-sample one-step forecasts.
+
+The full-sample fit in stocks.analyze_stock sees the whole history, so its
+regime labels use future data. Here the model is refitted on an expanding or
+sliding window every refit_every days, and each day's volatility forecast
+only uses parameters fitted on earlier days plus the returns observed up to
+the day before:
+
+    fit on [.., k)  ->  forecast k, k+1, .., k+refit_every-1  ->  refit at k+refit_every
+
+Between refits the forecasts come from the one-step variance recursion in
+model_state, not from new fits, so a 500-day backtest with refit_every=20
+costs about 13 fits instead of 500. Each fit is warm-started from the
+previous window's parameters. A warm fit that did not converge, has a
+non-finite log-likelihood or a non-stationary beta is discarded and redone
+from arch's default starting values. Its parameters are never carried into the
+next refit. With workers > 1 the refit dates are split into contiguous chunks,
+one per worker process; only the first fit of each chunk starts cold.
+
+    python walk_forward.py --ticker AAPL --window expanding --refit-every 20 --workers 4
+"""
+
+import argparse
+import math
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from model_state import ModelState
+from stocks import fit_egarch_model, fit_garch_model
+
+warnings.filterwarnings('ignore')
+
+FIT_FUNCTIONS = {
+    'garch': fit_garch_model,
+    'egarch': fit_egarch_model,
+}
+WINDOW_TYPES = ('expanding', 'sliding')
+
+
+# ============================================
+# WALK-FORWARD SCHEDULE
+# ============================================
+def refit_positions(n_obs, min_train=250, refit_every=20):
+    """Positions k at which the model is refitted on returns before k"""
+    if n_obs <= min_train:
+        raise ValueError(f"Need more than min_train={min_train} returns, got {n_obs}")
+    return list(range(min_train, n_obs, refit_every))
+
+
+def split_chunks(positions, n_chunks):
+    """Split refit positions into n_chunks contiguous, near-equal chunks"""
+    n_chunks = max(1, min(n_chunks, len(positions)))
+    return [list(chunk) for chunk in np.array_split(positions, n_chunks)]
+
+
+# ============================================
+# FITTING AND FORECASTING
+# ============================================
+def _training_window(returns_series, position, window, train_size):
+    if window == 'expanding':
+        return returns_series.iloc[:position]
+    return returns_series.iloc[max(0, position - train_size):position]
+
+
+def _usable_fit(fit, model):
+    """True when an arch fit converged to finite, stationary parameters.
+
+    EGARCH fits with a negative alpha are rejected too: they shrink the
+    forecast variance towards zero and blow up QLIKE.
+    """
+    if fit is None or fit.convergence_flag != 0 or not np.isfinite(fit.loglikelihood):
+        return False
+    params = fit.params
+    if not np.all(np.isfinite(params.to_numpy())):
+        return False
+    if model == 'garch':
+        return params.get('alpha[1]', 0) + params.get('beta[1]', 0) < 1
+    return abs(params.get('beta[1]', 0)) < 1 and params.get('alpha[1]', 0) >= 0
+
+
+def _fit_window(fit_fn, train, model, starting_values):
+    """Warm fit from starting_values, refitted cold when it raises or is not usable; None if neither works"""
+    attempts = [{'starting_values': starting_values}] if starting_values is not None else []
+    attempts.append({})
+    for fit_options in attempts:
+        try:
+            fit, _ = fit_fn(train, **fit_options)
+        except Exception:
+            continue
+        if _usable_fit(fit, model):
+            return fit
+    return None
+
+
+def _walk_chunk(returns_series, positions, model, window, train_size, refit_every):
+    """Fit at each position of one chunk and forecast up to the next refit.
+
+    Returns a list of (position, forecast_variance, refit) rows, with
+    variances in arch's percent units.
+    """
+    fit_fn = FIT_FUNCTIONS[model]
+    state = None
+    starting_values = None
+    rows = []
+
+    for position in positions:
+        train = _training_window(returns_series, position, window, train_size)
+        fit = _fit_window(fit_fn, train, model, starting_values)
+        # A failed fit keeps forecasting with the last good parameters; that
+        # state has already been rolled forward to the day before position
+        refit_ok = fit is not None
+        if refit_ok:
+            state = ModelState.from_fit(returns_series.name or 'series', model, fit)
+            starting_values = state.param_values()
+
+        end = min(position + refit_every, len(returns_series))
+        for step in range(position, end):
+            try:
+                variance = state.next_variance() if state is not None else math.nan
+            except OverflowError:
+                variance = math.inf
+            if not 0 < variance < math.inf:
+                # Degenerate parameters: no forecasts until the next good fit,
+                # which starts cold instead of from these parameters
+                state, starting_values = None, None
+                rows.append((step, math.nan, False))
+                continue
+            rows.append((step, variance, refit_ok and step == position))
+            state.advance(returns_series.iloc[step:step + 1])
+
+    return rows
+
+
+def walk_forward(returns_series, model='garch', window='expanding', min_train=250, train_size=None,
+                 refit_every=20, workers=1):
+    """Out-of-sample one-step volatility forecasts for a daily log-returns Series.
+
+    window='expanding' refits on every return before the refit date;
+    'sliding' refits on the last train_size returns (default min_train).
+
+    Returns a DataFrame indexed by forecast date with Log_Returns,
+    Forecast_Volatility (daily decimal, known at the previous close) and
+    Refit (True on days a new fit took effect).
+    """
+    if model not in FIT_FUNCTIONS:
+        raise ValueError(f"model must be one of {tuple(FIT_FUNCTIONS)}, got {model!r}")
+    if window not in WINDOW_TYPES:
+        raise ValueError(f"window must be one of {WINDOW_TYPES}, got {window!r}")
+    train_size = train_size or min_train
+
+    returns_series = returns_series.dropna()
+    positions = refit_positions(len(returns_series), min_train, refit_every)
+    chunks = split_chunks(positions, workers or 1)
+    tasks = [(returns_series, chunk, model, window, train_size, refit_every) for chunk in chunks]
+
+    if len(tasks) == 1:
+        rows = _walk_chunk(*tasks[0])
+    else:
+        with ProcessPoolExecutor(max_workers=len(tasks)) as pool:
+            futures = [pool.submit(_walk_chunk, *task) for task in tasks]
+            rows = [row for future in futures for row in future.result()]
+
+    steps, variances, refits = zip(*rows)
+    forecast = pd.DataFrame({
+        'Log_Returns': returns_series.iloc[list(steps)].to_numpy(),
+        'Forecast_Volatility': np.sqrt(np.asarray(variances, dtype=float)) / 100,
+        'Refit': np.asarray(refits, dtype=bool),
+    }, index=returns_series.index[list(steps)])
+    return forecast
+
+
+# ============================================
+# OUT-OF-SAMPLE REGIMES
+# ============================================
+def label_regimes(forecast, quantile=0.75, min_periods=20):
+    """Flag high-vol days against an expanding quantile of earlier forecasts only"""
+    volatility = forecast['Forecast_Volatility']
+    threshold = volatility.expanding(min_periods=min_periods).quantile(quantile).shift(1)
+    forecast = forecast.copy()
+    forecast['Threshold'] = threshold
+    forecast['High_Vol'] = volatility > threshold
+    return forecast
+
+
+def summarize_walk_forward(forecast):
+    """Out-of-sample regime returns plus forecast accuracy against squared returns"""
+    labelled = forecast.dropna(subset=['Threshold', 'Forecast_Volatility'])
+    high = labelled['High_Vol']
+    returns = labelled['Log_Returns']
+    variance = labelled['Forecast_Volatility'] ** 2
+
+    # QLIKE loss: robust to the noise in squared returns as a variance proxy
+    realized = returns ** 2
+    ratio = (realized / variance)[realized > 0]
+    qlike = np.mean(ratio - np.log(ratio) - 1) if len(ratio) else math.nan
+
+    return {
+        'forecast_days': len(forecast),
+        'refits': int(forecast['Refit'].sum()),
+        'high_vol_return': returns[high].mean() if high.any() else 0.0,
+        'low_vol_return': returns[~high].mean() if (~high).any() else 0.0,
+        'high_vol_days': int(high.sum()),
+        'low_vol_days': int((~high).sum()),
+        'rmse_variance': float(np.sqrt(np.mean((realized - variance) ** 2))) if len(labelled) else math.nan,
+        'qlike': float(qlike),
+    }
+
+
+# ============================================
+# MAIN EXECUTION
+# ============================================
+def main():
+    from ohlcv_cache import DEFAULT_CACHE_DIR, OHLCVCache
+    from stocks import calculate_returns, get_stock_data
+
+    parser = argparse.ArgumentParser(description="Walk-forward GARCH/EGARCH volatility backtest for one ticker")
+    parser.add_argument("--ticker", default="AAPL")
+    parser.add_argument("--start", default="2020-01-01", help="First date (inclusive)")
+    parser.add_argument("--end", default="2024-01-01", help="Last date (exclusive)")
+    parser.add_argument("--model", choices=list(FIT_FUNCTIONS), default='garch')
+    parser.add_argument("--window", choices=WINDOW_TYPES, default='expanding')
+    parser.add_argument("--min-train", type=int, default=250, help="Returns in the first training window")
+    parser.add_argument("--train-size", type=int, default=None,
+                        help="Sliding window length in returns (default: --min-train)")
+    parser.add_argument("--refit-every", type=int, default=20, help="Days between refits")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (0 = one per CPU)")
+    parser.add_argument("--quantile", type=float, default=0.75, help="High-vol threshold quantile")
+    parser.add_argument("--output", default=None, help="CSV path for the daily forecasts")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help="Directory of cached per-ticker OHLCV Parquet files")
+    parser.add_argument("--offline", action="store_true", help="Read bars only from --cache-dir")
+    args = parser.parse_args()
+
+    data = get_stock_data(args.ticker, args.start, args.end, cache=OHLCVCache(args.cache_dir, offline=args.offline))
+    if data.empty:
+        raise SystemExit(f"No data for {args.ticker} between {args.start} and {args.end}")
+    data, _ = calculate_returns(data)
+
+    forecast = walk_forward(data['Log_Returns'].rename(args.ticker), args.model, args.window, args.min_train,
+                            args.train_size, args.refit_every, args.workers or os.cpu_count() or 1)
+    forecast = label_regimes(forecast, args.quantile)
+    summary = summarize_walk_forward(forecast)
+
+    print(f"\n{'='*60}")
+    print(f"WALK-FORWARD {args.model.upper()} ({args.window}, refit every {args.refit_every} days): {args.ticker}")
+    print(f"{'='*60}")
+    print(f"Forecast days: {summary['forecast_days']} ({summary['refits']} refits)")
+    print(f"Out-of-sample high vol days: {summary['high_vol_days']}, low vol days: {summary['low_vol_days']}")
+    print(f"Return during high vol: {summary['high_vol_return']*100:.3f}%")
+    print(f"Return during low vol: {summary['low_vol_return']*100:.3f}%")
+    print(f"Variance forecast RMSE: {summary['rmse_variance']:.3e}  QLIKE: {summary['qlike']:.4f}")
+
+    if args.output:
+        forecast.to_csv(args.output)
+        print(f"\nForecasts saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()